@@ -0,0 +1,2 @@
+# -*- coding: utf-8 -*-
+# Benchmarks for the hot paths: board rules, prompt building, move extraction, board rendering and mock-server round trips
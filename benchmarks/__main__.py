@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+运行全部(或指定的)基准，结果写成JSON，记录提交号、Python版本和平台，可与其他提交的结果比较
+
+示例：
+    python -m benchmarks                          # 结果写入.cache/benchmarks/<提交号>.json
+    python -m benchmarks --only board,render --repeat 3
+    python -m benchmarks --baseline 1a2b3c4       # 与该提交保存的结果比较
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.common import ROOT
+from benchmarks import bench_board, bench_e2e, bench_move_parser, bench_prompt, bench_render, compare
+
+RESULTS_DIR = os.path.join(ROOT, ".cache", "benchmarks")
+
+SUITES: Dict[str, Callable[[int], Dict[str, Any]]] = {
+    "board": bench_board.run,
+    "prompt": bench_prompt.run,
+    "move_parser": lambda repeat: bench_move_parser.run(repeat * 20),
+    "render": bench_render.run,
+    "e2e": bench_e2e.run,
+}
+
+def git_commit() -> str:
+    """当前提交的短哈希，工作区有未提交的改动时加+dirty；不在git仓库中时返回unknown"""
+    def git(*args):
+        return subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    try:
+        commit = git("rev-parse", "--short", "HEAD")
+        dirty = git("status", "--porcelain", "--untracked-files=no")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return commit + ("+dirty" if dirty else "")
+
+def run_suites(names: List[str], repeat: int) -> Dict[str, Any]:
+    results = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "benchmarks": {},
+    }
+    for name in names:
+        print(f"运行 {name} ...", file=sys.stderr)
+        results["benchmarks"][name] = SUITES[name](repeat)
+    return results
+
+def baseline_path(baseline: str) -> str:
+    """--baseline可以是结果文件，也可以是已保存结果的提交号"""
+    return baseline if os.path.exists(baseline) else os.path.join(RESULTS_DIR, f"{baseline}.json")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="热点路径基准")
+    parser.add_argument("--only", default=",".join(SUITES), help=f"逗号分隔的基准名，可选：{','.join(SUITES)}")
+    parser.add_argument("--repeat", type=int, default=5, help="每项测量的轮数，取最快一轮")
+    parser.add_argument("--output", help="结果JSON的路径，默认.cache/benchmarks/<提交号>.json")
+    parser.add_argument("--baseline", help="与之比较的结果文件或提交号")
+    parser.add_argument("--threshold", type=float, default=0.05, help="变化超过该比例才算提升或退化")
+    args = parser.parse_args(argv)
+
+    names = [name.strip() for name in args.only.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SUITES]
+    if unknown:
+        parser.error(f"未知的基准: {', '.join(unknown)}")
+
+    results = run_suites(names, args.repeat)
+    output = args.output or os.path.join(RESULTS_DIR, f"{results['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    print(json.dumps(results["benchmarks"], indent=2, ensure_ascii=False))
+    print(f"结果已写入 {output}", file=sys.stderr)
+
+    if args.baseline:
+        baseline = compare.load(baseline_path(args.baseline))
+        changes = compare.compare(baseline, results, args.threshold)
+        print(compare.report(changes, baseline, results))
+        return 1 if any(change.verdict == "worse" for change in changes) else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+棋盘规则的吞吐量基准
+落子与提子(按固定种子的随机对局回放)、悔棋/重做，以及不同手数局面下的合法着法生成。
+
+示例：
+    python benchmarks/bench_board.py
+"""
+
+import argparse
+import json
+import os
+import sys
+from typing import Dict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import measure, random_game, replay
+from src.go_board import GoBoard
+
+GAME_LENGTHS = (0, 100, 250)
+
+def run(repeat: int = 5) -> Dict[str, float]:
+    results: Dict[str, float] = {}
+    game = random_game(19, 300, seed=1)
+    board = replay(game)
+    results["captured_stones"] = board.captured_black + board.captured_white
+    elapsed = measure(lambda: replay(game), repeat)
+    results["place_stone_per_sec"] = len(game) / elapsed
+
+    # 9路小盘上随机对下提子频繁，单独衡量提子的开销
+    small = random_game(9, 200, seed=2)
+    small_board = replay(small, 9)
+    results["captured_stones_9x9"] = small_board.captured_black + small_board.captured_white
+    elapsed = measure(lambda: replay(small, 9), repeat)
+    results["place_stone_9x9_per_sec"] = len(small) / elapsed
+
+    def undo_redo():
+        while board.undo() is not None:
+            pass
+        while board.redo() is not None:
+            pass
+    elapsed = measure(undo_redo, repeat)
+    results["undo_redo_per_sec"] = 2 * len(game) / elapsed
+
+    for length in GAME_LENGTHS:
+        position = replay(game[:length]) if length else GoBoard(19)
+        stone = game[length][2] if length < len(game) else game[-1][2].opponent
+        results[f"valid_moves_at_{length}_us"] = measure(lambda: position.get_valid_moves(stone), repeat) * 1e6
+        results[f"legal_mask_at_{length}_us"] = measure(lambda: position.legal_mask(stone), repeat) * 1e6
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="棋盘规则基准")
+    parser.add_argument("--repeat", type=int, default=5, help="每项测量的轮数，取最快一轮")
+    args = parser.parse_args(argv)
+    print(json.dumps(run(args.repeat), indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+端到端请求基准：经本地模拟服务器(src/mock_server.py)走完整的客户端链路，不访问网络
+测量GoAI流式快速落子(DashScope SDK)和QwenGoAI局面分析(OpenAI兼容接口)的单次请求耗时，
+以及AsyncQwenClient在固定服务端延迟下的并发吞吐量。每次请求前清空缓存，保证真正发出请求。
+
+并发测试的模拟服务器在单独的进程中运行，客户端进程的CPU时间只含客户端本身。吞吐量的上限是
+concurrency / latency(只受服务端延迟限制时)与CPU核数 / 每个请求的CPU时间(客户端加服务端)中的较小者；
+httpx/httpcore每个请求要花数毫秒CPU，核数少的机器上通常是后者，此时这项指标反映的是客户端和服务端的
+单请求开销而不是并发能力。结果中同时给出两者：latency_bound_rps是前者，client_cpu_per_request_us是
+客户端每个请求的CPU时间。
+
+示例：
+    python benchmarks/bench_e2e.py --latency 0.05 --requests 128
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+import urllib.request
+from typing import Dict, Iterator
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import ROOT, measure, offline_env, random_game, replay
+from src.mock_server import MockServer
+from src.response_cache import ResponseCache
+
+@contextlib.contextmanager
+def external_server(*args: str) -> Iterator[str]:
+    """在子进程中启动模拟服务器(参数同命令行)，产出其根地址，退出时结束子进程"""
+    process = subprocess.Popen([sys.executable, "-m", "src.mock_server", "--port", "0", *args],
+                               cwd=ROOT, stdout=subprocess.PIPE, text=True, encoding="utf-8")
+    try:
+        match = re.search(r"http://\S+", process.stdout.readline())
+        if match is None:
+            raise RuntimeError("模拟服务器启动失败")
+        yield match.group(0)
+    finally:
+        process.terminate()
+        process.wait()
+
+def _concurrent_rps(base_url: str, requests: int, concurrency: int) -> Dict[str, float]:
+    """并发发出requests个请求，返回吞吐量和客户端每个请求的CPU时间"""
+    from src.async_qwen import AsyncQwenClient
+
+    async def burst():
+        client = AsyncQwenClient("benchmark", "mock", base_url, max_concurrency=concurrency)
+        messages = [{"role": "user", "content": "请给出下一步"}]
+        try:
+            # 预先建立全部连接，不把TCP握手计入
+            await asyncio.gather(*(client.complete(messages) for _ in range(concurrency)))
+            start, cpu = time.perf_counter(), time.process_time()
+            await asyncio.gather(*(client.complete(messages) for _ in range(requests)))
+            elapsed, cpu = time.perf_counter() - start, time.process_time() - cpu
+            return {"requests_per_sec": requests / elapsed, "client_cpu_per_request_us": cpu / requests * 1e6}
+        finally:
+            await client.aclose()
+    return asyncio.run(burst())
+
+def run(repeat: int = 5, latency: float = 0.05, requests: int = 128, concurrency: int = 32) -> Dict[str, float]:
+    offline_env()
+    from src.go_ai import GoAI
+    from src.qwen_ai import QwenGoAI
+    from src.go_board import Stone
+
+    results: Dict[str, float] = {}
+    board = replay(random_game(19, 60, seed=5))
+    with MockServer(seed=0) as server:
+        go_ai = GoAI(base_url=server.dashscope_base_url)
+        qwen = QwenGoAI(base_url=server.openai_base_url)
+        history = board.move_history
+
+        def quick_move():
+            go_ai.cache = ResponseCache(db_path=None)
+            return go_ai.request_quick_move(board, history, Stone.BLACK)
+
+        def analysis():
+            qwen.cache = ResponseCache(db_path=None)
+            return qwen.analyze_position(board, Stone.BLACK)
+
+        results["quick_move_ms"] = measure(quick_move, repeat) * 1e3
+        results["analysis_ms"] = measure(analysis, repeat) * 1e3
+
+    # 服务端固定延迟、单独进程；见模块说明，吞吐量通常受CPU而不是并发数限制
+    with external_server("--latency", str(latency), "--seed", "0") as url:
+        measured = _concurrent_rps(f"{url}/compatible-mode/v1", requests, concurrency)
+        with urllib.request.urlopen(f"{url}/stats") as response:
+            stats = json.load(response)
+    results[f"async_c{concurrency}_requests_per_sec"] = measured["requests_per_sec"]
+    results["async_client_cpu_per_request_us"] = measured["client_cpu_per_request_us"]
+    if latency > 0:
+        results[f"async_c{concurrency}_latency_bound_rps"] = concurrency / latency
+    results["server_peak_active"] = stats["peak_active"]
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="端到端请求基准(本地模拟服务器)")
+    parser.add_argument("--repeat", type=int, default=5, help="每项测量的轮数，取最快一轮")
+    parser.add_argument("--latency", type=float, default=0.05, help="并发测试中服务端的固定延迟(秒)")
+    parser.add_argument("--requests", type=int, default=128, help="并发测试的请求数")
+    parser.add_argument("--concurrency", type=int, default=32, help="并发测试的同时请求数")
+    args = parser.parse_args(argv)
+    print(json.dumps(run(args.repeat, args.latency, args.requests, args.concurrency), indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+坐标提取的准确率和吞吐量基准
+语料为data/move_replies.jsonl中的模型回复，每条标注了期望的落子和已被占用的点；
+对比原来逐个正则取第一个匹配的做法(legacy)与src.move_parser。
+
+示例：
+    python benchmarks/bench_move_parser.py --repeat 200
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.common import measure
+from src.move_parser import best_move
+
+CORPUS = os.path.join(ROOT, "benchmarks", "data", "move_replies.jsonl")
+# 按提示词要求的格式作答(以"行,列"开头)的回复，实际对局中最常见
+FORMATTED = re.compile(r"[\s(（]*\d{1,2}\s*[,，]\s*\d{1,2}")
+
+LEGACY_PATTERNS = [
+    r"(\d+)[,，]\s*(\d+)",
+    r"(\d+)\s*[,，]\s*(\d+)",
+    r"(\d+)\s+(\d+)",
+    r"(\d+)-(\d+)",
+    r"(\d+)\.(\d+)",
+    r"(\d+)\s*行\s*(\d+)\s*列",
+    r"(\d+)\s*列\s*(\d+)\s*行",
+    r"(\d+)\s*,\s*(\d+)",
+]
+
+def legacy_move(text: str, origin: int, is_legal: Callable[[int, int], bool]) -> Optional[Tuple[int, int]]:
+    """原GoAI.extract_coordinates：按顺序尝试各个正则，取第一个在棋盘内的匹配，不合法即失败"""
+    for pattern in LEGACY_PATTERNS:
+        matches = re.findall(pattern, text)
+        if matches:
+            row, col = int(matches[0][0]) - origin, int(matches[0][1]) - origin
+            if 0 <= row < 19 and 0 <= col < 19:
+                return (row, col) if is_legal(row, col) else None
+    return None
+
+def parser_move(text: str, origin: int, is_legal: Callable[[int, int], bool]) -> Optional[Tuple[int, int]]:
+    return best_move(text, 19, origin, is_legal)
+
+def load_corpus(path: str = CORPUS) -> List[Dict]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def evaluate(extract, corpus: List[Dict], repeat: int) -> Dict[str, float]:
+    cases = []
+    for record in corpus:
+        origin = record["origin"]
+        occupied = {(r - origin, c - origin) for r, c in record["occupied"]}
+        expected = record["expected"]
+        expected = (expected[0] - origin, expected[1] - origin) if expected else None
+        cases.append((record["text"], origin, lambda r, c, occupied=occupied: (r, c) not in occupied, expected))
+
+    correct = wrong = 0
+    failures = []
+    for text, origin, is_legal, expected in cases:
+        move = extract(text, origin, is_legal)
+        if move == expected:
+            correct += 1
+        else:
+            failures.append(text[:40].replace("\n", " "))
+            # 提取出错误的落子比没提取到更糟：要么下错棋，要么多付一次请求
+            wrong += move is not None
+
+    formatted = [case for case in cases if FORMATTED.match(case[0])]
+    return {
+        "accuracy": correct / len(cases),
+        "wrong": wrong,
+        "replies_per_sec": throughput(extract, cases, repeat),
+        "formatted_replies_per_sec": throughput(extract, formatted, repeat),
+        "failures": failures,
+    }
+
+def throughput(extract, cases: List[Tuple], repeat: int, rounds: int = 5) -> float:
+    """每秒处理的回复数，取多轮中最快的一轮以减少干扰"""
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for text, origin, is_legal, _ in cases:
+                extract(text, origin, is_legal)
+        best = min(best, time.perf_counter() - start)
+    return repeat * len(cases) / best
+
+def run(repeat: int = 100, corpus_path: str = CORPUS) -> Dict[str, float]:
+    """供python -m benchmarks汇总的指标"""
+    from benchmarks.bench_prompt import make_ais
+    go_ai, _ = make_ais()
+    corpus = load_corpus(corpus_path)
+    results: Dict[str, float] = {"corpus_size": len(corpus)}
+    for name, extract in (("legacy", legacy_move), ("move_parser", parser_move)):
+        result = evaluate(extract, corpus, repeat)
+        results[f"{name}_accuracy"] = result["accuracy"]
+        results[f"{name}_wrong_moves"] = result["wrong"]
+        results[f"{name}_replies_per_sec"] = result["replies_per_sec"]
+        results[f"{name}_formatted_replies_per_sec"] = result["formatted_replies_per_sec"]
+    texts = [record["text"] for record in corpus]
+    elapsed = measure(lambda: [go_ai.extract_coordinates(text) for text in texts], 3)
+    results["extract_coordinates_per_sec"] = len(texts) / elapsed
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="坐标提取基准")
+    parser.add_argument("--corpus", default=CORPUS, help="回复语料(JSON Lines)")
+    parser.add_argument("--repeat", type=int, default=100, help="吞吐量测试的重复次数")
+    parser.add_argument("--verbose", action="store_true", help="列出提取错误的回复")
+    args = parser.parse_args(argv)
+
+    corpus = load_corpus(args.corpus)
+    print(f"语料：{len(corpus)}条回复")
+    for name, extract in (("legacy", legacy_move), ("move_parser", parser_move)):
+        result = evaluate(extract, corpus, args.repeat)
+        print(f"{name:12s} 准确率 {result['accuracy']:6.1%}  错误落子 {result['wrong']:3d}  "
+              f"{result['replies_per_sec']:10.0f} 条/秒  按格式回答 {result['formatted_replies_per_sec']:8.0f} 条/秒")
+        if args.verbose:
+            for text in result["failures"]:
+                print(f"    × {text}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+提示词构建耗时基准
+在不同手数的局面下测量GoAI.get_board_state_description和QwenGoAI._board_to_text，
+并测量整盘对局逐手构建(棋盘编码增量更新)时每手的平均耗时。不调用模型。
+
+示例：
+    python benchmarks/bench_prompt.py
+"""
+
+import argparse
+import json
+import os
+import sys
+from typing import Dict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import measure, offline_env, random_game, replay
+from src.prompt_encoding import estimate_tokens
+from src.response_cache import ResponseCache
+
+GAME_LENGTHS = (0, 50, 150, 300)
+
+def make_ais():
+    offline_env()
+    from src.go_ai import GoAI
+    from src.qwen_ai import QwenGoAI
+    return GoAI(cache=ResponseCache(db_path=None)), QwenGoAI(cache=ResponseCache(db_path=None))
+
+def run(repeat: int = 5) -> Dict[str, float]:
+    go_ai, qwen = make_ais()
+    game = random_game(19, max(GAME_LENGTHS), seed=3)
+    results: Dict[str, float] = {}
+    for length in GAME_LENGTHS:
+        board = replay(game[:length])
+        state = board.get_board_state()
+        history = board.move_history
+        player = game[length][2] if length < len(game) else game[-1][2].opponent
+        # 同一局面重复构建：编码器已同步，只剩拼接文本的开销
+        results[f"describe_at_{length}_us"] = measure(
+            lambda: go_ai.get_board_state_description(history, player, state), repeat) * 1e6
+        results[f"board_to_text_at_{length}_us"] = measure(lambda: qwen._board_to_text(state), repeat) * 1e6
+        results[f"description_tokens_at_{length}"] = estimate_tokens(
+            go_ai.get_board_state_description(history, player, state))
+
+    # 对局中每手都要重新构建一次提示词，编码器按落子增量更新
+    def whole_game():
+        board = replay([])
+        state = board.get_board_state()
+        for row, col, stone in game:
+            board.place_stone(row, col, stone)
+            go_ai.get_board_state_description(board.move_history, stone.opponent, state)
+    results["describe_per_move_us"] = measure(whole_game, repeat) / len(game) * 1e6
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="提示词构建基准")
+    parser.add_argument("--repeat", type=int, default=5, help="每项测量的轮数，取最快一轮")
+    args = parser.parse_args(argv)
+    print(json.dumps(run(args.repeat), indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
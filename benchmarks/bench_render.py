@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+棋盘绘制耗时基准
+逐手回放一盘对局，测量BoardRenderer按整盘做差(update，即draw_board)和按对局事件(apply)更新的每手耗时，
+以及新建画布时网格加整盘棋子的首次绘制耗时。
+
+有显示器时(例如在xvfb-run下运行)使用真实的Tk画布并在每手后刷新；没有时使用记录调用的虚拟画布，
+此时耗时只包含渲染器自身和画布调用次数，不含Tk的绘制。
+
+示例：
+    xvfb-run python benchmarks/bench_render.py --backend tk
+    python benchmarks/bench_render.py
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import random_game
+from src.board_renderer import BoardRenderer
+from src.game_state import GameState
+from src.go_board import Stone
+
+HIGHLIGHT_COLORS = {Stone.BLACK: ["#FF6B6B", "#FF8E8E", "#FFB1B1", "#FFD4D4"],
+                    Stone.WHITE: ["#4ECDC4", "#7EDDD6", "#A8E6E1", "#C2F0EB"]}
+
+class VirtualCanvas:
+    """只记录item及调用次数的画布，接口与BoardRenderer用到的tk.Canvas方法一致"""
+
+    def __init__(self):
+        self.items: Dict[int, Dict] = {}
+        self.calls = 0
+
+    def _create(self, coords, options) -> int:
+        self.calls += 1
+        item = len(self.items) + 1
+        self.items[item] = dict(options, coords=coords)
+        return item
+
+    def create_line(self, *coords, **options) -> int:
+        return self._create(coords, options)
+
+    def create_oval(self, *coords, **options) -> int:
+        return self._create(coords, options)
+
+    def itemconfigure(self, item, **options):
+        self.calls += 1
+        self.items[item].update(options)
+
+    def coords(self, item, *coords):
+        self.calls += 1
+        self.items[item]["coords"] = coords
+
+    def tag_raise(self, item):
+        self.calls += 1
+
+def make_canvas(backend: str):
+    """返回(画布, 刷新函数, 实际使用的后端)"""
+    if backend in ("auto", "tk"):
+        try:
+            import tkinter as tk
+            root = tk.Tk()
+        except Exception as e:  # 没有显示器时Tk无法创建窗口
+            if backend == "tk":
+                raise RuntimeError(f"无法创建Tk窗口，请在xvfb-run下运行: {e}")
+        else:
+            canvas = tk.Canvas(root, width=600, height=600, bg="#DEB887")
+            canvas.pack()
+            root.update()
+            return canvas, root.update_idletasks, "tk"
+    return VirtualCanvas(), lambda: None, "virtual"
+
+def record_game(moves: int = 300, seed: int = 4) -> List:
+    """回放随机对局，记下每手的事件、该手之后的局面和最新一手，计时时不再包含规则计算"""
+    game = GameState(19)
+    frames = []
+    game.subscribe(lambda event: frames.append((event, game.board.copy(), game.last_move)))
+    for row, col, stone in random_game(19, moves, seed):
+        game.play(row, col, stone)
+    return frames
+
+def _per_move(frames, canvas_factory, step, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        renderer, flush = canvas_factory()
+        start = time.perf_counter()
+        for frame in frames:
+            step(renderer, *frame)
+            flush()
+        best = min(best, time.perf_counter() - start)
+    return best / len(frames)
+
+def run(repeat: int = 5, backend: str = "auto") -> Dict[str, Any]:
+    canvas, flush, used = make_canvas(backend)
+    frames = record_game()
+    canvases = [canvas]
+
+    def fresh():
+        # 每轮使用新的渲染器；虚拟画布同时换新，真实画布清空后复用
+        if used == "virtual":
+            canvases[0] = VirtualCanvas()
+        else:
+            canvases[0].delete("all")
+        return BoardRenderer(canvases[0], 19, highlight_colors=HIGHLIGHT_COLORS), flush
+
+    results: Dict[str, Any] = {"backend": used, "moves": len(frames)}
+    results["update_per_move_us"] = _per_move(
+        frames, fresh, lambda renderer, event, board, last: renderer.update(board, last), repeat) * 1e6
+    results["apply_per_move_us"] = _per_move(
+        frames, fresh, lambda renderer, event, board, last: renderer.apply(event, board, last), repeat) * 1e6
+    if used == "virtual":
+        grid_calls = BoardRenderer(VirtualCanvas(), 19).canvas.calls
+        results["canvas_calls_per_move"] = (canvases[0].calls - grid_calls) / len(frames)
+
+    _, final_board, last_move = frames[-1]
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        renderer, _ = fresh()
+        renderer.update(final_board, last_move)
+        flush()
+        best = min(best, time.perf_counter() - start)
+    results["full_redraw_us"] = best * 1e6
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="棋盘绘制基准")
+    parser.add_argument("--repeat", type=int, default=5, help="每项测量的轮数，取最快一轮")
+    parser.add_argument("--backend", choices=("auto", "tk", "virtual"), default="auto",
+                        help="画布后端：auto在有显示器时使用Tk")
+    args = parser.parse_args(argv)
+    print(json.dumps(run(args.repeat, args.backend), indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+# Shared helpers for the benchmarks: timing, deterministic games and offline AI construction
+import os
+import random
+import sys
+import timeit
+from typing import Callable, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from src.go_board import GoBoard, Stone
+
+Move = Tuple[int, int, Stone]
+
+def measure(fn: Callable[[], object], repeat: int = 5) -> float:
+    """fn单次调用的耗时(秒)：先自动确定每轮次数(每轮至少0.2秒)，再取repeat轮中最快的一轮"""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number
+
+def random_game(size: int = 19, moves: int = 200, seed: int = 0) -> List[Move]:
+    """用固定种子随机对下，返回落子序列(含提子)，同样的参数总得到同样的对局；无处可下时提前结束"""
+    rng = random.Random(seed)
+    board = GoBoard(size)
+    stone = Stone.BLACK
+    history = []
+    for _ in range(moves):
+        valid = board.get_valid_moves(stone)
+        if not valid:
+            break
+        row, col = rng.choice(valid)
+        board.place_stone(row, col, stone)
+        history.append((row, col, stone))
+        stone = stone.opponent
+    return history
+
+def replay(moves: List[Move], size: int = 19, board: Optional[GoBoard] = None) -> GoBoard:
+    board = board if board is not None else GoBoard(size)
+    for row, col, stone in moves:
+        board.place_stone(row, col, stone)
+    return board
+
+def offline_env():
+    """基准不调用模型：给出占位的API密钥，关闭开局库，之后创建的AI只使用内存缓存"""
+    os.environ.setdefault("DASHSCOPE_API_KEY", "benchmark")
+    os.environ["OPENING_BOOK_PATH"] = ""
+    os.environ["AI_CACHE_PATH"] = ""
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+比较两次基准结果(python -m benchmarks生成的JSON)
+指标名以_per_sec/_accuracy结尾的越大越好，以_us结尾的越小越好，其余只列出不判断；
+变化超过阈值的列为提升或退化，有退化时退出码为1，便于在提交前检查。
+
+示例：
+    python -m benchmarks.compare .cache/benchmarks/1a2b3c4.json .cache/benchmarks/5d6e7f8.json
+"""
+
+import argparse
+import json
+import sys
+from typing import Any, Dict, List, NamedTuple, Optional
+
+class Change(NamedTuple):
+    suite: str
+    metric: str
+    before: float
+    after: float
+    ratio: float  # after / before
+    verdict: str  # "better"、"worse"、"same"或"info"
+
+def load(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def direction(metric: str) -> int:
+    """1表示越大越好，-1表示越小越好，0表示不判断"""
+    if metric.endswith(("_per_sec", "_accuracy")):
+        return 1
+    if metric.endswith("_us"):
+        return -1
+    return 0
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 0.05) -> List[Change]:
+    """逐项比较两次结果中都有的数值指标"""
+    changes = []
+    for suite, metrics in current["benchmarks"].items():
+        before_metrics = baseline["benchmarks"].get(suite, {})
+        for metric, after in metrics.items():
+            before = before_metrics.get(metric)
+            if not isinstance(after, (int, float)) or not isinstance(before, (int, float)) or isinstance(after, bool):
+                continue
+            ratio = after / before if before else float("inf") if after else 1.0
+            sign = direction(metric)
+            if sign == 0:
+                verdict = "info"
+            elif abs(ratio - 1.0) <= threshold:
+                verdict = "same"
+            else:
+                verdict = "better" if (ratio > 1.0) == (sign > 0) else "worse"
+            changes.append(Change(suite, metric, before, after, ratio, verdict))
+    return changes
+
+def report(changes: List[Change], baseline: Dict[str, Any], current: Dict[str, Any],
+           show_all: bool = False) -> str:
+    marks = {"better": "↑", "worse": "↓", "same": " ", "info": " "}
+    lines = [f"{baseline.get('commit', '?')} -> {current.get('commit', '?')}"]
+    for change in changes:
+        if not show_all and change.verdict in ("same", "info"):
+            continue
+        lines.append(f"{marks[change.verdict]} {change.suite}.{change.metric:32s} "
+                     f"{change.before:12.4g} -> {change.after:12.4g}  ({change.ratio - 1.0:+.1%})")
+    worse = sum(change.verdict == "worse" for change in changes)
+    better = sum(change.verdict == "better" for change in changes)
+    lines.append(f"提升{better}项，退化{worse}项，共比较{len(changes)}项")
+    return "\n".join(lines)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="比较两次基准结果")
+    parser.add_argument("baseline", help="基准(旧)结果JSON")
+    parser.add_argument("current", help="当前(新)结果JSON")
+    parser.add_argument("--threshold", type=float, default=0.05, help="变化超过该比例才算提升或退化")
+    parser.add_argument("--all", action="store_true", help="列出所有指标，包括无明显变化的")
+    args = parser.parse_args(argv)
+    baseline, current = load(args.baseline), load(args.current)
+    changes = compare(baseline, current, args.threshold)
+    print(report(changes, baseline, current, args.all))
+    return 1 if any(change.verdict == "worse" for change in changes) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
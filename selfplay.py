@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+无界面自对弈/对抗赛
+在多个进程中让两个引擎(qwen/mcts/book/random)对下N局，
+每局写入对局存档(可选同时保存SGF)，最后给出胜率及其置信区间。
+
+示例：
+    python selfplay.py --engine-a mcts:max_playouts=400,time_limit=None --engine-b random --games 100
+"""
+
+import argparse
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.go_board import GoBoard, Stone
+from src.engines import create_engine, parse_engine_spec
+from src.game_archive import ArchiveWriter
+from src import sgf
+
+_engines: Dict[Tuple[str, Stone], object] = {}
+
+def _reseed(engine, seed: int):
+    """重设引擎(及其后备引擎)的随机数发生器，使同一种子的对局可以复现"""
+    while engine is not None:
+        rng = getattr(engine, "rng", None)
+        if rng is not None:
+            rng.seed(seed)
+        engine = getattr(engine, "fallback", None)
+
+def _get_engine(spec: str, color: Stone, seed: int):
+    """每个进程按(描述, 执子颜色)缓存引擎，Qwen客户端、开局库等只初始化一次；每局都按seed重设随机数
+
+    同一描述的两个引擎执黑执白时各用一个实例，互不共享随机数。
+    """
+    engine = _engines.get((spec, color))
+    if engine is None:
+        engine = _engines[(spec, color)] = create_engine(spec, seed)
+    _reseed(engine, seed)
+    return engine
+
+def play_game(black_spec: str, white_spec: str, size: int, komi: float, max_moves: int,
+              seed: int) -> Tuple[List[Tuple[int, int, Stone]], Stone, float, float]:
+    """下完一局，返回(着手, 胜方, 黑方得分, 白方得分)；双方连续过手或达到手数上限即终局，按数子法计分"""
+    engines = {Stone.BLACK: _get_engine(black_spec, Stone.BLACK, seed),
+               Stone.WHITE: _get_engine(white_spec, Stone.WHITE, seed + 1)}
+    board = GoBoard(size)
+    player = Stone.BLACK
+    passes = 0
+    while passes < 2 and len(board.move_history) < max_moves:
+        move = engines[player].get_best_move(board, player)
+        if move is not None and board.place_stone(move[0], move[1], player):
+            passes = 0
+        else:
+            board.pass_move(player)
+            passes += 1
+        player = player.opponent
+
+    black_score, white_score = board.get_area_score()
+    white_score += komi
+    if black_score == white_score:
+        winner = Stone.EMPTY
+    else:
+        winner = Stone.BLACK if black_score > white_score else Stone.WHITE
+    return board.move_history, winner, black_score, white_score
+
+def wilson_interval(wins: float, games: int, z: float = 1.96) -> Tuple[float, float]:
+    """胜率的Wilson置信区间，默认95%"""
+    if games == 0:
+        return 0.0, 1.0
+    p = wins / games
+    denominator = 1 + z * z / games
+    centre = (p + z * z / (2 * games)) / denominator
+    half = z * math.sqrt(p * (1 - p) / games + z * z / (4 * games * games)) / denominator
+    return max(0.0, centre - half), min(1.0, centre + half)
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="无界面自对弈/对抗赛")
+    parser.add_argument("--engine-a", default="mcts", help="引擎A，格式：名称[:参数=值,...]")
+    parser.add_argument("--engine-b", default="random", help="引擎B，格式同上")
+    parser.add_argument("--games", type=int, default=10, help="对局数")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="进程数")
+    parser.add_argument("--size", type=int, default=19, help="棋盘大小")
+    parser.add_argument("--komi", type=float, default=7.5, help="贴目")
+    parser.add_argument("--max-moves", type=int, default=722, help="每局手数上限")
+    parser.add_argument("--no-swap", action="store_true", help="不交换先后手(默认每局轮换，A在偶数局执黑)")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    parser.add_argument("--output", default=os.path.join("selfplay", "games.arc"), help="对局存档，已存在时追加")
+    parser.add_argument("--sgf-dir", help="同时把每局保存为SGF的目录")
+    args = parser.parse_args(argv)
+    for spec in (args.engine_a, args.engine_b):
+        try:
+            parse_engine_spec(spec)
+        except ValueError as e:
+            parser.error(str(e))
+    return args
+
+def main(argv: List[str]) -> int:
+    args = parse_args(argv)
+    if args.sgf_dir:
+        os.makedirs(args.sgf_dir, exist_ok=True)
+
+    print(f"引擎A: {args.engine_a}  引擎B: {args.engine_b}  共{args.games}局，{args.workers}个进程")
+    a_wins = draws = failed = 0
+    a_black_wins = a_black_games = 0
+    start = time.time()
+    with ArchiveWriter(args.output, args.size, append=True) as archive, \
+            ProcessPoolExecutor(max_workers=args.workers) as executor:
+        futures = {}
+        for game in range(args.games):
+            a_is_black = args.no_swap or game % 2 == 0
+            black, white = (args.engine_a, args.engine_b) if a_is_black else (args.engine_b, args.engine_a)
+            future = executor.submit(play_game, black, white, args.size, args.komi, args.max_moves,
+                                     args.seed + 2 * game)
+            futures[future] = (game, a_is_black, black, white)
+
+        for future in as_completed(futures):
+            game, a_is_black, black, white = futures[future]
+            try:
+                moves, winner, black_score, white_score = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"第{game + 1}局出错: {e}")
+                continue
+
+            index = archive.add_game(moves, winner, args.komi)
+            if args.sgf_dir:
+                result = "0" if winner == Stone.EMPTY else \
+                    f"{'B' if winner == Stone.BLACK else 'W'}+{abs(black_score - white_score):g}"
+                text = sgf.dumps(moves, args.size, args.komi, {"PB": black, "PW": white, "RE": result})
+                sgf.save(os.path.join(args.sgf_dir, f"game_{index:06d}.sgf"), text)
+
+            a_won = winner == (Stone.BLACK if a_is_black else Stone.WHITE)
+            if winner == Stone.EMPTY:
+                draws += 1
+            elif a_won:
+                a_wins += 1
+            if a_is_black:
+                a_black_games += 1
+                a_black_wins += a_won
+            winner_name = "和棋" if winner == Stone.EMPTY else ("A胜" if a_won else "B胜")
+            print(f"第{game + 1}局: 黑{black} vs 白{white}，{len(moves)}手，"
+                  f"黑{black_score:g} 白{white_score:g}，{winner_name}")
+
+    played = args.games - failed
+    if played == 0:
+        print("没有完成的对局")
+        return 1
+    score = a_wins + 0.5 * draws
+    low, high = wilson_interval(score, played)
+    a_white_games = played - a_black_games
+    a_white_wins = a_wins - a_black_wins
+    print("=" * 50)
+    print(f"完成{played}局(失败{failed}局)，用时{time.time() - start:.1f}秒，已写入{args.output}")
+    print(f"引擎A胜率: {score / played:.1%}  95%置信区间: [{low:.1%}, {high:.1%}]  "
+          f"(胜{a_wins} 负{played - a_wins - draws} 和{draws})")
+    if a_black_games:
+        print(f"  A执黑: {a_black_wins}/{a_black_games}")
+    if a_white_games:
+        print(f"  A执白: {a_white_wins}/{a_white_games}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+# Background executor for GUI model work: futures, supersede/cancel, results delivered on the Tk thread
+import threading
+import tkinter as tk
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+class AIExecutor:
+    """界面的AI任务执行器：模型请求都在后台线程池里执行，结果经root.after回到Tk主线程
+
+    每个任务属于一个通道(如"suggestion"、"analysis"、"move")。同一通道提交新任务即取代旧任务：
+    旧任务尚未开始时直接取消，已在进行时其结果被丢弃，因此过时的分析不会覆盖新的结果。
+    局面改变时用cancel()作废相关通道。回调总在主线程执行，可以直接操作界面。
+    """
+
+    def __init__(self, root, workers: int = 4):
+        self.root = root
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ai")
+        self._current: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.superseded = 0
+
+    def submit(self, channel: str, fn: Callable, *args, on_result: Optional[Callable[[Any], None]] = None,
+               on_error: Optional[Callable[[BaseException], None]] = None, **kwargs) -> Future:
+        """在后台执行fn(*args, **kwargs)，返回Future；完成后在主线程以结果调用on_result，出错时调用on_error"""
+        future = self.executor.submit(fn, *args, **kwargs)
+        with self._lock:
+            previous = self._current.get(channel)
+            self._current[channel] = future
+        if previous is not None and not previous.done():
+            previous.cancel()
+            self.superseded += 1
+        future.add_done_callback(lambda f: self._schedule(channel, f, on_result, on_error))
+        return future
+
+    def _schedule(self, channel: str, future: Future, on_result, on_error):
+        # 在工作线程中调用，界面操作一律转到主线程
+        if future.cancelled() or not self.is_current(channel, future):
+            return
+        try:
+            self.root.after(0, lambda: self._deliver(channel, future, on_result, on_error))
+        except (RuntimeError, tk.TclError):
+            pass  # 窗口已关闭(主循环已退出或根窗口已销毁)
+
+    def _deliver(self, channel: str, future: Future, on_result, on_error):
+        # 排队等待主线程期间可能已被取代或取消，交付前再确认一次
+        with self._lock:
+            if self._current.get(channel) is not future:
+                return
+            del self._current[channel]
+        error = future.exception()
+        if error is not None:
+            if on_error:
+                on_error(error)
+        elif on_result:
+            on_result(future.result())
+
+    def is_current(self, channel: str, future: Future) -> bool:
+        with self._lock:
+            return self._current.get(channel) is future
+
+    def busy(self, channel: str) -> bool:
+        """该通道是否有尚未交付的任务"""
+        with self._lock:
+            return channel in self._current
+
+    def cancel(self, *channels: str):
+        """作废指定通道(不给出时为全部通道)的任务：未开始的取消，已在进行的结果丢弃"""
+        with self._lock:
+            names = channels or tuple(self._current)
+            futures = [self._current.pop(name) for name in names if name in self._current]
+        for future in futures:
+            future.cancel()
+
+    def shutdown(self):
+        self.cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+# asyncio Qwen backend: pooled keep-alive connections, bounded concurrency, timeouts and retries
+import asyncio
+import random
+import threading
+import weakref
+from concurrent.futures import Future
+from typing import Any, Coroutine, Dict, List, NamedTuple, Optional, Sequence, Tuple
+import httpx
+import openai
+from openai import AsyncOpenAI
+from src.go_board import GoBoard, Stone
+from src.qwen_ai import QwenGoAI, DASHSCOPE_BASE_URL
+
+# 这些错误重试可能成功；其余(鉴权失败、请求格式错误等)直接抛出
+RETRYABLE_ERRORS = (openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError,
+                    asyncio.TimeoutError)
+
+class _LoopClient(NamedTuple):
+    """绑定到一个事件循环的连接池、SDK客户端和并发信号量"""
+    http: httpx.AsyncClient
+    client: AsyncOpenAI
+    semaphore: asyncio.Semaphore
+
+class AsyncQwenClient:
+    """异步Qwen客户端
+
+    同一事件循环中的请求共用一个httpx连接池(保持长连接，不重复TLS握手)，信号量限制同时在途的请求数，
+    每个请求有独立超时，可重试的错误按带抖动的指数退避重试。
+    连接池和信号量都只能在创建它们的事件循环中使用，因此按事件循环各建一份：同一个客户端可以同时被
+    后台事件循环(同步接口)和调用方自己的事件循环使用，并发上限按事件循环分别计算。
+    """
+
+    def __init__(self, api_key: str, model_name: str = "qwen-plus", base_url: str = DASHSCOPE_BASE_URL,
+                 max_concurrency: int = 32, max_connections: int = 64, timeout: float = 30.0,
+                 max_retries: int = 3, backoff: float = 0.5, max_backoff: float = 10.0):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.model_name = model_name
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_concurrency = max_concurrency
+        self.max_connections = max_connections
+        self.api_key = api_key
+        self.base_url = base_url
+        # 事件循环关闭并被回收后，对应的连接池随之释放
+        self._loops: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopClient]" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.retries = 0
+
+    def _loop_client(self) -> _LoopClient:
+        """当前事件循环的连接池和信号量，第一次使用时创建"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            resources = self._loops.get(loop)
+            if resources is None:
+                http = httpx.AsyncClient(
+                    limits=httpx.Limits(max_connections=self.max_connections,
+                                        max_keepalive_connections=self.max_connections),
+                    timeout=httpx.Timeout(self.timeout, connect=min(self.timeout, 10.0)),
+                )
+                # 重试由本类负责，关掉SDK自带的重试以免次数叠加
+                client = AsyncOpenAI(api_key=self.api_key, base_url=self.base_url, http_client=http, max_retries=0)
+                resources = self._loops[loop] = _LoopClient(http, client, asyncio.Semaphore(self.max_concurrency))
+            return resources
+
+    async def complete(self, messages: List[Dict[str, str]], temperature: float = 0.3, max_tokens: int = 1000,
+                       timeout: Optional[float] = None) -> str:
+        """发送一次对话请求并返回回复文本，重试耗尽后抛出最后一次的错误"""
+        timeout = self.timeout if timeout is None else timeout
+        resources = self._loop_client()
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with resources.semaphore:
+                    self.in_flight += 1
+                    try:
+                        response = await asyncio.wait_for(resources.client.chat.completions.create(
+                            model=self.model_name,
+                            messages=messages,
+                            temperature=temperature,
+                            max_tokens=max_tokens,
+                        ), timeout)
+                    finally:
+                        self.in_flight -= 1
+                return response.choices[0].message.content
+            except RETRYABLE_ERRORS as e:
+                if attempt == self.max_retries:
+                    raise
+                self.retries += 1
+                # 等待期间不占用并发名额
+                await asyncio.sleep(self._retry_delay(attempt, e))
+
+    def _retry_delay(self, attempt: int, error: Exception) -> float:
+        """指数退避加全抖动；429带Retry-After时至少等到服务端要求的时间"""
+        delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+        response = getattr(error, "response", None)
+        if response is not None:
+            try:
+                delay = max(delay, float(response.headers.get("retry-after", 0)))
+            except ValueError:
+                pass
+        return delay
+
+    async def aclose(self):
+        """关闭当前事件循环的连接池"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            resources = self._loops.pop(loop, None)
+        if resources is not None:
+            await resources.http.aclose()
+
+class AsyncQwenGoAI(QwenGoAI):
+    """QwenGoAI的异步版本：提示词、缓存和开局库与同步版相同，模型请求走AsyncQwenClient
+
+    一个事件循环即可同时为多局棋发出请求(在途数受max_concurrency限制)，例如：
+        moves = await ai.get_best_moves([(board1, Stone.BLACK), (board2, Stone.WHITE)])
+    吞吐量不超过max_concurrency / 服务端延迟，也受客户端每个请求的CPU开销(httpx约数毫秒)限制，
+    实际数值见benchmarks/bench_e2e.py。
+    """
+
+    def __init__(self, model_name: str = "qwen-plus", client: Optional[AsyncQwenClient] = None, **kwargs):
+        super().__init__(model_name, **kwargs)
+        self.async_client = client if client is not None else AsyncQwenClient(self.api_key, model_name, self.base_url)
+
+    async def analyze_position_async(self, board: GoBoard, current_player: Stone,
+                                     symmetric: bool = False) -> Dict[str, Any]:
+        """异步分析当前局面，参数和返回值与analyze_position相同"""
+        try:
+            cache_key, frame, reply_frame, content = self._cached_analysis(board, current_player, symmetric)
+            if content is None:
+                messages, turn = self._request_messages(board, current_player)
+                content = await self.async_client.complete(messages, temperature=0.3, max_tokens=1000)
+                self._remember_analysis(cache_key, frame, content, turn)
+            return self._parse_analysis(content, reply_frame, frame, board.size)
+        except Exception as e:
+            return self._analysis_error(e)
+
+    async def get_best_move_async(self, board: GoBoard, current_player: Stone) -> Optional[Tuple[int, int]]:
+        """异步获取最佳落子，返回值与get_best_move相同"""
+        book_move = self._book_move(board, current_player)
+        if book_move is not None:
+            return book_move
+        analysis = await self.analyze_position_async(board, current_player, symmetric=True)
+        return self._choose_move(analysis, board, current_player)
+
+    async def get_best_moves(self, positions: Sequence[Tuple[GoBoard, Stone]]) -> List[Optional[Tuple[int, int]]]:
+        """并发获取多个局面的最佳落子，顺序与positions一致"""
+        return await asyncio.gather(*(self.get_best_move_async(board, player) for board, player in positions))
+
+    def get_best_move(self, board: GoBoard, current_player: Stone) -> Optional[Tuple[int, int]]:
+        """同步接口：把请求交给后台事件循环并等待结果，供GUI和selfplay等同步调用方使用"""
+        return background_loop().submit(self.get_best_move_async(board, current_player)).result()
+
+    async def aclose(self):
+        await self.async_client.aclose()
+
+class BackgroundLoop:
+    """在一个守护线程里常驻运行的事件循环，让同步代码也能提交协程"""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+    def submit(self, coroutine: Coroutine) -> Future:
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+_background_loop: Optional[BackgroundLoop] = None
+_background_lock = threading.Lock()
+
+def background_loop() -> BackgroundLoop:
+    """进程内共享的后台事件循环，第一次使用时启动"""
+    global _background_loop
+    with _background_lock:
+        if _background_loop is None:
+            _background_loop = BackgroundLoop()
+        return _background_loop
@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+# Batched Go Boards: N games in one (N, size, size) int8 array
+import numpy as np
+from typing import Optional, Sequence
+from src.go_board import GoBoard, Stone
+
+PASS = -1
+
+class BatchGoBoard:
+    """批量棋盘：用一个(N, size, size)的int8数组同时推进N盘棋
+
+    落子、提子和合法点计算都对整批棋盘做向量化运算，适合自对弈和评测。
+    棋子取值与Stone一致(0空/1黑/2白)，落子用点位row * size + col表示，PASS(-1)为过手。
+    只实现单劫禁着，不做全局同形检查。
+    """
+
+    def __init__(self, n: int, size: int = 19):
+        self.n = n
+        self.size = size
+        self.boards = np.zeros((n, size, size), dtype=np.int8)
+        self.to_play = np.full(n, Stone.BLACK.value, dtype=np.int8)
+        self.ko = np.full(n, PASS, dtype=np.int32)
+        self.passes = np.zeros(n, dtype=np.int8)
+        self.done = np.zeros(n, dtype=bool)
+        self.move_count = np.zeros(n, dtype=np.int32)
+        self.captured_black = np.zeros(n, dtype=np.int32)
+        self.captured_white = np.zeros(n, dtype=np.int32)
+        self._analysis = None
+
+        # 每个点的四个邻点，不足四个时用-1补齐
+        rows, cols = np.divmod(np.arange(size * size, dtype=np.int32), size)
+        points = rows * size + cols
+        self._neighbor_table = np.stack([
+            np.where(rows > 0, points - size, -1),
+            np.where(rows < size - 1, points + size, -1),
+            np.where(cols > 0, points - 1, -1),
+            np.where(cols < size - 1, points + 1, -1)], axis=1)
+
+    @classmethod
+    def from_go_boards(cls, boards: Sequence[GoBoard], to_play: Sequence[Stone]) -> "BatchGoBoard":
+        """从若干GoBoard复制局面(含劫)组成一批"""
+        batch = cls(len(boards), boards[0].size)
+        for i, (board, stone) in enumerate(zip(boards, to_play)):
+            batch.boards[i] = board.board
+            batch.to_play[i] = stone.value
+            if board.ko_position is not None:
+                batch.ko[i] = board.ko_position[0] * board.size + board.ko_position[1]
+            batch.captured_black[i] = board.captured_black
+            batch.captured_white[i] = board.captured_white
+        batch._analysis = None
+        return batch
+
+    def reset(self, games: Optional[np.ndarray] = None):
+        """把指定的棋局(布尔掩码或下标，默认全部)恢复为空棋盘"""
+        if games is None:
+            games = slice(None)
+        self.boards[games] = 0
+        self.to_play[games] = Stone.BLACK.value
+        self.ko[games] = PASS
+        self.passes[games] = 0
+        self.done[games] = False
+        self.move_count[games] = 0
+        self.captured_black[games] = 0
+        self.captured_white[games] = 0
+        self._analysis = None
+
+    @staticmethod
+    def _any_neighbor(mask: np.ndarray) -> np.ndarray:
+        """对(N, size, size)掩码，某点任一邻点为True"""
+        result = np.zeros_like(mask)
+        result[:, 1:, :] |= mask[:, :-1, :]
+        result[:, :-1, :] |= mask[:, 1:, :]
+        result[:, :, 1:] |= mask[:, :, :-1]
+        result[:, :, :-1] |= mask[:, :, 1:]
+        return result
+
+    def group_labels(self) -> np.ndarray:
+        """给每个棋串一个全批唯一的正整数标号(串内最小点位+1)，空点为0
+
+        对同色相邻的边反复做“挂接+路径压缩”的并查集合并，轮数约为棋串规模的对数级。
+        """
+        n, size = self.n, self.size
+        boards = self.boards
+        stones = boards != 0
+        index = np.arange(n * size * size, dtype=np.int32).reshape(n, size, size)
+        same_v = stones[:, 1:, :] & (boards[:, 1:, :] == boards[:, :-1, :])
+        same_h = stones[:, :, 1:] & (boards[:, :, 1:] == boards[:, :, :-1])
+        a = np.concatenate([index[:, 1:, :][same_v], index[:, :, 1:][same_h]])
+        b = np.concatenate([index[:, :-1, :][same_v], index[:, :, :-1][same_h]])
+
+        parent = index.reshape(-1).copy()
+        while a.size:
+            ra, rb = parent[a], parent[b]
+            pending = ra != rb
+            if not pending.any():
+                break
+            a, b, ra, rb = a[pending], b[pending], ra[pending], rb[pending]
+            # 把较大的根挂到较小的根上，所有指针都指向更小的点位，不会成环
+            parent[np.maximum(ra, rb)] = np.minimum(ra, rb)
+            while True:
+                grand = parent[parent]
+                if np.array_equal(grand, parent):
+                    break
+                parent = grand
+        return np.where(stones, parent.reshape(n, size, size) + 1, 0)
+
+    def _analyze(self):
+        """当前局面的(棋串标号, 每点所在棋串气数)，局面改变前缓存复用"""
+        if self._analysis is None:
+            labels = self.group_labels()
+            # 每个空点对每个相邻棋串贡献一口气，同一棋串从多个方向相邻只算一次
+            points = self.size * self.size
+            empty = np.flatnonzero(self.boards.reshape(-1) == 0)
+            game, local = np.divmod(empty, points)
+            nb = self._neighbor_table[local]
+            nb_labels = np.where(nb >= 0, labels.reshape(-1)[game[:, None] * points + np.maximum(nb, 0)], 0)
+            for i in range(1, 4):
+                dup = (nb_labels[:, i:i + 1] == nb_labels[:, :i]).any(axis=1)
+                nb_labels[dup, i] = 0
+            counts = np.bincount(nb_labels.reshape(-1), minlength=labels.size + 1)
+            counts[0] = 0
+            self._analysis = (labels, counts[labels])
+        return self._analysis
+
+    def liberties(self) -> np.ndarray:
+        """每个棋子所在棋串的气数，空点为0"""
+        return self._analyze()[1]
+
+    def legal_mask(self) -> np.ndarray:
+        """(N, size, size)布尔数组：轮到的一方可落子的点(已排除占用、劫和自杀)"""
+        libs = self.liberties()
+        boards = self.boards
+        own = self.to_play[:, None, None]
+        empty = boards == 0
+        mask = empty & (self._any_neighbor(empty)
+                        | self._any_neighbor((boards == own) & (libs > 1))
+                        | self._any_neighbor((boards == 3 - own) & (libs == 1)))
+        flat = mask.reshape(self.n, -1)
+        ko_games = np.flatnonzero(self.ko >= 0)
+        flat[ko_games, self.ko[ko_games]] = False
+        mask[self.done] = False
+        return mask
+
+    def play(self, moves: Sequence[int]) -> np.ndarray:
+        """每盘各走一手(点位或PASS)，返回每盘是否成功；非法落子和已结束的棋局保持不变"""
+        n = self.n
+        moves = np.asarray(moves, dtype=np.int64).reshape(n)
+        games = np.arange(n)
+        is_pass = moves < 0
+        legal = self.legal_mask().reshape(n, -1)
+        ok = ~self.done & (is_pass | legal[games, np.maximum(moves, 0)])
+        place = ok & ~is_pass
+        placed = np.flatnonzero(place)
+        targets = moves[placed]
+
+        # 被提的是落子点旁只剩一气的对方棋串；标号全批唯一，可以一次性匹配
+        labels, libs = self._analyze()
+        flat = self.boards.reshape(n, -1)
+        nb = self._neighbor_table[targets]
+        nb_safe = np.maximum(nb, 0)
+        opponent = (3 - self.to_play[placed])[:, None]
+        atari = (nb >= 0) & (flat[placed[:, None], nb_safe] == opponent) \
+            & (libs.reshape(n, -1)[placed[:, None], nb_safe] == 1)
+        captured_labels = labels.reshape(n, -1)[placed[:, None], nb_safe][atari]
+        captured = np.isin(labels, captured_labels) if captured_labels.size else np.zeros_like(self.boards, dtype=bool)
+
+        flat[placed, targets] = self.to_play[placed]
+        num_captured = captured.reshape(n, -1).sum(axis=1)
+        self.boards[captured] = 0
+        self._analysis = None
+        white_moved = self.to_play == Stone.WHITE.value
+        self.captured_black += np.where(white_moved, num_captured, 0).astype(np.int32)
+        self.captured_white += np.where(white_moved, 0, num_captured).astype(np.int32)
+
+        # 只提一子且落下的是单子单气时记录劫
+        self.ko[ok] = PASS
+        single = np.flatnonzero(place & (num_captured == 1))
+        if single.size:
+            nb = self._neighbor_table[moves[single]]
+            values = np.where(nb >= 0, flat[single[:, None], np.maximum(nb, 0)], -1)
+            own = self.to_play[single, None]
+            isolated = ((values == own).sum(axis=1) == 0) & ((values == 0).sum(axis=1) == 1)
+            ko_games = single[isolated]
+            self.ko[ko_games] = captured.reshape(n, -1)[ko_games].argmax(axis=1)
+
+        self.passes = np.where(ok, np.where(is_pass, self.passes + 1, 0), self.passes).astype(np.int8)
+        self.to_play = np.where(ok, 3 - self.to_play, self.to_play).astype(np.int8)
+        self.move_count += ok
+        self.done |= self.passes >= 2
+        return ok
+
+    def random_moves(self, rng: np.random.Generator, avoid_eyes: bool = True) -> np.ndarray:
+        """为每盘均匀随机选一个合法点，没有可下的点时过手；默认不填自己的眼"""
+        mask = self.legal_mask()
+        if avoid_eyes:
+            own = (self.boards == self.to_play[:, None, None])
+            padded = np.pad(own, ((0, 0), (1, 1), (1, 1)), constant_values=True)
+            eye = padded[:, :-2, 1:-1] & padded[:, 2:, 1:-1] & padded[:, 1:-1, :-2] & padded[:, 1:-1, 2:]
+            mask &= ~eye
+        flat = mask.reshape(self.n, -1)
+        scores = np.where(flat, rng.random(flat.shape), -1.0)
+        moves = scores.argmax(axis=1)
+        moves[~flat.any(axis=1)] = PASS
+        return moves
+
+    def area_scores(self) -> np.ndarray:
+        """数子法计分，返回(N, 2)：[黑方子+地, 白方子+地]，不含贴目"""
+        boards = self.boards
+        empty = boards == 0
+        reach = []
+        for color in (Stone.BLACK.value, Stone.WHITE.value):
+            region = empty & self._any_neighbor(boards == color)
+            while True:
+                grown = region | (empty & self._any_neighbor(region))
+                if np.array_equal(grown, region):
+                    break
+                region = grown
+            reach.append(region)
+        black = (boards == Stone.BLACK.value) | (reach[0] & ~reach[1])
+        white = (boards == Stone.WHITE.value) | (reach[1] & ~reach[0])
+        return np.stack([black.reshape(self.n, -1).sum(axis=1),
+                         white.reshape(self.n, -1).sum(axis=1)], axis=1)
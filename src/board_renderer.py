@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+# Retained-mode board rendering on a Tk canvas: draw the grid once, then apply only stone diffs
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+STAR_POINTS = {19: [(3, 3), (3, 9), (3, 15), (9, 3), (9, 9), (9, 15), (15, 3), (15, 9), (15, 15)],
+               13: [(3, 3), (3, 9), (6, 6), (9, 3), (9, 9)],
+               9: [(2, 2), (2, 6), (4, 4), (6, 2), (6, 6)]}
+
+STONE_RADIUS = 12
+
+class BoardRenderer:
+    """保留模式的棋盘绘制
+
+    网格线和星位只在创建时画一次；每个点位的棋子对应一个画布item，记录在item表中，
+    update()与上次绘制的局面做差，只修改落子和提子涉及的点，最新一手的高亮圈只移动位置。
+    每次更新的开销与变化的点数成正比，与盘面上的棋子总数无关。
+    black/white为传入局面中黑白棋子的取值；highlight_colors以last_move中的颜色为键，给出最新一手的多层高亮颜色。
+    """
+
+    def __init__(self, canvas, size: int = 19, cell_size: int = 30, margin: int = 30, black: int = 1,
+                 white: int = 2, highlight_colors: Optional[Dict[Any, Sequence[str]]] = None):
+        self.canvas = canvas
+        self.size = size
+        self.cell_size = cell_size
+        self.start_x = margin
+        self.start_y = margin
+        self.black = black
+        self.white = white
+        self.highlight_colors = highlight_colors or {}
+        self._board = np.zeros((size, size), dtype=np.int8)  # 已绘制的局面：0空，1黑，2白
+        self._items = np.zeros((size, size), dtype=np.int64)  # 每个点位的棋子item，0表示尚未创建
+        self._highlight: List[int] = []
+        self._last_move: Optional[Tuple[int, int, int]] = None
+        self._batching = 0
+        self._pending = None
+        self.changed_points = 0  # 累计重绘的点数，用于观察绘制开销
+        self._draw_grid()
+
+    def _draw_grid(self):
+        end = (self.size - 1) * self.cell_size
+        for i in range(self.size):
+            x = self.start_x + i * self.cell_size
+            self.canvas.create_line(x, self.start_y, x, self.start_y + end, fill="black", width=1, tags="grid")
+            y = self.start_y + i * self.cell_size
+            self.canvas.create_line(self.start_x, y, self.start_x + end, y, fill="black", width=1, tags="grid")
+        for row, col in STAR_POINTS.get(self.size, []):
+            x, y = self.center(row, col)
+            self.canvas.create_oval(x-3, y-3, x+3, y+3, fill="black", tags="grid")
+
+    def center(self, row: int, col: int) -> Tuple[int, int]:
+        return self.start_x + col * self.cell_size, self.start_y + row * self.cell_size
+
+    def point_at(self, x: float, y: float) -> Optional[Tuple[int, int]]:
+        """画布坐标对应的点位，落在棋盘外时返回None"""
+        col = round((x - self.start_x) / self.cell_size)
+        row = round((y - self.start_y) / self.cell_size)
+        if 0 <= row < self.size and 0 <= col < self.size:
+            return row, col
+        return None
+
+    def update(self, board: np.ndarray, last_move: Optional[Tuple[int, int, int]] = None) -> int:
+        """把画布同步到board，last_move为(row, col, 颜色)时高亮该点；返回重绘的点数
+
+        batch()期间只记下最新的局面，退出时一次性绘制。
+        """
+        if self._batching:
+            self._pending = (board.copy(), last_move)
+            return 0
+        normalized = np.zeros(self._board.shape, dtype=np.int8)
+        normalized[board == self.black] = 1
+        normalized[board == self.white] = 2
+        changed = np.flatnonzero(normalized != self._board)
+        points = [(*divmod(point, self.size), int(normalized.flat[point])) for point in changed.tolist()]
+        return self._apply(points, last_move)
+
+    def apply(self, event, board: np.ndarray, last_move: Optional[Tuple[int, int, int]] = None) -> int:
+        """按GameEvent(落子、提子、悔棋)直接更新涉及的点，不与整盘做差；reset时退回update(board)"""
+        if event.kind == "reset" or self._batching or event.row < 0:
+            return self.update(board, last_move)
+        color = event.stone.value  # Stone的取值与内部记录一致：1黑，2白
+        captured_color = 3 - color
+        if event.kind == "undo":
+            points = [(event.row, event.col, 0)] + [(row, col, captured_color) for row, col in event.captured]
+        else:
+            points = [(event.row, event.col, color)] + [(row, col, 0) for row, col in event.captured]
+        return self._apply(points, last_move)
+
+    def _apply(self, points: List[Tuple[int, int, int]], last_move: Optional[Tuple[int, int, int]]) -> int:
+        """把每个(row, col, 颜色)画到画布上"""
+        created = False
+        for row, col, color in points:
+            self._board[row, col] = color
+            item = int(self._items[row, col])
+            if not color:
+                # 提子：隐藏即可，该点再次落子时复用
+                if item:
+                    self.canvas.itemconfigure(item, state="hidden")
+                continue
+            fill = "black" if color == 1 else "white"
+            if item:
+                self.canvas.itemconfigure(item, fill=fill, state="normal")
+            else:
+                x, y = self.center(row, col)
+                self._items[row, col] = self.canvas.create_oval(
+                    x-STONE_RADIUS, y-STONE_RADIUS, x+STONE_RADIUS, y+STONE_RADIUS,
+                    fill=fill, outline="black", width=2, tags="stone")
+                created = True
+        self.changed_points += len(points)
+        if last_move != self._last_move:
+            self._move_highlight(last_move)
+        if created:
+            # 新建的棋子画在最上层，需把高亮圈重新提上来
+            for item in self._highlight:
+                self.canvas.tag_raise(item)
+        return len(points)
+
+    def _move_highlight(self, last_move: Optional[Tuple[int, int, int]]):
+        """高亮圈只创建一次，之后按最新一手移动位置、更换颜色"""
+        self._last_move = last_move
+        if last_move is None or last_move[0] < 0 or last_move[2] not in self.highlight_colors:
+            for item in self._highlight:
+                self.canvas.itemconfigure(item, state="hidden")
+            return
+        row, col, player = last_move
+        x, y = self.center(row, col)
+        for j, color in enumerate(self.highlight_colors[player]):
+            radius = 15 + j * 2  # 逐渐增大的半径
+            width = max(1, 3 - j * 0.5)  # 逐渐减小的线宽
+            coords = (x-radius, y-radius, x+radius, y+radius)
+            if j < len(self._highlight):
+                self.canvas.coords(self._highlight[j], *coords)
+                self.canvas.itemconfigure(self._highlight[j], outline=color, width=width, state="normal")
+            else:
+                self._highlight.append(self.canvas.create_oval(*coords, outline=color, width=width, fill="",
+                                                               tags="highlight"))
+
+    @contextmanager
+    def batch(self):
+        """批量更新，例如载入棋谱或快速回放：期间的update只保留最后一次，退出时绘制一次"""
+        self._batching += 1
+        try:
+            yield self
+        finally:
+            self._batching -= 1
+            if not self._batching and self._pending is not None:
+                board, last_move = self._pending
+                self._pending = None
+                self.update(board, last_move)
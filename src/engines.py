@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+# Lightweight engines and a factory for building any engine from a short spec string
+import random
+from typing import List, Optional, Tuple
+from src.go_board import GoBoard, Stone
+from src.opening_book import OpeningBook
+
+class RandomGoAI:
+    """随机落子，不填自己的眼，无处可下时过手；用作基准对手"""
+
+    def __init__(self, seed: Optional[int] = None):
+        self.rng = random.Random(seed)
+
+    def get_best_move(self, board: GoBoard, current_player: Stone) -> Optional[Tuple[int, int]]:
+        moves = [m for m in board.get_valid_moves(current_player) if not board.is_eye(m[0], m[1], current_player)]
+        return self.rng.choice(moves) if moves else None
+
+class BookGoAI:
+    """按开局库落子，出库后交给fallback引擎"""
+
+    def __init__(self, book: OpeningBook, fallback=None):
+        self.book = book
+        self.fallback = fallback if fallback is not None else RandomGoAI()
+
+    def get_best_move(self, board: GoBoard, current_player: Stone) -> Optional[Tuple[int, int]]:
+        for row, col, _ in self.book.lookup(board.board, current_player == Stone.BLACK):
+            if board.is_valid_move(row, col, current_player):
+                return (row, col)
+        return self.fallback.get_best_move(board, current_player)
+
+ENGINE_NAMES = ("qwen", "mcts", "book", "random")
+
+def _parse_value(text: str):
+    for convert in (int, float):
+        try:
+            return convert(text)
+        except ValueError:
+            pass
+    return None if text.lower() == "none" else text
+
+_BRACKETS = {"(": ")", "[": "]"}
+
+def _split_options(options: str) -> List[str]:
+    """按顶层逗号切分参数，括号内的逗号属于嵌套的引擎描述"""
+    items = []
+    closers = []
+    start = 0
+    for i, ch in enumerate(options):
+        if ch in _BRACKETS:
+            closers.append(_BRACKETS[ch])
+        elif ch in ")]":
+            if not closers or closers.pop() != ch:
+                raise ValueError(f"Unbalanced brackets in engine options: {options}")
+        elif ch == "," and not closers:
+            items.append(options[start:i])
+            start = i + 1
+    if closers:
+        raise ValueError(f"Unbalanced brackets in engine options: {options}")
+    items.append(options[start:])
+    return [item for item in items if item.strip()]
+
+def parse_engine_spec(spec: str) -> Tuple[str, dict]:
+    """解析"名称:参数=值,参数=值"形式的引擎描述，如"mcts:max_playouts=400,time_limit=2"
+
+    值本身是带参数的引擎描述时用括号括起来，如"book:fallback=(mcts:max_playouts=400,time_limit=2)"，
+    括号内原样作为字符串。
+    """
+    name, _, options = spec.partition(":")
+    name = name.strip().lower()
+    if name not in ENGINE_NAMES:
+        raise ValueError(f"Unknown engine: {name} (choose from {', '.join(ENGINE_NAMES)})")
+    kwargs = {}
+    for item in _split_options(options):
+        key, sep, value = item.partition("=")
+        if not sep:
+            raise ValueError(f"Bad engine option: {item}")
+        value = value.strip()
+        if value[:1] in _BRACKETS and value[-1:] == _BRACKETS[value[0]]:
+            kwargs[key.strip()] = value[1:-1].strip()
+        else:
+            kwargs[key.strip()] = _parse_value(value)
+    return name, kwargs
+
+def create_engine(spec: str, seed: Optional[int] = None):
+    """按描述创建引擎，所有引擎都提供get_best_move(board, current_player)"""
+    name, kwargs = parse_engine_spec(spec)
+    if name == "qwen":
+        from src.qwen_ai import QwenGoAI  # 需要API密钥和网络，用到时才导入
+        return QwenGoAI(**kwargs)
+    if name == "mcts":
+        from src.mcts import MCTSGoAI
+        kwargs.setdefault("seed", seed)
+        return MCTSGoAI(**kwargs)
+    if name == "book":
+        path = kwargs.pop("path", None)
+        book = OpeningBook(path) if path else OpeningBook.from_env()
+        if book is None:
+            raise ValueError("Opening book not found, set OPENING_BOOK_PATH or pass book:path=...")
+        fallback = create_engine(kwargs.pop("fallback", "random"), seed)
+        return BookGoAI(book, fallback)
+    return RandomGoAI(seed)
@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+# Compact binary game archive: 2 bytes per move, mmap random access
+import mmap
+import os
+import struct
+import sys
+import numpy as np
+from functools import partial
+from typing import Iterable, Iterator, List, Optional, Tuple
+from src.go_board import GoBoard, Stone
+from src.sgf import ingest
+
+ARCHIVE_MAGIC = b"GOARCH1\0"
+# 版本2在每局着手前写一条索引记录，未正常关闭的存档可以按记录恢复；版本1只在末尾有索引，仍可读取
+ARCHIVE_VERSION = 2
+# 文件头：魔数、版本、棋盘大小、对局数、数据区长度(以着手计)、索引偏移，共64字节；索引偏移为0表示写入未完成
+HEADER = struct.Struct("<8sIIQQQ24x")
+# 每局一条索引：着手起点(以着手计)、手数、胜方(Stone值，0为未知)、贴目的两倍
+INDEX_DTYPE = np.dtype([("offset", "<u8"), ("length", "<u4"), ("winner", "u1"), ("flags", "u1"), ("komi2", "<i2")])
+MOVE_DTYPE = np.dtype("<u2")
+RECORD_CODES = INDEX_DTYPE.itemsize // MOVE_DTYPE.itemsize  # 数据区中一条索引记录占的着手数
+
+# 着手编码：低9位为点位row * size + col，过手为PASS_CODE；第9位为颜色(0黑1白)
+POINT_BITS = 9
+PASS_CODE = (1 << POINT_BITS) - 1
+COLOR_BIT = 1 << POINT_BITS
+MAX_SIZE = 22  # 22 * 22 = 484 < PASS_CODE
+
+def encode_moves(moves: Iterable[Tuple[int, int, Stone]], size: int = 19) -> np.ndarray:
+    """把(row, col, stone)序列编码为uint16数组，过手为(-1, -1, stone)"""
+    moves = list(moves)
+    if not moves:
+        return np.zeros(0, dtype=MOVE_DTYPE)
+    data = np.array([(row, col, stone.value) for row, col, stone in moves], dtype=np.int64)
+    rows, cols, colors = data.T
+    codes = np.where(rows < 0, PASS_CODE, rows * size + cols)
+    codes |= np.where(colors == Stone.WHITE.value, COLOR_BIT, 0)
+    return codes.astype(MOVE_DTYPE)
+
+def decode_moves(codes: np.ndarray, size: int = 19) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """encode_moves的向量化逆运算，返回(rows, cols, colors)，过手的行列为-1，colors为Stone值"""
+    codes = codes.astype(np.int32)
+    points = codes & PASS_CODE
+    passes = points == PASS_CODE
+    rows, cols = np.divmod(points, size)
+    rows[passes] = -1
+    cols[passes] = -1
+    colors = np.where(codes & COLOR_BIT, Stone.WHITE.value, Stone.BLACK.value)
+    return rows, cols, colors
+
+def _recover_index(data: np.ndarray) -> np.ndarray:
+    """从数据区逐条读取每局着手前的索引记录，遇到不完整或对不上的记录即停止(之后是中断时写了一半的一局)"""
+    records = []
+    pos = 0
+    while pos + RECORD_CODES <= len(data):
+        record = data[pos:pos + RECORD_CODES].view(INDEX_DTYPE)[0]
+        offset, length = int(record["offset"]), int(record["length"])
+        if offset != pos + RECORD_CODES or offset + length > len(data):
+            break
+        records.append(record)
+        pos = offset + length
+    return np.array(records, dtype=INDEX_DTYPE)
+
+class ArchiveWriter:
+    """顺序写入对局：每局的索引记录和着手直接追加到文件，并在内存中保留一份索引，close时写到文件末尾并回填文件头
+
+    文件头最后写入：进程中途退出时文件头仍标记为未完成，读取时按每局的索引记录恢复，丢弃写了一半的最后一局。
+    append=True时打开已有的存档继续追加(未正常关闭的存档先截掉不完整的部分)。
+    """
+
+    def __init__(self, path: str, size: int = 19, append: bool = False):
+        if size > MAX_SIZE:
+            raise ValueError(f"Board size {size} does not fit the 2-byte move encoding")
+        self.path = path
+        self.size = size
+        self._index: List[tuple] = []
+        self._move_count = 0
+        if append and os.path.exists(path) and os.path.getsize(path) >= HEADER.size:
+            with GameArchive(path) as archive:
+                if archive.size != size:
+                    raise ValueError(f"Archive board size is {archive.size}, not {size}")
+                if archive.version != ARCHIVE_VERSION:
+                    raise ValueError(f"Cannot append to archive version {archive.version}: {path}")
+                self._index = [tuple(row) for row in archive.index.tolist()]
+                self._move_count = len(archive.codes)
+            self._file = open(path, "r+b")
+            # 先把文件头标记为未完成，再截掉末尾的索引(或中断时写了一半的一局)
+            self._write_header(0)
+            self._file.truncate(HEADER.size + self._move_count * MOVE_DTYPE.itemsize)
+            self._file.seek(0, os.SEEK_END)
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._file = open(path, "wb")
+            self._write_header(0)
+
+    def add_game(self, moves: Iterable[Tuple[int, int, Stone]], winner: Stone = Stone.EMPTY,
+                 komi: float = 7.5) -> int:
+        """追加一局，返回其编号"""
+        return self.add_codes(encode_moves(moves, self.size), winner, komi)
+
+    def add_codes(self, codes: np.ndarray, winner: Stone = Stone.EMPTY, komi: float = 7.5) -> int:
+        """追加一局已编码的着手，写完即刷新到文件，进程中途退出时最多丢失正在写的一局"""
+        codes = np.asarray(codes, dtype=MOVE_DTYPE)
+        entry = (self._move_count + RECORD_CODES, len(codes), winner.value, 0, int(round(komi * 2)))
+        self._file.write(np.array([entry], dtype=INDEX_DTYPE).tobytes() + codes.tobytes())
+        self._file.flush()
+        self._index.append(entry)
+        self._move_count += RECORD_CODES + len(codes)
+        return len(self._index) - 1
+
+    def add_board(self, board: GoBoard, winner: Stone = Stone.EMPTY, komi: float = 7.5) -> int:
+        """追加GoBoard的落子历史"""
+        return self.add_game(board.move_history, winner, komi)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def close(self):
+        if self._file is None:
+            return
+        data_end = HEADER.size + self._move_count * MOVE_DTYPE.itemsize
+        index_offset = (data_end + 7) // 8 * 8
+        self._file.write(b"\0" * (index_offset - data_end))
+        self._file.write(np.array(self._index, dtype=INDEX_DTYPE).tobytes())
+        # 索引落盘之后才写文件头，文件头写入前中断时读取方仍按索引记录恢复
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._write_header(index_offset)
+        self._file.close()
+        self._file = None
+
+    def _write_header(self, index_offset: int):
+        self._file.seek(0)
+        self._file.write(HEADER.pack(ARCHIVE_MAGIC, ARCHIVE_VERSION, self.size, len(self._index),
+                                     self._move_count, index_offset))
+        self._file.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class GameArchive:
+    """只读存档：mmap整个文件，着手和索引都是指向映射内存的NumPy视图，不做任何解析
+
+    codes是整个数据区的编码数组(版本2中每局着手前有一条索引记录)，index[i]给出第i局着手在其中的起点和手数。
+    写入未完成(进程中途退出)的存档从数据区的索引记录恢复index，写了一半的最后一局被忽略。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, size, game_count, move_count, index_offset = HEADER.unpack_from(self._mmap, 0)
+        if magic != ARCHIVE_MAGIC or version not in (1, ARCHIVE_VERSION):
+            self._mmap.close()
+            raise ValueError(f"Not a game archive: {path}")
+        self.size = size
+        self.version = version
+        if index_offset:
+            self.codes = np.frombuffer(self._mmap, dtype=MOVE_DTYPE, count=move_count, offset=HEADER.size)
+            self.index = np.frombuffer(self._mmap, dtype=INDEX_DTYPE, count=game_count, offset=index_offset)
+            return
+        data = np.frombuffer(self._mmap, dtype=MOVE_DTYPE, offset=HEADER.size,
+                             count=(len(self._mmap) - HEADER.size) // MOVE_DTYPE.itemsize)
+        self.index = _recover_index(data)
+        end = int(self.index[-1]["offset"] + self.index[-1]["length"]) if len(self.index) else 0
+        self.codes = data[:end]
+        print(f"存档未正常关闭，已恢复{len(self.index)}局: {path}")
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def game_codes(self, game: int, start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+        """第game局第start到stop手的编码(零拷贝视图)"""
+        offset, length = int(self.index[game]["offset"]), int(self.index[game]["length"])
+        start, stop, _ = slice(start, stop).indices(length)
+        return self.codes[offset + start:offset + stop]
+
+    def moves(self, game: int, start: int = 0, stop: Optional[int] = None) -> List[Tuple[int, int, Stone]]:
+        """第game局的着手，格式与GoBoard.move_history相同"""
+        rows, cols, colors = decode_moves(self.game_codes(game, start, stop), self.size)
+        return [(row, col, Stone(color)) for row, col, color in zip(rows.tolist(), cols.tolist(), colors.tolist())]
+
+    def winner(self, game: int) -> Stone:
+        return Stone(int(self.index[game]["winner"]))
+
+    def komi(self, game: int) -> float:
+        return int(self.index[game]["komi2"]) / 2
+
+    def board(self, game: int, stop: Optional[int] = None) -> GoBoard:
+        """把第game局前stop手重放到GoBoard上"""
+        board = GoBoard(self.size)
+        for row, col, stone in self.moves(game, 0, stop):
+            if row < 0:
+                board.pass_move(stone)
+            elif not board.place_stone(row, col, stone):
+                break
+        return board
+
+    def __iter__(self) -> Iterator[List[Tuple[int, int, Stone]]]:
+        for game in range(len(self)):
+            yield self.moves(game)
+
+    def close(self):
+        # 先释放NumPy视图，否则mmap无法关闭
+        self.codes = self.index = None
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def _encode_sgf_game(game, size: int = 19):
+    """子进程内把一局SGF转成(着手编码, 胜方, 贴目)，尺寸不符或含摆子的对局返回None"""
+    if game.size != size or game.setup:
+        return None
+    result = game.properties.get("RE", [""])[0].upper()
+    winner = Stone.BLACK if result.startswith("B+") else Stone.WHITE if result.startswith("W+") else Stone.EMPTY
+    try:
+        komi = float(game.properties.get("KM", ["7.5"])[0])
+    except ValueError:
+        komi = 7.5
+    return encode_moves(game.moves, size), winner, komi
+
+def convert_sgf(sources: List[str], path: str, size: int = 19, workers: Optional[int] = None) -> int:
+    """把SGF文件或目录转成存档，返回写入的对局数"""
+    with ArchiveWriter(path, size) as writer:
+        for item in ingest(sources, partial(_encode_sgf_game, size=size), workers=workers):
+            if item is None:
+                continue
+            writer.add_codes(*item)
+        return len(writer)
+
+def main(argv: List[str]):
+    """用法：python -m src.game_archive 输出文件 SGF文件或目录..."""
+    if len(argv) < 2:
+        print(main.__doc__)
+        return 1
+    count = convert_sgf(argv[1:], argv[0])
+    print(f"存档已生成：{argv[0]}，共{count}局")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+# Authoritative game state: read-only board views, versioned snapshots and move/capture notifications
+import threading
+from collections import deque
+from collections.abc import Sequence
+from typing import Callable, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+import numpy as np
+from src.go_board import GoBoard, MoveDelta, Stone
+
+class GameEvent(NamedTuple):
+    """一次局面变化，过手时row=col=-1
+
+    kind为"move"(落子或过手)、"undo"(撤销stone在row,col的一手，captured中的子放回)、
+    "redo"(同move)或"reset"(新对局或整盘载入，观察者应按board重新同步)。
+    captured为这一手提掉的点位，颜色是stone的对方。
+    """
+    kind: str
+    row: int
+    col: int
+    stone: Optional[Stone]
+    captured: Tuple[Tuple[int, int], ...]
+    version: int
+
+Observer = Callable[[GameEvent], None]
+Move = Tuple[int, int, Stone]
+
+class MoveList(Sequence):
+    """不可变的落子序列，追加一手得到新列表并与原列表共享前面的部分(持久化链表)
+
+    快照之间共享同一条历史，取快照时不复制落子记录。支持len、下标、切片(返回tuple)和迭代。
+    """
+
+    __slots__ = ("_parent", "_move", "_length", "_items")
+
+    def __init__(self, parent: Optional["MoveList"] = None, move: Optional[Move] = None):
+        self._parent = parent
+        self._move = move
+        self._length = parent._length + 1 if parent is not None else 0
+        self._items: Optional[Tuple[Move, ...]] = None
+
+    @classmethod
+    def of(cls, moves: Iterable[Move]) -> "MoveList":
+        result = cls()
+        for move in moves:
+            result = result.append(move)
+        return result
+
+    def append(self, move: Move) -> "MoveList":
+        return MoveList(self, move)
+
+    @property
+    def parent(self) -> "MoveList":
+        """去掉最后一手的列表(与本列表共享)"""
+        return self._parent if self._parent is not None else self
+
+    def _tuple(self) -> Tuple[Move, ...]:
+        # 只在需要随机访问时展开一次，之后复用
+        if self._items is None:
+            items = []
+            node = self
+            while node._parent is not None:
+                items.append(node._move)
+                node = node._parent
+            self._items = tuple(reversed(items))
+        return self._items
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, int) and index == -1 and self._parent is not None:
+            return self._move
+        return self._tuple()[index]
+
+    def __iter__(self) -> Iterator[Move]:
+        return iter(self._tuple())
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, MoveList):
+            return self is other or self._tuple() == other._tuple()
+        return isinstance(other, tuple) and self._tuple() == other
+
+    def __hash__(self) -> int:
+        return hash(self._tuple())
+
+    def __repr__(self) -> str:
+        return f"MoveList({list(self._tuple())!r})"
+
+class GameSnapshot(NamedTuple):
+    """某个版本的不可变局面，供后台线程计算
+
+    position是该版本GoBoard的副本，每个版本只复制一次，各线程共享、不可修改；board是它的只读视图，
+    move_history与对局及其他快照共享。计算结果经GameState.play(..., version=snapshot.version)提交，
+    期间局面已变时提交失败。
+    """
+    version: int
+    board: np.ndarray
+    move_history: MoveList
+    current_player: Stone
+    position: GoBoard
+
+    def go_board(self) -> GoBoard:
+        """可修改的GoBoard副本(含摆子、劫和同形记录)，供需要规则判断的引擎使用，不重放落子"""
+        return self.position.copy()
+
+class GameState:
+    """唯一的权威对局状态
+
+    内部是一个GoBoard，对外只提供只读视图(writeable=False的ndarray，随对局原地更新，无需复制)；
+    所有改动都经由play/pass_turn/undo/redo/reset/load_board，每次改动version加一，并按发生顺序通知观察者。
+    通知在释放锁之后进行，观察者里可以读取对局，也可以等待其他线程(例如界面主线程)而不会死锁；
+    观察者抛出的异常只打印，不影响已经完成的改动。观察者通常在改动所在的线程中调用，但另一个线程正在通知时，
+    事件交给它按顺序一并通知，因此界面观察者须自行转到主线程。
+
+    后台线程不应读取随时在变的视图，而是取snapshot()，对快照计算后以version做比较并交换(compare-and-set)
+    提交：play(..., version=snapshot.version)在局面已变(对方落子、悔棋、重置)时不落子并返回False。
+    模型请求期间不持有锁，只有取快照和提交时短暂加锁。
+    """
+
+    def __init__(self, size: int = 19):
+        self.size = size
+        self.version = 0
+        self._observers: List[Observer] = []
+        self._lock = threading.RLock()
+        # 已发生、尚未通知的事件；同一时刻只有一个线程负责通知
+        self._pending: "deque[GameEvent]" = deque()
+        self._notify_lock = threading.Lock()
+        self._notifying = False
+        self._set_board(GoBoard(size), Stone.BLACK)
+
+    def _set_board(self, board: GoBoard, current_player: Stone):
+        self._board = board
+        self._view = board.get_board_state()
+        self._moves = MoveList.of(board.move_history)
+        self._current_player = current_player
+        self._snapshot: Optional[GameSnapshot] = None
+
+    @property
+    def board(self) -> np.ndarray:
+        """只读的棋盘视图(0空/1黑/2白)，随对局更新；需要固定不变的局面时自行copy()"""
+        return self._view
+
+    @property
+    def go_board(self) -> GoBoard:
+        """底层GoBoard，供需要规则判断的引擎只读使用；修改一律通过GameState"""
+        return self._board
+
+    @property
+    def current_player(self) -> Stone:
+        return self._current_player
+
+    @property
+    def move_history(self) -> MoveList:
+        """不可变的落子记录，可以直接保存，之后的落子不会改变它"""
+        return self._moves
+
+    @property
+    def last_move(self) -> Optional[Move]:
+        return self._moves[-1] if self._moves else None
+
+    def __len__(self) -> int:
+        return len(self._moves)
+
+    def snapshot(self) -> GameSnapshot:
+        """当前版本的不可变快照；同一版本只复制一次GoBoard，多个线程共享"""
+        with self._lock:
+            if self._snapshot is None or self._snapshot.version != self.version:
+                position = self._board.copy()
+                self._snapshot = GameSnapshot(self.version, position.get_board_state(), self._moves,
+                                              self._current_player, position)
+            return self._snapshot
+
+    def is_valid_move(self, row: int, col: int, stone: Optional[Stone] = None) -> bool:
+        return self._board.is_valid_move(row, col, stone or self._current_player)
+
+    def subscribe(self, observer: Observer) -> Callable[[], None]:
+        """注册观察者，返回取消注册的函数"""
+        with self._lock:
+            self._observers.append(observer)
+        return lambda: self.unsubscribe(observer)
+
+    def unsubscribe(self, observer: Observer):
+        with self._lock:
+            if observer in self._observers:
+                self._observers.remove(observer)
+
+    def play(self, row: int, col: int, stone: Optional[Stone] = None, version: Optional[int] = None) -> bool:
+        """当前玩家(或指定的stone)在(row, col)落子，不合法时返回False
+
+        给出version时只在局面仍是该版本时落子(compare-and-set)，否则返回False；可用is_stale区分原因。
+        """
+        with self._lock:
+            if version is not None and version != self.version:
+                return False
+            stone = stone or self._current_player
+            if not self._board.place_stone(row, col, stone):
+                return False
+            self._current_player = stone.opponent
+            self._moves = self._moves.append((row, col, stone))
+            self._record("move", self._board.last_delta)
+        self._notify()
+        return True
+
+    def pass_turn(self, stone: Optional[Stone] = None, version: Optional[int] = None) -> bool:
+        """过手，version的含义同play"""
+        with self._lock:
+            if version is not None and version != self.version:
+                return False
+            stone = stone or self._current_player
+            self._board.pass_move(stone)
+            self._current_player = stone.opponent
+            self._moves = self._moves.append((-1, -1, stone))
+            self._record("move", self._board.last_delta)
+        self._notify()
+        return True
+
+    def is_stale(self, version: int) -> bool:
+        """version之后局面是否已经改变"""
+        return version != self.version
+
+    def undo(self) -> Optional[GameEvent]:
+        """撤销上一手，没有可撤销的棋时返回None"""
+        with self._lock:
+            delta = self._board.undo()
+            if delta is None:
+                return None
+            self._current_player = delta.stone
+            self._moves = self._moves.parent
+            event = self._record("undo", delta)
+        self._notify()
+        return event
+
+    def redo(self) -> Optional[GameEvent]:
+        """重做最近一次撤销的棋，没有可重做的棋时返回None"""
+        with self._lock:
+            if self._board.redo() is None:
+                return None
+            delta = self._board.last_delta
+            self._current_player = delta.stone.opponent
+            self._moves = self._moves.append(self._board.move_history[-1])
+            event = self._record("redo", delta)
+        self._notify()
+        return event
+
+    def reset(self):
+        """开始新对局"""
+        with self._lock:
+            self._set_board(GoBoard(self.size), Stone.BLACK)
+            self._record("reset", None)
+        self._notify()
+
+    def load_board(self, board: GoBoard, first_player: Stone = Stone.BLACK):
+        """整盘换成board(例如载入的棋谱)，此后由GameState独占修改
+
+        行棋方是最后一手的对方；board上还没有着手(只有摆子)时为first_player，如让子局的白棋。
+        """
+        with self._lock:
+            if board.size != self.size:
+                raise ValueError(f"Board size {board.size} does not match game size {self.size}")
+            last = board.move_history[-1] if board.move_history else None
+            self._set_board(board, last[2].opponent if last else first_player)
+            self._record("reset", None)
+        self._notify()
+
+    def _record(self, kind: str, delta: Optional[MoveDelta]) -> GameEvent:
+        """在锁内调用：version加一，生成事件并排入待通知队列"""
+        self.version += 1
+        if delta is None:
+            event = GameEvent(kind, -1, -1, None, (), self.version)
+        else:
+            captured = tuple(divmod(point, self.size) for point in delta.captured)
+            event = GameEvent(kind, delta.row, delta.col, delta.stone, captured, self.version)
+        self._pending.append(event)
+        return event
+
+    def _notify(self):
+        """在锁外调用：按顺序把待通知的事件交给观察者；已有线程在通知时由它负责，直接返回"""
+        with self._notify_lock:
+            if self._notifying:
+                return
+            self._notifying = True
+        while True:
+            with self._notify_lock:
+                if not self._pending:
+                    self._notifying = False
+                    return
+                event = self._pending.popleft()
+            with self._lock:
+                observers = list(self._observers)
+            for observer in observers:
+                try:
+                    observer(event)
+                except Exception as e:
+                    print(f"对局事件通知出错: {e}")
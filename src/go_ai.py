@@ -1,11 +1,19 @@
 ﻿import os
-import numpy as np
 from dotenv import load_dotenv
 from dashscope import Generation
 import json
 import threading
 import time
-import re
+from src.response_cache import ResponseCache, position_fingerprint
+from src.symmetry import remap_move
+from src.opening_book import OpeningBook
+from src.ponder import Ponderer
+from src.streaming import StreamingReply, confirmed_prefix
+from src.move_parser import CONFIDENT, best_move
+from src.prompt_encoding import BoardEncoder, default_encoding, estimate_tokens
+from src.prompt_session import PromptSession, session_max_tokens
+from src.game_state import GameState
+from src.go_board import Stone
 
 # Load environment variables
 load_dotenv()
@@ -13,47 +21,121 @@ load_dotenv()
 class GoAI:
     """围棋AI类，使用ModelScope的Qwen模型进行棋局分析"""
     
-    def __init__(self):
+    def __init__(self, cache=None, book=None, encoding=None, session_tokens=None, base_url=None):
         self.api_key = os.getenv("DASHSCOPE_API_KEY")
         if not self.api_key:
             raise ValueError("DASHSCOPE_API_KEY not found in environment variables")
+        self.model_name = "qwen-plus"
+        # DashScope接口地址，可指向本地模拟服务器(src/mock_server.py)；未设置时使用SDK默认地址
+        self.base_url = base_url or os.getenv("DASHSCOPE_HTTP_BASE_URL")
+        # 相同局面的重复请求直接读缓存，不再调用API
+        self.cache = cache if cache is not None else ResponseCache.from_env()
+        # 开局库中的局面直接按棋谱落子，不调用模型
+        self.book = book if book is not None else OpeningBook.from_env()
         
-        # 围棋棋盘状态
+        # 围棋棋盘状态：唯一的对局状态，用户执黑，AI执白；界面等通过game.subscribe接收落子和提子
         self.board_size = 19
-        self.board = np.zeros((self.board_size, self.board_size), dtype=int)
-        self.current_player = 1  # 1 for black (用户), -1 for white (AI)
-        self.move_history = []
-        self.ai_thinking = False
+        self.game = GameState(self.board_size)
+        # 用户思考时预先请求AI对其可能落子的应手，见set_pondering
+        self.ponderer = None
+        # 提示词中的棋盘编码，随局面增量更新；长度与对局手数无关
+        self.encoder = BoardEncoder(self.board_size, encoding or default_encoding())
+        self.last_prompt_tokens = 0
+        # 会话模式：多轮对话只追加新增的落子，前缀不变以利用服务端的前缀缓存；session_tokens为压缩阈值，0表示关闭
+        session_tokens = session_max_tokens() if session_tokens is None else session_tokens
+        self.session = None
+        if session_tokens:
+            self.session = PromptSession(self._session_system_prompt(), self._format_move, session_tokens)
+    
+    @property
+    def board(self):
+        """当前局面的只读视图(0空/1黑/2白)"""
+        return self.game.board
+    
+    @property
+    def current_player(self):
+        return self.game.current_player
+    
+    @property
+    def move_history(self):
+        """不可变的落子记录(MoveList)，元素为(row, col, Stone)"""
+        return self.game.move_history
         
-    def get_board_state_description(self):
-        """将棋盘状态转换为文字描述"""
+    def get_board_state_description(self, move_history=None, current_player=None, board=None, recent_moves=3):
+        """将棋盘状态转换为文字描述，默认描述当前对局；只列出最近几手，完整局面由棋盘编码给出"""
+        snapshot = self.game.snapshot()
+        move_history = snapshot.move_history if move_history is None else move_history
+        current_player = snapshot.current_player if current_player is None else current_player
+        board = snapshot.board if board is None else board
         description = "当前棋盘状态：\n"
         description += f"棋盘大小：{self.board_size}x{self.board_size}\n"
-        player_name = "用户(黑棋)" if self.current_player == 1 else "AI(白棋)"
+        player_name = "用户(黑棋)" if current_player == Stone.BLACK else "AI(白棋)"
         description += f"当前玩家：{player_name}\n"
-        description += f"已下步数：{len(self.move_history)}\n\n"
+        description += f"已下步数：{len(move_history)}\n"
         
-        # 描述已占用的位置
-        if self.move_history:
-            description += "已占用的位置：\n"
-            for i, (row, col, player) in enumerate(self.move_history):
-                player_name = "用户(黑棋)" if player == 1 else "AI(白棋)"
-                description += f"第{i+1}步：{player_name} 下在 ({row+1}, {col+1})\n"
+        if move_history:
+            recent = []
+            start = max(0, len(move_history) - recent_moves)
+            for i, (row, col, player) in enumerate(move_history[start:], start + 1):
+                player_name = "用户(黑棋)" if player == Stone.BLACK else "AI(白棋)"
+                recent.append(f"第{i}步{player_name} ({row+1}, {col+1})")
+            description += "最近几手：" + "；".join(recent) + "\n"
         
+        description += f"\n棋盘（{self.encoder.legend}）：\n{self.encoder.render(board)}\n"
         return description
     
+    def _session_system_prompt(self):
+        """会话模式的系统提示词，整局不变"""
+        return f"""你是一个专业的围棋AI助手，与用户下一盘{self.board_size}x{self.board_size}的围棋，用户执黑，AI执白。
+坐标格式：行,列，从1开始计数。
+棋盘（{self.encoder.legend}）。
+每轮会告诉你上一轮之后新增的落子，以及本轮的要求。"""
+    
+    @staticmethod
+    def _format_move(move):
+        row, col, player = move
+        return f"{'黑' if player == Stone.BLACK else '白'}({row+1},{col+1})"
+    
+    def _session_turn(self, move_history, current_player, board, question):
+        """会话模式下构造本轮请求，未开启会话模式时返回None"""
+        if self.session is None:
+            return None
+        player_name = "用户(黑棋)" if current_player == Stone.BLACK else "AI(白棋)"
+        return self.session.turn(move_history, lambda: self.encoder.render(board), f"轮到{player_name}。{question}")
+    
+    def _commit_turn(self, turn, text):
+        """把本轮问答记入会话；预判等假想局面的回复不记录，其中的落子下一轮作为新增落子告知"""
+        if turn is not None and self.move_history[:len(turn.moves)] == tuple(turn.moves):
+            self.session.commit(turn, text)
+    
+    def _count_prompt_tokens(self, prompt, reused_tokens=0):
+        """估计并记录本次请求的提示词token数"""
+        self.last_prompt_tokens = estimate_tokens(prompt)
+        reused = f"，其中约{reused_tokens}与上一轮前缀相同" if reused_tokens else ""
+        print(f"提示词约{self.last_prompt_tokens} tokens{reused}（棋盘编码：{self.encoder.encoding}）")
+    
+    def _generation_call(self, prompt, turn, **kwargs):
+        """发送请求：会话模式下发送多轮对话，否则发送单条提示词"""
+        if self.base_url:
+            kwargs["base_address"] = self.base_url
+        if turn is None:
+            self._count_prompt_tokens(prompt)
+            return Generation.call(model=self.model_name, prompt=prompt, api_key=self.api_key, **kwargs)
+        self._count_prompt_tokens("".join(m["content"] for m in turn.messages), turn.reused_tokens)
+        return Generation.call(model=self.model_name, messages=turn.messages, result_format="message",
+                               api_key=self.api_key, **kwargs)
+    
+    @staticmethod
+    def _response_text(response):
+        output = response.output
+        return output.text if output.choices is None else output.choices[0].message.content
+    
     def analyze_position(self, prompt_addition=""):
-        """使用Qwen模型分析当前棋局"""
-        if self.ai_thinking:
-            return "AI正在思考中，请稍候..."
-            
-        self.ai_thinking = True
+        """使用Qwen模型分析当前棋局；基于调用时的快照，可在后台线程调用，多个分析可以同时进行"""
+        snapshot = self.game.snapshot()
+        board, move_history, current_player = snapshot.board, snapshot.move_history, snapshot.current_player
         try:
-            base_prompt = f"""你是一个专业的围棋AI助手。请分析当前的围棋局面并给出建议。
-
-{self.get_board_state_description()}
-
-请从以下角度分析：
+            question = f"""请从以下角度分析：
 1. 当前局面的优劣
 2. 推荐的最佳下法（给出坐标）
 3. 分析对手可能的应对
@@ -62,34 +144,102 @@ class GoAI:
 {prompt_addition}
 
 请用中文回答，并给出具体的坐标建议（格式：行,列，从1开始计数）。"""
+            base_prompt = f"""你是一个专业的围棋AI助手。请分析当前的围棋局面并给出建议。
 
-            response = Generation.call(
-                model="qwen-plus",
-                prompt=base_prompt,
-                api_key=self.api_key,
-                max_tokens=1000,
-                temperature=0.7
-            )
-            
-            if response.status_code == 200:
-                return response.output.text
+{self.get_board_state_description(move_history, current_player, board)}
+
+{question}"""
+
+            turn = self._session_turn(move_history, current_player, board, question)
+            text, error, _ = self.call_model(base_prompt, f"analyze:{prompt_addition}",
+                                             max_tokens=1000, temperature=0.7, board=board,
+                                             current_player=current_player, turn=turn)
+            if error is None:
+                return text
             else:
-                return f"API调用失败：{response.message}"
+                return f"API调用失败：{error}"
                 
         except Exception as e:
             return f"分析过程中出现错误：{str(e)}"
-        finally:
-            self.ai_thinking = False
+    
+    def call_model(self, prompt, template, max_tokens, temperature, symmetric=False, board=None,
+                   current_player=None, turn=None):
+        """调用Qwen模型，返回(回复文本, 错误信息, 坐标换算函数)；同一局面、模板和参数命中缓存时不发请求
+        
+        symmetric=True时旋转/镜像等价的局面共用缓存，回复中的坐标须经换算函数转换到当前朝向；
+        否则只有朝向也相同的局面才会命中，换算函数为恒等。board/current_player默认取当前对局。
+        给出会话轮次turn时发送其中的多轮对话代替prompt，回复记入会话。
+        """
+        key, frame, cached, to_current = self._cache_lookup(template, temperature, symmetric, board, current_player)
+        if cached is not None:
+            return cached, None, to_current
+        
+        response = self._generation_call(
+            prompt, turn,
+            max_tokens=max_tokens,
+            temperature=temperature
+        )
+        if response.status_code != 200:
+            return None, response.message, None
+        
+        text = self._response_text(response)
+        self.cache.set(key, json.dumps({"frame": frame, "text": text}, ensure_ascii=False))
+        self._commit_turn(turn, text)
+        return text, None, to_current
+    
+    def stream_model(self, prompt, template, max_tokens, temperature, symmetric=False, board=None,
+                     current_player=None, turn=None):
+        """流式调用Qwen模型，参数和缓存规则同call_model，返回StreamingReply
+        
+        命中缓存时回复一次产出全文；否则随模型生成逐段产出，完整读完后才写入缓存，中断的半截回复不缓存。
+        """
+        key, frame, cached, to_current = self._cache_lookup(template, temperature, symmetric, board, current_player)
+        if cached is not None:
+            return StreamingReply(iter(()), to_current=to_current, text=cached)
+        
+        def pieces():
+            responses = self._generation_call(
+                prompt, turn,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                stream=True,
+                incremental_output=True
+            )
+            try:
+                for response in responses:
+                    if response.status_code != 200:
+                        raise RuntimeError(response.message)
+                    yield self._response_text(response)
+            finally:
+                # 提前结束时关闭底层流，断开连接
+                close = getattr(responses, "close", None)
+                if close is not None:
+                    close()
+        
+        def remember(text):
+            self.cache.set(key, json.dumps({"frame": frame, "text": text}, ensure_ascii=False))
+            self._commit_turn(turn, text)
+        
+        return StreamingReply(pieces(), remember, to_current)
+    
+    def _cache_lookup(self, template, temperature, symmetric, board, current_player):
+        """返回(缓存键, 当前朝向, 缓存的回复文本或None, 坐标换算函数)"""
+        board = self.board if board is None else board
+        current_player = self.current_player if current_player is None else current_player
+        position, frame = position_fingerprint(board, current_player == Stone.BLACK)
+        if not symmetric:
+            template = f"{template}@{frame}"
+        key = self.cache.make_key(position, self.model_name, template, temperature)
+        cached = self.cache.get(key)
+        if cached is None:
+            return key, frame, None, lambda row, col: (row, col)
+        entry = json.loads(cached)
+        reply_frame = entry["frame"]
+        return key, frame, entry["text"], lambda row, col: remap_move((row, col), reply_frame, frame, self.board_size)
     
     def make_move(self, row, col):
-        """在指定位置下棋"""
-        if 0 <= row < self.board_size and 0 <= col < self.board_size:
-            if self.board[row, col] == 0:  # 空位
-                self.board[row, col] = self.current_player
-                self.move_history.append((row, col, self.current_player))
-                self.current_player *= -1  # 切换玩家
-                return True
-        return False
+        """当前玩家在指定位置下棋，按规则提子；不合法(有子、自杀、劫)时返回False"""
+        return self.game.play(row, col)
     
     def get_ai_suggestion(self):
         """获取AI建议的下一步棋"""
@@ -97,100 +247,145 @@ class GoAI:
         return analysis
     
     def extract_coordinates(self, text):
-        """从AI回复中提取坐标"""
-        # 多种坐标格式的正则表达式
-        patterns = [
-            r"(\d+)[,，]\s*(\d+)",  # 数字,数字
-            r"(\d+)\s*[,，]\s*(\d+)",  # 数字 , 数字
-            r"(\d+)\s+(\d+)",  # 数字 数字
-            r"(\d+)-(\d+)",  # 数字-数字
-            r"(\d+)\.(\d+)",  # 数字.数字
-            r"(\d+)\s*行\s*(\d+)\s*列",  # 数字行数字列
-            r"(\d+)\s*列\s*(\d+)\s*行",  # 数字列数字行
-            r"(\d+)\s*,\s*(\d+)",  # 数字, 数字
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, text)
-            if matches:
-                try:
-                    row, col = int(matches[0][0]), int(matches[0][1])
-                    # 检查坐标是否在有效范围内
-                    if 1 <= row <= 19 and 1 <= col <= 19:
-                        return row - 1, col - 1  # 转换为0索引
-                except ValueError:
-                    continue
-        
-        return None, None
-    
-    def get_quick_ai_move(self, callback=None):
-        """快速获取AI的下一步棋 - 优化版本"""
-        def ai_think():
-            try:
-                # 使用更简洁的提示词，减少token消耗
-                quick_prompt = f"""围棋局面分析：
-{self.get_board_state_description()}
+        """从AI回复中提取最可能是推荐落子的坐标(从0开始)，没有时返回(None, None)"""
+        move = best_move(text, self.board_size)
+        return move if move is not None else (None, None)
+    
+    def request_quick_move(self, position, move_history, current_player, on_commentary=None, on_reply=None):
+        """为给定局面(GoBoard，只读)向模型请求一手棋，不修改对局状态，可在任意线程调用
+        
+        回复以流式读取，一出现合法(已排除自杀、劫和同形)的坐标就返回，不等模型写完；其余部分默认中断，
+        给出on_commentary时改为在后台读完，再以全文调用on_commentary。
+        给出on_reply时在开始读取前以StreamingReply调用，调用方可在其他线程cancel()中断这次请求。
+        返回(已收到的回复文本, 错误信息, 落子)，没有提取到合法落子时为None。
+        """
+        board = position.get_board_state()
+        # 使用更简洁的提示词，减少token消耗
+        question = "请快速给出下一步建议坐标，格式：行,列（1-19）。选择空位下棋。"
+        quick_prompt = f"""围棋局面分析：
+{self.get_board_state_description(move_history, current_player, board)}
 
-请快速给出下一步建议坐标，格式：行,列（1-19）。选择空位下棋。"""
-                
-                response = Generation.call(
-                    model="qwen-plus",
-                    prompt=quick_prompt,
-                    api_key=self.api_key,
-                    max_tokens=300,  # 减少token数量
-                    temperature=0.5  # 降低随机性，提高响应速度
-                )
-                
-                if response.status_code != 200:
-                    if callback:
-                        callback(None, None, f"API调用失败：{response.message}")
-                    return False
-                
-                suggestion = response.output.text
-                print(f"AI快速回复: {suggestion[:100]}...")
-                
-                # 尝试从建议中提取坐标
-                row, col = self.extract_coordinates(suggestion)
-                
-                if row is not None and col is not None:
-                    print(f"提取到坐标: ({row+1}, {col+1})")
-                    
-                    if 0 <= row < 19 and 0 <= col < 19 and self.board[row, col] == 0:
-                        # 下棋
-                        self.board[row, col] = self.current_player
-                        self.move_history.append((row, col, self.current_player))
-                        self.current_player *= -1
-                        
-                        print(f"AI成功下棋: ({row+1}, {col+1})")
-                        
-                        if callback:
-                            callback(row, col, suggestion)
-                        return True
-                    else:
-                        print(f"坐标无效或位置已有棋子: ({row+1}, {col+1})")
-                
-                # 如果坐标无效，使用智能备用位置
-                fallback_positions = self.get_smart_fallback_positions()
-                for fallback_row, fallback_col in fallback_positions:
-                    if self.board[fallback_row, fallback_col] == 0:
-                        self.board[fallback_row, fallback_col] = self.current_player
-                        self.move_history.append((fallback_row, fallback_col, self.current_player))
-                        self.current_player *= -1
-                        print(f"AI使用智能备用位置下棋: ({fallback_row+1}, {fallback_col+1})")
-                        if callback:
-                            callback(fallback_row, fallback_col, f"AI选择备用位置: ({fallback_row+1}, {fallback_col+1})")
-                        return True
-                
-                # 如果没有找到有效坐标，返回建议
-                if callback:
-                    callback(None, None, suggestion)
-                return False
-                
-            except Exception as e:
-                print(f"AI思考出错: {str(e)}")
-                if callback:
-                    callback(None, None, f"AI思考出错：{str(e)}")
-                return False
+{question}"""
+        
+        reply = self.stream_model(
+            quick_prompt, "quick",
+            max_tokens=300,  # 减少token数量
+            temperature=0.5,  # 降低随机性，提高响应速度
+            symmetric=True,
+            board=board,
+            current_player=current_player,
+            turn=self._session_turn(move_history, current_player, board, question)
+        )
+        
+        if on_reply:
+            on_reply(reply)
+        
+        move = None
+        checked = None
+        for text in reply:
+            # 只在确定写完的部分里找坐标，且同一段文本不重复解析
+            prefix = confirmed_prefix(text)
+            if prefix == checked:
+                continue
+            checked = prefix
+            move = self._legal_quick_move(prefix, reply, position, current_player, final=False)
+            if move is not None:
+                break
+        else:
+            if reply.cancelled:
+                return reply.text, "请求已取消", None
+            if reply.error is not None:
+                return None, reply.error, None
+            # 流结束后末尾的数字也已完整
+            move = self._legal_quick_move(reply.text, reply, position, current_player)
+        
+        print(f"AI快速回复: {reply.text[:100]}...")
+        if not reply.done:
+            if on_commentary:
+                reply.finish_in_background(on_commentary)
+            else:
+                reply.cancel()
+        return reply.text, None, move
+    
+    def _legal_quick_move(self, text, reply, position, current_player, final=True):
+        """从回复文本中提取排名最高的合法落子，换算到当前朝向后返回(row, col)
+        
+        合法性按position的完整规则判断，与落子时GameState.play的检查一致，提前提交的坐标不会被拒。
+        回复还没读完(final=False)时只接受有明确推荐语气或位于回复开头的坐标，其余等读完全文再排序。
+        """
+        def is_legal(row, col):
+            return position.is_valid_move(*reply.to_current(row, col), current_player)
+        
+        move = best_move(text, self.board_size, is_legal=is_legal, min_score=float("-inf") if final else CONFIDENT)
+        if move is None:
+            return None
+        row, col = reply.to_current(*move)
+        print(f"提取到坐标: ({row+1}, {col+1})")
+        return row, col
+    
+    def play_quick_move(self, commentary_callback=None):
+        """获取并下出AI的下一步棋，返回(row, col, 说明)，没有下棋时row和col为None；会阻塞，须在后台线程调用
+        
+        给出commentary_callback时，模型的完整解说在后台读完后再回调。
+        思考基于开始时的快照，不加锁；落子以快照版本提交，期间用户重置或改动了局面时放弃这一手。
+        """
+        snapshot = self.game.snapshot()
+        try:
+            # 开局库命中时不发请求
+            book_move = self.get_book_move(snapshot.board, snapshot.current_player)
+            if book_move is not None and self._play_ai_move(*book_move[:2], version=snapshot.version):
+                row, col, count = book_move
+                print(f"AI按开局库下棋: ({row+1}, {col+1})")
+                return row, col, f"开局库: ({row+1}, {col+1})，棋谱中出现{count}次"
+            
+            # 用户思考期间已预先请求过这个局面时直接取结果，请求仍在进行时只需等剩余时间
+            pondered = self.ponderer.take(snapshot.board, snapshot.current_player) if self.ponderer else None
+            if pondered is not None:
+                print("AI预判命中")
+                suggestion, error, move = pondered.result()
+            else:
+                suggestion, error, move = self.request_quick_move(
+                    snapshot.position, snapshot.move_history, snapshot.current_player, commentary_callback)
+            
+            if error is not None:
+                return None, None, f"API调用失败：{error}"
+            
+            if move is not None and self._play_ai_move(*move, version=snapshot.version):
+                row, col = move
+                print(f"AI成功下棋: ({row+1}, {col+1})")
+                return row, col, suggestion
+            
+            # 如果坐标无效，使用智能备用位置
+            fallback_positions = self.get_smart_fallback_positions(snapshot.move_history)
+            for fallback_row, fallback_col in fallback_positions:
+                if self.game.is_stale(snapshot.version):
+                    break
+                if self._play_ai_move(fallback_row, fallback_col, version=snapshot.version):
+                    print(f"AI使用智能备用位置下棋: ({fallback_row+1}, {fallback_col+1})")
+                    return fallback_row, fallback_col, f"AI选择备用位置: ({fallback_row+1}, {fallback_col+1})"
+            
+            if self.game.is_stale(snapshot.version):
+                print("AI思考期间局面已改变，放弃这一手")
+                return None, None, "局面已改变，AI放弃这一手"
+            
+            # 如果没有找到有效坐标，返回建议
+            return None, None, suggestion
+            
+        except Exception as e:
+            print(f"AI思考出错: {str(e)}")
+            return None, None, f"AI思考出错：{str(e)}"
+    
+    def get_quick_ai_move(self, callback=None, commentary_callback=None):
+        """快速获取AI的下一步棋 - 优化版本
+        
+        在后台线程中运行play_quick_move，落子一确定就调用callback；给出commentary_callback时，
+        模型的完整解说在后台读完后再回调。
+        """
+        def ai_think():
+            row, col, suggestion = self.play_quick_move(commentary_callback)
+            if callback:
+                callback(row, col, suggestion)
+            return row is not None
         
         # 在后台线程中运行AI思考
         thread = threading.Thread(target=ai_think)
@@ -198,10 +393,43 @@ class GoAI:
         thread.start()
         return thread
     
-    def get_smart_fallback_positions(self):
+    def _play_ai_move(self, row, col, version=None):
+        """落下AI的棋子，随后开始为用户的应手做预判；不合法或局面已不是version时返回False"""
+        if not self.game.play(row, col, version=version):
+            return False
+        self._ponder()
+        return True
+    
+    def _ponder(self):
+        snapshot = self.game.snapshot()
+        if self.ponderer and snapshot.current_player == Stone.BLACK:
+            self.ponderer.start(snapshot.position, snapshot.move_history, snapshot.current_player)
+    
+    def set_pondering(self, enabled, max_candidates=3):
+        """开启/关闭预判：用户思考时按本地启发式猜测其落子，提前请求AI的应手"""
+        if enabled and self.ponderer is None:
+            self.ponderer = Ponderer(self, max_candidates=max_candidates)
+            self._ponder()
+        elif not enabled and self.ponderer is not None:
+            self.ponderer.shutdown()
+            self.ponderer = None
+    
+    def get_book_move(self, board=None, current_player=None):
+        """查询开局库，返回出现次数最多的空位(row, col, 次数)，不在库中时返回None；默认查询当前对局"""
+        if self.book is None:
+            return None
+        board = self.board if board is None else board
+        current_player = self.current_player if current_player is None else current_player
+        for row, col, count in self.book.lookup(board, current_player == Stone.BLACK):
+            if board[row, col] == 0:
+                return row, col, count
+        return None
+    
+    def get_smart_fallback_positions(self, move_history=None):
         """获取智能备用位置"""
         # 根据当前局面智能选择备用位置
-        occupied_positions = [(row, col) for row, col, _ in self.move_history]
+        move_history = self.move_history if move_history is None else move_history
+        occupied_positions = [(row, col) for row, col, _ in move_history]
         
         # 优先选择星位
         star_positions = [(3, 3), (3, 9), (3, 15), (9, 3), (9, 9), (9, 15), (15, 3), (15, 9), (15, 15)]
@@ -221,16 +449,18 @@ class GoAI:
             if pos not in occupied_positions:
                 yield pos
     
-    def get_ai_move(self, callback=None):
+    def get_ai_move(self, callback=None, commentary_callback=None):
         """获取AI的下一步棋并自动下棋 - 使用快速版本"""
-        return self.get_quick_ai_move(callback)
+        return self.get_quick_ai_move(callback, commentary_callback)
     
     def reset_game(self):
         """重置游戏"""
-        self.board = np.zeros((self.board_size, self.board_size), dtype=int)
-        self.current_player = 1
-        self.move_history = []
-        self.ai_thinking = False
+        self.game.reset()
+        if self.session:
+            self.session.reset()
+        if self.ponderer:
+            self.ponderer.cancel()
+            self._ponder()
 
 if __name__ == "__main__":
     # 测试AI功能
@@ -1,38 +1,447 @@
-# -*- coding: utf-8 -*-
-# Go Game Board Implementation
-import numpy as np
-from typing import List, Tuple, Optional, Set
-from enum import Enum
-
-class Stone(Enum):
-    EMPTY = 0
-    BLACK = 1
-    WHITE = 2
-
-class GoBoard:
-    def __init__(self, size: int = 19):
-        self.size = size
-        self.board = np.zeros((size, size), dtype=int)
-        self.captured_black = 0
-        self.captured_white = 0
-        self.move_history = []
-        self.ko_position = None
-        
-    def is_valid_move(self, row: int, col: int, stone: Stone) -> bool:
-        if not (0 <= row < self.size and 0 <= col < self.size):
-            return False
-        if self.board[row, col] != Stone.EMPTY.value:
-            return False
-        if (row, col) == self.ko_position:
-            return False
-        return True
-    
-    def place_stone(self, row: int, col: int, stone: Stone) -> bool:
-        if not self.is_valid_move(row, col, stone):
-            return False
-        self.board[row, col] = stone.value
-        self.move_history.append((row, col, stone))
-        return True
-    
-    def get_board_state(self) -> np.ndarray:
-        return self.board.copy()
+# -*- coding: utf-8 -*-
+# Go Game Board Implementation
+import numpy as np
+from typing import List, Tuple, Optional, Set, NamedTuple
+from enum import Enum
+
+_ZOBRIST_SEED = 0x60B0A4D
+_zobrist_tables = {}
+
+def zobrist_table(size: int) -> np.ndarray:
+    """返回(3, size*size)的64位Zobrist随机数表，按Stone.value索引，EMPTY行为0"""
+    table = _zobrist_tables.get(size)
+    if table is None:
+        rng = np.random.default_rng(_ZOBRIST_SEED + size)
+        table = rng.integers(0, 2**64, size=(3, size * size), dtype=np.uint64)
+        table[0] = 0
+        table.setflags(write=False)
+        _zobrist_tables[size] = table
+    return table
+
+# 轮到白棋时异或到局面哈希上，用于区分行棋方
+ZOBRIST_WHITE_TO_MOVE = 0x9E3779B97F4A7C15
+
+class Stone(Enum):
+    EMPTY = 0
+    BLACK = 1
+    WHITE = 2
+
+    @property
+    def opponent(self) -> "Stone":
+        if self == Stone.BLACK:
+            return Stone.WHITE
+        if self == Stone.WHITE:
+            return Stone.BLACK
+        return Stone.EMPTY
+
+class StoneGroup:
+    """棋串：同色相连的棋子及其气，按点位(row * size + col)记录"""
+    __slots__ = ("color", "stones", "liberties", "hash")
+
+    def __init__(self, color: int, stones: Set[int], liberties: Set[int], hash: int = 0):
+        self.color = color
+        self.stones = stones
+        self.liberties = liberties
+        self.hash = hash  # 串内所有棋子Zobrist值的异或，提子时直接从局面哈希中异或掉
+
+class MoveDelta(NamedTuple):
+    """一手棋对棋盘的改动，悔棋/重做据此原地还原；过手时row=col=-1"""
+    row: int
+    col: int
+    stone: Stone
+    captured: Tuple[int, ...]
+    prev_ko: Optional[Tuple[int, int]]
+    prev_hash: int
+
+class GoBoard:
+    def __init__(self, size: int = 19):
+        self.size = size
+        self.board = np.zeros((size, size), dtype=int)
+        self.captured_black = 0  # 被提走的黑子数
+        self.captured_white = 0  # 被提走的白子数
+        self.move_history = []
+        self.setup: List[Tuple[int, int, Stone]] = []  # 摆子(让子、棋谱的AB/AW)，不计入落子历史
+        self.ko_position = None
+
+        # 每个点所属的棋串，空点为None；合并时把小串并入大串(按大小合并)，
+        # 因此查找所属棋串是O(1)，落子/提子只触及相邻棋串
+        self._groups: List[Optional[StoneGroup]] = [None] * (size * size)
+        self._neighbors = [self._compute_neighbors(p) for p in range(size * size)]
+
+        # 增量维护的Zobrist局面哈希，以及出现过的局面集合(用于全局同形禁着)
+        self._zobrist_table = zobrist_table(size)
+        self._zobrist = [[int(v) for v in row] for row in self._zobrist_table]
+        self.hash = 0
+        self.position_hashes: Set[int] = {self.hash}
+
+        # 悔棋/重做栈，保存每手的MoveDelta
+        self._undo_stack: List[MoveDelta] = []
+        self._redo_stack: List[MoveDelta] = []
+
+    def _compute_neighbors(self, point: int) -> Tuple[int, ...]:
+        row, col = divmod(point, self.size)
+        neighbors = []
+        if row > 0:
+            neighbors.append(point - self.size)
+        if row < self.size - 1:
+            neighbors.append(point + self.size)
+        if col > 0:
+            neighbors.append(point - 1)
+        if col < self.size - 1:
+            neighbors.append(point + 1)
+        return tuple(neighbors)
+
+    def is_valid_move(self, row: int, col: int, stone: Stone) -> bool:
+        if not (0 <= row < self.size and 0 <= col < self.size):
+            return False
+        if stone == Stone.EMPTY:
+            return False
+        point = row * self.size + col
+        if self._groups[point] is not None:
+            return False
+        if (row, col) == self.ko_position:
+            return False
+        if self._is_suicide(point, stone.value):
+            return False
+        if self._next_hash(point, stone.value) in self.position_hashes:
+            return False
+        return True
+
+    def _is_suicide(self, point: int, color: int) -> bool:
+        """落子后自身无气且不能提子即为自杀"""
+        for n in self._neighbors[point]:
+            group = self._groups[n]
+            if group is None:
+                return False
+            if group.color == color:
+                if len(group.liberties) > 1:
+                    return False
+            elif len(group.liberties) == 1:
+                return False
+        return True
+
+    def legal_mask(self, stone: Stone) -> np.ndarray:
+        """返回(size, size)的布尔数组，True表示stone可以落子(已排除占用、劫、自杀和同形)"""
+        if stone == Stone.EMPTY:
+            return np.zeros((self.size, self.size), dtype=bool)
+        color = stone.value
+        empty = self.board == Stone.EMPTY.value
+        libs = self._liberty_counts()
+        # 有空的邻点、或相邻己方棋串不止一气、或相邻对方棋串只剩一气(可提子)，则不是自杀
+        captures = self._any_neighbor((self.board == stone.opponent.value) & (libs == 1))
+        mask = empty & (self._any_neighbor(empty)
+                        | self._any_neighbor((self.board == color) & (libs > 1))
+                        | captures)
+        if self.ko_position is not None:
+            mask[self.ko_position] = False
+
+        # 同形检查：不提子的落子直接异或，提子的少数点单独计算
+        next_hash = self._zobrist_table[color] ^ np.uint64(self.hash)
+        for point in np.flatnonzero(mask & captures).tolist():
+            next_hash[point] = self._next_hash(point, color)
+        history = np.sort(np.fromiter(self.position_hashes, dtype=np.uint64,
+                                      count=len(self.position_hashes)))
+        index = np.searchsorted(history, next_hash) % history.size
+        mask &= (history[index] != next_hash).reshape(self.size, self.size)
+        return mask
+
+    def get_valid_moves(self, stone: Stone) -> List[Tuple[int, int]]:
+        """返回stone所有合法落子点的(row, col)列表"""
+        rows, cols = np.nonzero(self.legal_mask(stone))
+        return list(zip(rows.tolist(), cols.tolist()))
+
+    def _liberty_counts(self) -> np.ndarray:
+        """每个棋子所在棋串的气数，空点为0"""
+        counts = [len(g.liberties) if g is not None else 0 for g in self._groups]
+        return np.array(counts).reshape(self.size, self.size)
+
+    @staticmethod
+    def _any_neighbor(mask: np.ndarray) -> np.ndarray:
+        """某点的上下左右任一邻点在mask中为True"""
+        result = np.zeros_like(mask)
+        result[1:, :] |= mask[:-1, :]
+        result[:-1, :] |= mask[1:, :]
+        result[:, 1:] |= mask[:, :-1]
+        result[:, :-1] |= mask[:, 1:]
+        return result
+
+    def _next_hash(self, point: int, color: int) -> int:
+        """不落子，计算在point落子(含提子)后的局面哈希"""
+        h = self.hash ^ self._zobrist[color][point]
+        seen = []
+        for n in self._neighbors[point]:
+            group = self._groups[n]
+            if group is not None and group.color != color and len(group.liberties) == 1 \
+                    and group not in seen:
+                seen.append(group)
+                h ^= group.hash
+        return h
+
+    def place_stone(self, row: int, col: int, stone: Stone) -> bool:
+        if not self.is_valid_move(row, col, stone):
+            return False
+        self._apply_stone(row, col, stone)
+        self._redo_stack.clear()
+        return True
+
+    def setup_stone(self, row: int, col: int, stone: Stone) -> bool:
+        """摆子：直接放上棋盘，不记入落子历史、不能悔棋，也不改变行棋方
+
+        只能在第一手之前摆；点已被占用、越界，或摆上后会提子/自身无气时返回False。
+        """
+        if self._undo_stack or self._redo_stack or stone == Stone.EMPTY:
+            return False
+        if not (0 <= row < self.size and 0 <= col < self.size):
+            return False
+        point = row * self.size + col
+        if self._groups[point] is not None or self._is_suicide(point, stone.value):
+            return False
+        for n in self._neighbors[point]:
+            group = self._groups[n]
+            if group is not None and group.color != stone.value and len(group.liberties) == 1:
+                return False
+        self._play(point, stone.value)
+        self.setup.append((row, col, stone))
+        # 摆子前的局面不算出现过，同形禁着从摆好后的局面算起
+        self.position_hashes = {self.hash}
+        return True
+
+    def pass_move(self, stone: Stone):
+        """过手，记录为(-1, -1)并解除劫"""
+        self._apply_pass(stone)
+        self._redo_stack.clear()
+
+    def _apply_stone(self, row: int, col: int, stone: Stone):
+        prev_ko, prev_hash = self.ko_position, self.hash
+        point = row * self.size + col
+        group, captured = self._play(point, stone.value)
+
+        # 只提一子、且落下的子是单子单气时形成劫，对方不能立即回提
+        self.ko_position = None
+        if len(captured) == 1 and len(group.stones) == 1 and len(group.liberties) == 1:
+            self.ko_position = divmod(captured[0], self.size)
+
+        self.position_hashes.add(self.hash)
+        self.move_history.append((row, col, stone))
+        self._undo_stack.append(MoveDelta(row, col, stone, tuple(captured), prev_ko, prev_hash))
+
+    def _apply_pass(self, stone: Stone):
+        self._undo_stack.append(MoveDelta(-1, -1, stone, (), self.ko_position, self.hash))
+        self.ko_position = None
+        self.move_history.append((-1, -1, stone))
+
+    @property
+    def last_delta(self) -> Optional[MoveDelta]:
+        """最近一手的改动(含提子)，没有落子时为None"""
+        return self._undo_stack[-1] if self._undo_stack else None
+
+    def can_undo(self) -> bool:
+        return bool(self._undo_stack)
+
+    def can_redo(self) -> bool:
+        return bool(self._redo_stack)
+
+    def undo(self) -> Optional[MoveDelta]:
+        """撤销上一手，只还原该手触及的棋串；没有可撤销的棋时返回None"""
+        if not self._undo_stack:
+            return None
+        delta = self._undo_stack.pop()
+        if delta.row >= 0:
+            self.position_hashes.discard(self.hash)
+            self._unplay(delta.row * self.size + delta.col, delta.stone.value, delta.captured)
+        self.ko_position = delta.prev_ko
+        self.hash = delta.prev_hash
+        self.move_history.pop()
+        self._redo_stack.append(delta)
+        return delta
+
+    def redo(self) -> Optional[MoveDelta]:
+        """重做最近一次撤销的棋；没有可重做的棋时返回None"""
+        if not self._redo_stack:
+            return None
+        delta = self._redo_stack.pop()
+        if delta.row >= 0:
+            self._apply_stone(delta.row, delta.col, delta.stone)
+        else:
+            self._apply_pass(delta.stone)
+        return delta
+
+    def _play(self, point: int, color: int) -> Tuple[StoneGroup, List[int]]:
+        """落子并更新棋串与气，返回落子所在棋串和被提的点位"""
+        key = self._zobrist[color][point]
+        group = StoneGroup(color, {point}, set(), key)
+        for n in self._neighbors[point]:
+            if self._groups[n] is None:
+                group.liberties.add(n)
+        self._groups[point] = group
+        self.board.flat[point] = color
+        self.hash ^= key
+
+        captured = []
+        for n in self._neighbors[point]:
+            other = self._groups[n]
+            if other is None or other is group:
+                continue
+            if other.color == color:
+                group = self._merge(group, other)
+                group.liberties.discard(point)
+            else:
+                other.liberties.discard(point)
+                if not other.liberties:
+                    captured.extend(other.stones)
+                    self._remove_group(other)
+        return group, captured
+
+    def _merge(self, a: StoneGroup, b: StoneGroup) -> StoneGroup:
+        if len(a.stones) < len(b.stones):
+            a, b = b, a
+        a.stones |= b.stones
+        a.liberties |= b.liberties
+        a.hash ^= b.hash
+        for s in b.stones:
+            self._groups[s] = a
+        return a
+
+    def _remove_group(self, group: StoneGroup):
+        """提掉整串棋子，并把提掉的点还给相邻棋串作为气"""
+        if group.color == Stone.BLACK.value:
+            self.captured_black += len(group.stones)
+        else:
+            self.captured_white += len(group.stones)
+        self.hash ^= group.hash
+        for s in group.stones:
+            self._groups[s] = None
+            self.board.flat[s] = Stone.EMPTY.value
+        for s in group.stones:
+            for n in self._neighbors[s]:
+                other = self._groups[n]
+                if other is not None:
+                    other.liberties.add(s)
+
+    def _unplay(self, point: int, color: int, captured: Tuple[int, ...]):
+        """拿掉point上的子并放回被提的子，重建受影响的棋串"""
+        opponent = Stone(color).opponent.value
+        for s in self._groups[point].stones:
+            self._groups[s] = None
+        self.board.flat[point] = Stone.EMPTY.value
+        for s in captured:
+            self.board.flat[s] = opponent
+        if opponent == Stone.BLACK.value:
+            self.captured_black -= len(captured)
+        else:
+            self.captured_white -= len(captured)
+
+        # 原棋串去掉point后可能断开，和放回的棋子一起重新划分
+        for n in self._neighbors[point]:
+            if self._groups[n] is None and self.board.flat[n] == color:
+                self._rebuild_group(n)
+        for s in captured:
+            if self._groups[s] is None:
+                self._rebuild_group(s)
+
+        # 其余相邻棋串的气：point重新成为气，放回的棋子占掉的点不再是气
+        for n in self._neighbors[point]:
+            group = self._groups[n]
+            if group is not None:
+                group.liberties.add(point)
+        for s in captured:
+            for n in self._neighbors[s]:
+                group = self._groups[n]
+                if group is not None and group.color == color:
+                    group.liberties.discard(s)
+
+    def _rebuild_group(self, seed: int):
+        """从seed出发，对尚未归属棋串的同色棋子重新建串"""
+        color = int(self.board.flat[seed])
+        group = StoneGroup(color, {seed}, set())
+        self._groups[seed] = group
+        stack = [seed]
+        while stack:
+            p = stack.pop()
+            group.hash ^= self._zobrist[color][p]
+            for n in self._neighbors[p]:
+                value = self.board.flat[n]
+                if value == Stone.EMPTY.value:
+                    group.liberties.add(n)
+                elif value == color and self._groups[n] is None:
+                    self._groups[n] = group
+                    group.stones.add(n)
+                    stack.append(n)
+
+    def copy(self) -> "GoBoard":
+        """独立的副本(含棋串、局面哈希和悔棋/重做栈)，按当前局面复制，不重放落子"""
+        other = GoBoard.__new__(GoBoard)
+        other.__dict__.update(self.__dict__)
+        other.board = self.board.copy()
+        other.move_history = list(self.move_history)
+        other.setup = list(self.setup)
+        other.position_hashes = set(self.position_hashes)
+        other._undo_stack = list(self._undo_stack)
+        other._redo_stack = list(self._redo_stack)
+        clones = {}
+        groups: List[Optional[StoneGroup]] = []
+        for group in self._groups:
+            if group is not None:
+                clone = clones.get(id(group))
+                if clone is None:
+                    clone = clones[id(group)] = StoneGroup(group.color, set(group.stones),
+                                                           set(group.liberties), group.hash)
+                group = clone
+            groups.append(group)
+        other._groups = groups
+        return other
+
+    def position_key(self, stone: Stone) -> int:
+        """局面+行棋方的64位键，可直接用作缓存/置换表的键"""
+        return self.hash ^ ZOBRIST_WHITE_TO_MOVE if stone == Stone.WHITE else self.hash
+
+    def get_liberties(self, row: int, col: int) -> int:
+        """返回(row, col)所在棋串的气数，空点返回0"""
+        group = self._groups[row * self.size + col]
+        return len(group.liberties) if group is not None else 0
+
+    def is_eye(self, row: int, col: int, stone: Stone) -> bool:
+        """(row, col)是空点且四周全是stone的棋子(简单眼)"""
+        point = row * self.size + col
+        if self._groups[point] is not None:
+            return False
+        color = stone.value
+        for n in self._neighbors[point]:
+            group = self._groups[n]
+            if group is None or group.color != color:
+                return False
+        return True
+
+    def get_area_score(self) -> Tuple[int, int]:
+        """数子法：返回(黑子+黑地, 白子+白地)，只与一方相邻的空白区域算作该方的地，不含贴目"""
+        black = int(np.count_nonzero(self.board == Stone.BLACK.value))
+        white = int(np.count_nonzero(self.board == Stone.WHITE.value))
+        visited = set()
+        for start in range(self.size * self.size):
+            if self._groups[start] is not None or start in visited:
+                continue
+            region, borders = [start], set()
+            visited.add(start)
+            for p in region:
+                for n in self._neighbors[p]:
+                    group = self._groups[n]
+                    if group is not None:
+                        borders.add(group.color)
+                    elif n not in visited:
+                        visited.add(n)
+                        region.append(n)
+            if borders == {Stone.BLACK.value}:
+                black += len(region)
+            elif borders == {Stone.WHITE.value}:
+                white += len(region)
+        return black, white
+
+    def get_score(self) -> Tuple[int, int]:
+        """返回(黑棋提子数, 白棋提子数)"""
+        return self.captured_white, self.captured_black
+
+    def get_board_state(self) -> np.ndarray:
+        """棋盘的只读视图，随对局原地更新，不复制；需要固定不变的局面时自行copy()"""
+        view = self.board.view()
+        view.flags.writeable = False
+        return view
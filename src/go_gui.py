@@ -2,8 +2,12 @@
 from tkinter import ttk, messagebox, scrolledtext
 import sys
 import os
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
 sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
 from go_ai import GoAI
+from src.board_renderer import BoardRenderer
+from src.go_board import Stone
+from src.ai_executor import AIExecutor
 
 class GoGameGUI:
     """围棋游戏图形界面"""
@@ -21,6 +25,10 @@ class GoGameGUI:
             messagebox.showerror("错误", f"AI初始化失败：{str(e)}")
             self.ai_status = "连接失败"
         
+        # 所有模型请求都交给后台执行器，界面线程不等待网络
+        self.ai_executor = AIExecutor(self.root)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        
         self.setup_ui()
         
     def setup_ui(self):
@@ -40,6 +48,11 @@ class GoGameGUI:
         # 棋盘画布
         self.canvas = tk.Canvas(left_frame, width=600, height=600, bg="#DEB887")
         self.canvas.pack()
+        # 网格只画一次，之后每手只重绘有变化的点；最新一手按玩家高亮(用户红色系，AI蓝色系)
+        self.renderer = BoardRenderer(self.canvas, 19, highlight_colors={
+            Stone.BLACK: ["#FF6B6B", "#FF8E8E", "#FFB1B1", "#FFD4D4"],
+            Stone.WHITE: ["#4ECDC4", "#7EDDD6", "#A8E6E1", "#C2F0EB"],
+        })
         
         # 棋盘控制按钮
         button_frame = ttk.Frame(left_frame)
@@ -53,6 +66,12 @@ class GoGameGUI:
         self.auto_ai = tk.BooleanVar(value=True)
         ttk.Checkbutton(button_frame, text="AI自动响应", variable=self.auto_ai).pack(side=tk.LEFT, padx=10)
         
+        # 预判开关：用户思考时提前请求AI对其可能落子的应手
+        self.ponder = tk.BooleanVar(value=True)
+        ttk.Checkbutton(button_frame, text="后台预判", variable=self.ponder,
+                        command=self.toggle_pondering).pack(side=tk.LEFT, padx=10)
+        self.toggle_pondering()
+        
         # 右侧信息区域
         right_frame = ttk.Frame(main_frame)
         right_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=(20, 0))
@@ -87,83 +106,33 @@ class GoGameGUI:
                                             foreground="red")
         self.current_player_label.pack(pady=10)
         
-        # 绘制棋盘
+        # 绘制棋盘，之后棋盘和信息随对局状态的变化通知更新
         self.draw_board()
         self.update_info()
+        self.go_ai.game.subscribe(self.on_game_event)
         
         # 绑定鼠标点击事件
         self.canvas.bind("<Button-1>", self.on_canvas_click)
         
     def draw_board(self):
-        """绘制围棋棋盘"""
-        self.canvas.delete("all")
-        
-        # 棋盘参数
-        board_size = 19
-        cell_size = 30
-        start_x = 30
-        start_y = 30
-        
-        # 绘制网格线
-        for i in range(board_size):
-            # 垂直线
-            x = start_x + i * cell_size
-            self.canvas.create_line(x, start_y, x, start_y + (board_size-1) * cell_size, fill="black", width=1)
-            
-            # 水平线
-            y = start_y + i * cell_size
-            self.canvas.create_line(start_x, y, start_x + (board_size-1) * cell_size, y, fill="black", width=1)
-        
-        # 绘制星位
-        star_positions = [(3, 3), (3, 9), (3, 15), (9, 3), (9, 9), (9, 15), (15, 3), (15, 9), (15, 15)]
-        for row, col in star_positions:
-            x = start_x + col * cell_size
-            y = start_y + row * cell_size
-            self.canvas.create_oval(x-3, y-3, x+3, y+3, fill="black")
-        
-        # 绘制棋子
-        for row in range(board_size):
-            for col in range(board_size):
-                if self.go_ai.board[row, col] != 0:
-                    x = start_x + col * cell_size
-                    y = start_y + row * cell_size
-                    color = "black" if self.go_ai.board[row, col] == 1 else "white"
-                    self.canvas.create_oval(x-12, y-12, x+12, y+12, fill=color, outline="black", width=2)
-        
-        # 高亮最新棋子
-        self.highlight_latest_moves()
-        
-        # 存储棋盘参数供点击事件使用
-        self.cell_size = cell_size
-        self.start_x = start_x
-        self.start_y = start_y
-        
-    def highlight_latest_moves(self):
-        """高亮最新棋子 - 只高亮最新一步"""
-        if len(self.go_ai.move_history) < 1:
-            return
-            
-        # 获取最新一步棋
-        latest_move = self.go_ai.move_history[-1]
-        row, col, player = latest_move
-        
-        x = self.start_x + col * self.cell_size
-        y = self.start_y + row * self.cell_size
-        
-        # 根据玩家选择高亮颜色
-        if player == 1:  # 用户(黑棋) - 使用红色系
-            highlight_colors = ["#FF6B6B", "#FF8E8E", "#FFB1B1", "#FFD4D4"]
-        else:  # AI(白棋) - 使用蓝色系
-            highlight_colors = ["#4ECDC4", "#7EDDD6", "#A8E6E1", "#C2F0EB"]
-        
-        # 绘制多层高亮效果，创建渐进效果
-        for j, color in enumerate(highlight_colors):
-            radius = 15 + j * 2  # 逐渐增大的半径
-            width = 3 - j * 0.5  # 逐渐减小的线宽
-            if width < 1:
-                width = 1
-            self.canvas.create_oval(x-radius, y-radius, x+radius, y+radius, 
-                                  outline=color, width=width, fill="")
+        """绘制围棋棋盘：只重绘与上次相比有变化的点，并把高亮移到最新一手"""
+        self.renderer.update(self.go_ai.board, self.go_ai.game.last_move)
+        
+    def on_game_event(self, event):
+        """对局状态变化(可能来自AI线程) - 转到主线程只重绘落子和提子涉及的点"""
+        try:
+            self.root.after(0, lambda: self._apply_game_event(event))
+        except (RuntimeError, tk.TclError):
+            pass  # 窗口已关闭(主循环已退出或根窗口已销毁)
+        
+    def _apply_game_event(self, event):
+        self.renderer.apply(event, self.go_ai.board, self.go_ai.game.last_move)
+        self.update_info()
+        
+    def toggle_pondering(self):
+        """开关预判"""
+        if self.ai_status == "已连接":
+            self.go_ai.set_pondering(self.ponder.get())
         
     def on_canvas_click(self, event):
         """处理棋盘点击事件 - 添加权限控制"""
@@ -172,44 +141,47 @@ class GoGameGUI:
             return
         
         # 权限控制：只有轮到用户(黑棋)时才能点击下棋
-        if self.go_ai.current_player != 1:
+        if self.go_ai.current_player != Stone.BLACK:
             messagebox.showinfo("提示", "当前轮到AI(白棋)下棋，请等待AI思考...")
             return
             
-        # 计算点击的格子坐标
-        col = round((event.x - self.start_x) / self.cell_size)
-        row = round((event.y - self.start_y) / self.cell_size)
-        
-        # 检查坐标是否有效
-        if 0 <= row < 19 and 0 <= col < 19:
+        # 计算点击的格子坐标，棋盘外的点击忽略
+        point = self.renderer.point_at(event.x, event.y)
+        if point is not None:
+            row, col = point
             if self.go_ai.make_move(row, col):
-                self.draw_board()
-                self.update_info()
+                # 局面已变，针对旧局面的建议和分析作废
+                self.ai_executor.cancel("suggestion", "analysis")
                 self.analysis_text.insert(tk.END, f"用户下棋：({row+1}, {col+1})\n")
                 self.analysis_text.see(tk.END)
                 
                 # 如果开启自动AI响应，让AI下棋
-                if self.auto_ai.get() and self.go_ai.current_player == -1:  # 轮到AI(白棋)
+                if self.auto_ai.get() and self.go_ai.current_player == Stone.WHITE:  # 轮到AI(白棋)
                     self.analysis_text.insert(tk.END, "AI正在思考...\n")
                     self.analysis_text.see(tk.END)
-                    self.root.update()
                     
-                    # 启动AI思考线程
-                    self.go_ai.get_ai_move(self.on_ai_move_complete)
+                    # 在后台执行AI思考，落子结果回到主线程显示
+                    self.ai_executor.submit("move", self.go_ai.play_quick_move, self.on_ai_commentary,
+                                            on_result=lambda result: self._update_ai_result(*result))
             else:
                 messagebox.showwarning("警告", "该位置已有棋子或无效位置")
                 
-    def on_ai_move_complete(self, row, col, suggestion):
-        """AI下棋完成回调 - 需要在主线程中执行"""
-        # 使用after方法确保在主线程中执行GUI更新
-        self.root.after(0, lambda: self._update_ai_result(row, col, suggestion))
+    def on_ai_commentary(self, text):
+        """AI落子后后台读完的完整解说 - 同样转到主线程显示"""
+        try:
+            self.root.after(0, lambda: self._show_commentary(text))
+        except (RuntimeError, tk.TclError):
+            pass  # 解说读完时窗口已关闭
+        
+    def _show_commentary(self, text):
+        simplified_analysis = self.simplify_ai_analysis(text)
+        self.analysis_text.insert(tk.END, f"AI解说：{simplified_analysis}\n\n")
+        self.analysis_text.see(tk.END)
         
     def _update_ai_result(self, row, col, suggestion):
         """更新AI结果的内部方法 - 精简版"""
         if row is not None and col is not None:
-            # AI成功下棋
-            self.draw_board()
-            self.update_info()
+            # AI成功下棋，棋盘已随落子通知更新
             self.analysis_text.insert(tk.END, f"AI下棋：({row+1}, {col+1})\n")
             
             # 精简AI分析结果，只显示关键信息
@@ -250,16 +222,17 @@ class GoGameGUI:
             
         self.analysis_text.insert(tk.END, "正在获取AI建议...\n")
         self.analysis_text.see(tk.END)
-        self.root.update()
         
-        try:
-            suggestion = self.go_ai.get_ai_suggestion()
-            simplified_analysis = self.simplify_ai_analysis(suggestion)
-            self.analysis_text.insert(tk.END, f"AI建议：{simplified_analysis}\n\n")
-            self.analysis_text.see(tk.END)
-        except Exception as e:
-            self.analysis_text.insert(tk.END, f"获取AI建议失败：{str(e)}\n\n")
-            self.analysis_text.see(tk.END)
+        # 再次点击时新请求取代尚未返回的旧请求
+        self.ai_executor.submit("suggestion", self.go_ai.get_ai_suggestion,
+                                on_result=lambda text: self._show_analysis("AI建议", text),
+                                on_error=lambda e: self._show_analysis("获取AI建议失败", str(e), simplify=False))
+    
+    def _show_analysis(self, title, text, simplify=True):
+        if simplify:
+            text = self.simplify_ai_analysis(text)
+        self.analysis_text.insert(tk.END, f"{title}：{text}\n\n")
+        self.analysis_text.see(tk.END)
             
     def analyze_position(self):
         """分析当前局面"""
@@ -269,22 +242,15 @@ class GoGameGUI:
             
         self.analysis_text.insert(tk.END, "正在分析局面...\n")
         self.analysis_text.see(tk.END)
-        self.root.update()
         
-        try:
-            analysis = self.go_ai.analyze_position("请详细分析当前局面。")
-            simplified_analysis = self.simplify_ai_analysis(analysis)
-            self.analysis_text.insert(tk.END, f"局面分析：{simplified_analysis}\n\n")
-            self.analysis_text.see(tk.END)
-        except Exception as e:
-            self.analysis_text.insert(tk.END, f"分析失败：{str(e)}\n\n")
-            self.analysis_text.see(tk.END)
+        self.ai_executor.submit("analysis", self.go_ai.analyze_position, "请详细分析当前局面。",
+                                on_result=lambda text: self._show_analysis("局面分析", text),
+                                on_error=lambda e: self._show_analysis("分析失败", str(e), simplify=False))
             
     def reset_game(self):
         """重置游戏"""
+        self.ai_executor.cancel()
         self.go_ai.reset_game()
-        self.draw_board()
-        self.update_info()
         self.analysis_text.delete(1.0, tk.END)
         self.analysis_text.insert(tk.END, "游戏已重置\n")
         
@@ -293,7 +259,7 @@ class GoGameGUI:
         self.info_text.delete(1.0, tk.END)
         
         # 明确显示当前玩家角色
-        current_player_name = "用户(黑棋)" if self.go_ai.current_player == 1 else "AI(白棋)"
+        current_player_name = "用户(黑棋)" if self.go_ai.current_player == Stone.BLACK else "AI(白棋)"
         
         info = f"""已下步数：{len(self.go_ai.move_history)}
 棋盘大小：{self.go_ai.board_size}x{self.go_ai.board_size}
@@ -302,7 +268,7 @@ class GoGameGUI:
 """
         if self.go_ai.move_history:
             for i, (row, col, player) in enumerate(self.go_ai.move_history[-5:]):
-                player_name = "用户(黑棋)" if player == 1 else "AI(白棋)"
+                player_name = "用户(黑棋)" if player == Stone.BLACK else "AI(白棋)"
                 info += f"第{i+1}步：{player_name} ({row+1}, {col+1})\n"
         else:
             info += "暂无棋子"
@@ -314,11 +280,18 @@ class GoGameGUI:
         
     def update_current_player_display(self):
         """更新当前操作者显示"""
-        if self.go_ai.current_player == 1:  # 用户(黑棋)
+        if self.go_ai.current_player == Stone.BLACK:  # 用户(黑棋)
             self.current_player_label.config(text="用户(黑棋)", foreground="red")
         else:  # AI(白棋)
             self.current_player_label.config(text="AI(白棋)", foreground="blue")
 
+    def on_close(self):
+        """关闭窗口：放弃尚未完成的AI请求"""
+        self.ai_executor.shutdown()
+        if self.ai_status == "已连接":
+            self.go_ai.set_pondering(False)
+        self.root.destroy()
+
 if __name__ == "__main__":
     root = tk.Tk()
     app = GoGameGUI(root)
@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+# Local Monte Carlo Tree Search engine
+import math
+import random
+import time
+import numpy as np
+from typing import List, Tuple, Optional, Dict
+from src.go_board import GoBoard, Stone
+
+PASS_MOVE = (-1, -1)
+
+class MCTSNode:
+    """搜索树节点，value_sum从走到该节点的一方(player)的角度累计胜负"""
+    __slots__ = ("move", "player", "parent", "children", "prior", "visits", "value_sum")
+
+    def __init__(self, move: Tuple[int, int], player: Stone, parent: Optional["MCTSNode"] = None,
+                 prior: float = 1.0):
+        self.move = move
+        self.player = player
+        self.parent = parent
+        self.children: Optional[List["MCTSNode"]] = None
+        self.prior = prior
+        self.visits = 0
+        self.value_sum = 0.0
+
+    @property
+    def q(self) -> float:
+        return self.value_sum / self.visits if self.visits else 0.0
+
+class MCTSGoAI:
+    """本地蒙特卡洛树搜索围棋AI，接口与QwenGoAI.get_best_move一致，不需要网络
+
+    纯Python随机模拟，单核每秒约300次(9路)、120次(13路)、50次(19路)；19路在默认5秒内约250次，
+    到不了max_playouts=1000，想要更多模拟请放宽time_limit或用ParallelMCTSGoAI。
+    """
+
+    def __init__(self, max_playouts: int = 1000, time_limit: Optional[float] = 5.0,
+                 selection: str = "puct", exploration: float = 1.4, komi: float = 7.5,
+                 max_playout_moves: Optional[int] = None, seed: Optional[int] = None):
+        if selection not in ("puct", "uct"):
+            raise ValueError(f"Unknown selection rule: {selection}")
+        self.max_playouts = max_playouts
+        self.time_limit = time_limit
+        self.selection = selection
+        self.exploration = exploration
+        self.komi = komi
+        self.max_playout_moves = max_playout_moves
+        self.rng = random.Random(seed)
+        self.last_root: Optional[MCTSNode] = None
+
+    def get_best_move(self, board: GoBoard, current_player: Stone) -> Optional[Tuple[int, int]]:
+        """搜索并返回访问次数最多的落子，过手时返回None"""
+        root = self.search(board, current_player)
+        best = self.best_child(root)
+        if best is None or best.move == PASS_MOVE:
+            return None
+        return best.move
+
+    def search(self, board: GoBoard, current_player: Stone) -> MCTSNode:
+        """在棋盘副本上原地落子/悔棋进行搜索，达到局数或时间上限即停止"""
+        board = board.copy()
+        root = MCTSNode(PASS_MOVE, current_player.opponent)
+        deadline = time.monotonic() + self.time_limit if self.time_limit else None
+        playouts = 0
+        while playouts < self.max_playouts:
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            self._playout(board, root)
+            playouts += 1
+        self.last_root = root
+        return root
+
+    def _playout(self, board: GoBoard, root: MCTSNode):
+        """一次完整的选择-扩展-模拟-回传，结束后棋盘恢复原状"""
+        node, depth, consecutive_passes = self._descend(board, root)
+        winner = self.simulate(board, node.player.opponent, consecutive_passes)
+        for _ in range(depth):
+            board.undo()
+        self._backup(node, 1, 1 if winner == Stone.BLACK else 0)
+
+    def _descend(self, board: GoBoard, root: MCTSNode) -> Tuple[MCTSNode, int, int]:
+        """从根选择到叶子并展开，返回(叶子, 落子步数, 连续过手数)"""
+        node = root
+        depth = 0
+        history = board.move_history
+        consecutive_passes = 1 if history and history[-1][0] == -1 else 0
+        while node.children:
+            node = self._select(node)
+            self._play(board, node.move, node.player)
+            depth += 1
+            consecutive_passes = consecutive_passes + 1 if node.move == PASS_MOVE else 0
+        if consecutive_passes < 2:
+            self._expand(board, node)
+        return node, depth, consecutive_passes
+
+    @staticmethod
+    def _backup(node: MCTSNode, visits: int, black_wins: int):
+        """把visits局模拟(其中黑胜black_wins局)的结果回传到根"""
+        while node is not None:
+            node.visits += visits
+            node.value_sum += black_wins if node.player == Stone.BLACK else visits - black_wins
+            node = node.parent
+
+    def simulate(self, board: GoBoard, player: Stone, consecutive_passes: int = 0) -> Stone:
+        """在棋盘副本上随机下完并数子判定胜方，不改动board
+
+        复制一次比逐手悔棋便宜得多：悔棋要重建被拆开的棋串，一局随机棋有数百手。
+        """
+        board = board.copy()
+        self._rollout(board, player, consecutive_passes)
+        black, white = board.get_area_score()
+        return Stone.BLACK if black - white - self.komi > 0 else Stone.WHITE
+
+    @staticmethod
+    def _play(board: GoBoard, move: Tuple[int, int], player: Stone):
+        if move == PASS_MOVE:
+            board.pass_move(player)
+        else:
+            board.place_stone(move[0], move[1], player)
+
+    def _select(self, node: MCTSNode) -> MCTSNode:
+        parent_visits = max(node.visits, 1)
+        if self.selection == "puct":
+            scale = self.exploration * math.sqrt(parent_visits)
+            return max(node.children,
+                       key=lambda c: c.q + scale * c.prior / (1 + c.visits))
+        log_visits = math.log(parent_visits)
+        return max(node.children,
+                   key=lambda c: c.q + self.exploration * math.sqrt(log_visits / c.visits)
+                   if c.visits else float("inf"))
+
+    def _expand(self, board: GoBoard, node: MCTSNode):
+        """展开所有合法点(不填自己的眼)和过手，先验由move_priors给出"""
+        player = node.player.opponent
+        mask = board.legal_mask(player)
+        rows, cols = np.nonzero(mask)
+        moves = [(r, c) for r, c in zip(rows.tolist(), cols.tolist()) if not board.is_eye(r, c, player)]
+        priors = self.move_priors(board, moves)
+        children = [MCTSNode(move, player, node, prior) for move, prior in priors.items()]
+        children.append(MCTSNode(PASS_MOVE, player, node, 1.0 / (len(moves) + 1)))
+        node.children = children
+
+    def move_priors(self, board: GoBoard, moves: List[Tuple[int, int]]) -> Dict[Tuple[int, int], float]:
+        """落子先验：均匀分布，略微偏向三、四线，压低一、二线"""
+        if not moves:
+            return {}
+        last = board.size - 1
+        weights = []
+        for row, col in moves:
+            line = min(row, col, last - row, last - col)
+            weights.append(0.3 if line == 0 else 0.7 if line == 1 else 1.2 if line in (2, 3) else 1.0)
+        total = sum(weights)
+        return {move: w / total for move, w in zip(moves, weights)}
+
+    def _rollout(self, board: GoBoard, player: Stone, consecutive_passes: int) -> int:
+        """随机走到双方连续过手或步数上限，不填自己的眼；返回走的步数"""
+        limit = self.max_playout_moves or board.size * board.size * 2
+        played = 0
+        size = board.size
+        while consecutive_passes < 2 and played < limit:
+            empties = np.flatnonzero(board.board == Stone.EMPTY.value).tolist()
+            move = PASS_MOVE
+            while empties:
+                i = self.rng.randrange(len(empties))
+                point = empties[i]
+                empties[i] = empties[-1]
+                empties.pop()
+                row, col = divmod(point, size)
+                if not board.is_eye(row, col, player) and board.place_stone(row, col, player):
+                    move = (row, col)
+                    break
+            if move == PASS_MOVE:
+                board.pass_move(player)
+            played += 1
+            consecutive_passes = consecutive_passes + 1 if move == PASS_MOVE else 0
+            player = player.opponent
+        return played
+
+    @staticmethod
+    def best_child(root: MCTSNode) -> Optional[MCTSNode]:
+        if not root.children:
+            return None
+        return max(root.children, key=lambda c: c.visits)
+
+    def root_statistics(self) -> List[Tuple[Tuple[int, int], int, float]]:
+        """上一次搜索根节点各候选的(落子, 访问次数, 胜率)，按访问次数降序"""
+        if self.last_root is None or not self.last_root.children:
+            return []
+        stats = [(c.move, c.visits, c.q) for c in self.last_root.children if c.visits]
+        return sorted(stats, key=lambda s: -s[1])
@@ -0,0 +1,427 @@
+# -*- coding: utf-8 -*-
+# Local stand-in for the DashScope generation and OpenAI-compatible chat APIs, with latency and fault injection
+import argparse
+import itertools
+import json
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple, Union
+
+from src.prompt_encoding import estimate_tokens
+
+Responder = Callable[[str], str]
+Latency = Callable[[random.Random], float]
+
+OPENAI_PATH = "/chat/completions"
+DASHSCOPE_PATH = "/services/aigc/text-generation/generation"
+STAR_POINTS = [(3, 3), (3, 15), (15, 3), (15, 15), (9, 9), (3, 9), (9, 3), (9, 15), (15, 9)]
+
+# 提示词里的棋盘编码(见prompt_encoding)：grid、rle和coords三种写法
+_GRID_ROW = re.compile(r"^\s*(\d{1,2}) ([.XO]{5,})\s*$", re.M)
+_RLE_ROW = re.compile(r"^\s*(\d{1,2}):((?:\d*[.XO])+)\s*$", re.M)
+_RLE_RUN = re.compile(r"(\d*)([.XO])")
+_COORDS_ROW = re.compile(r"^[黑白]\(\d+\):\s*(.+)$", re.M)
+_POINT = re.compile(r"(\d{1,2}),\s*(\d{1,2})")
+# 会话模式中逐轮告知的落子，如"黑(4,4)"
+_SESSION_MOVE = re.compile(r"[黑白]\((\d{1,2}),(\d{1,2})\)")
+_ORIGIN = re.compile(r"行号(\d)-|从(\d)开始")
+
+def parse_latency(spec: Union[str, float]) -> Latency:
+    """解析延迟分布(秒)：0.2或fixed:0.2、uniform:0.1,0.5、normal:0.3,0.1、exp:0.3(均值)，负值按0计"""
+    if isinstance(spec, (int, float)):
+        spec = f"fixed:{spec}"
+    kind, _, args = spec.partition(":")
+    if not args:
+        kind, args = "fixed", kind
+    try:
+        values = [float(value) for value in args.split(",")]
+    except ValueError:
+        raise ValueError(f"Bad latency spec: {spec}")
+    samplers = {
+        ("fixed", 1): lambda rng: values[0],
+        ("uniform", 2): lambda rng: rng.uniform(values[0], values[1]),
+        ("normal", 2): lambda rng: rng.gauss(values[0], values[1]),
+        ("exp", 1): lambda rng: rng.expovariate(1.0 / values[0]) if values[0] > 0 else 0.0,
+    }
+    sampler = samplers.get((kind.strip().lower(), len(values)))
+    if sampler is None:
+        raise ValueError(f"Bad latency spec: {spec} (fixed:S, uniform:A,B, normal:MEAN,STD or exp:MEAN)")
+    return lambda rng: max(0.0, sampler(rng))
+
+def load_replies(path: str) -> List[str]:
+    """读取脚本回复(JSON Lines)：每行是一个字符串，或带text字段的对象(如benchmarks/data/move_replies.jsonl)"""
+    replies = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                replies.append(record["text"] if isinstance(record, dict) else str(record))
+    if not replies:
+        raise ValueError(f"No replies in {path}")
+    return replies
+
+def read_board(prompt: str) -> Tuple[int, int, Set[Tuple[int, int]]]:
+    """从提示词中读出棋盘大小、坐标起点和已有棋子的点(从0开始)，读不到棋盘时按19路、起点1处理"""
+    match = _ORIGIN.search(prompt)
+    origin = int(next(group for group in match.groups() if group is not None)) if match else 1
+    size = 19
+    occupied = set()
+    for label, row in _GRID_ROW.findall(prompt):
+        size = len(row)
+        occupied.update((int(label) - origin, col) for col, point in enumerate(row) if point != ".")
+    for label, runs in _RLE_ROW.findall(prompt):
+        col = 0
+        for count, point in _RLE_RUN.findall(runs):
+            count = int(count or 1)
+            if point != ".":
+                occupied.update((int(label) - origin, col + i) for i in range(count))
+            col += count
+    for line in _COORDS_ROW.findall(prompt):
+        occupied.update((int(r) - origin, int(c) - origin) for r, c in _POINT.findall(line))
+    occupied.update((int(r) - origin, int(c) - origin) for r, c in _SESSION_MOVE.findall(prompt))
+    return size, origin, occupied
+
+class EngineResponder:
+    """按提示词中的局面给出一个空点：优先星位，否则随机；提示词要求JSON时按QwenGoAI的格式回答"""
+
+    def __init__(self, seed: Optional[int] = None):
+        self.rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def __call__(self, prompt: str) -> str:
+        size, origin, occupied = read_board(prompt)
+        empty = [(row, col) for row in range(size) for col in range(size) if (row, col) not in occupied]
+        if not empty:
+            return "棋盘已满，选择过手。"
+        stars = [point for point in STAR_POINTS if point in empty] if size == 19 else []
+        with self._lock:
+            picks = stars[:2] if len(stars) >= 2 else self.rng.sample(empty, min(2, len(empty)))
+        moves = [(row + origin, col + origin) for row, col in picks]
+        if "recommended_moves" in prompt:
+            data = {
+                "analysis": "本地模拟服务器的分析",
+                "recommended_moves": [{"position": f"({row},{col})", "reason": "模拟推荐", "priority": rank}
+                                      for rank, (row, col) in enumerate(moves, 1)],
+                "win_probability": "50%",
+                "strategy": "模拟策略",
+            }
+            return f"```json\n{json.dumps(data, ensure_ascii=False)}\n```"
+        row, col = moves[0]
+        return f"建议下一步走 ({row},{col})。这是本地模拟服务器给出的落子。"
+
+class MockServer:
+    """本地的DashScope/OpenAI兼容接口模拟服务器，用于离线测试并发、重试和缓存，以及可复现的端到端基准
+
+    支持DashScope的文本生成接口(dashscope_base_url，供Generation.call使用)和OpenAI兼容的
+    chat/completions接口(openai_base_url，供OpenAI客户端使用)，两者都支持流式(SSE)输出。
+    回复来自replies：None时按提示词中的局面给出空点，字符串列表时依次循环，也可以是函数(提示词->回复)。
+
+    每个请求按以下顺序注入故障：同时处理的请求超过max_concurrency、或以rate_limit的概率，返回429；
+    以timeout_rate的概率挂起hang秒后断开(模拟超时)；其余请求先等待latency分布的延迟再开始回复，
+    流式回复每chunk_chars个字符一段，段间隔chunk_delay秒。seed固定时故障和延迟序列可复现。
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0,
+                 replies: Union[None, Sequence[str], Responder] = None, latency: Union[str, float] = 0.0,
+                 chunk_chars: int = 8, chunk_delay: float = 0.0, rate_limit: float = 0.0,
+                 timeout_rate: float = 0.0, hang: float = 60.0, max_concurrency: int = 0,
+                 retry_after: float = 1.0, seed: Optional[int] = None, verbose: bool = False):
+        if not 0.0 <= rate_limit + timeout_rate <= 1.0:
+            raise ValueError("rate_limit + timeout_rate must be between 0 and 1")
+        if chunk_chars < 1:
+            raise ValueError("chunk_chars must be at least 1")
+        if replies is None:
+            self.responder: Responder = EngineResponder(seed)
+        elif callable(replies):
+            self.responder = replies
+        else:
+            cycle = itertools.cycle(list(replies))
+            self.responder = lambda prompt: next(cycle)
+        self.latency = parse_latency(latency)
+        self.chunk_chars = chunk_chars
+        self.chunk_delay = chunk_delay
+        self.rate_limit = rate_limit
+        self.timeout_rate = timeout_rate
+        self.hang = hang
+        self.max_concurrency = max_concurrency
+        self.retry_after = retry_after
+        self.verbose = verbose
+        self.rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._counters = {"requests": 0, "completed": 0, "rate_limited": 0, "timed_out": 0, "active": 0,
+                          "peak_active": 0, "openai": 0, "dashscope": 0}
+        self._ids = itertools.count(1)
+        self.httpd = _HTTPServer((host, port), _Handler)
+        self.httpd.mock = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def openai_base_url(self) -> str:
+        """对应DASHSCOPE_BASE_URL(OpenAI兼容模式)"""
+        return f"{self.url}/compatible-mode/v1"
+
+    @property
+    def dashscope_base_url(self) -> str:
+        """对应DASHSCOPE_HTTP_BASE_URL(DashScope SDK)"""
+        return f"{self.url}/api/v1"
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counters)
+
+    def start(self) -> "MockServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="mock-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopping.set()  # 唤醒正在模拟超时的请求
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> "MockServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _count(self, name: str, delta: int = 1):
+        with self._lock:
+            self._counters[name] += delta
+            if name == "active":
+                self._counters["peak_active"] = max(self._counters["peak_active"], self._counters["active"])
+
+    def _admit(self, api: str) -> str:
+        """决定本次请求的结果："ok"、"rate_limited"或"timeout"，同时计入统计"""
+        with self._lock:
+            self._counters["requests"] += 1
+            self._counters[api] += 1
+            if self.max_concurrency and self._counters["active"] >= self.max_concurrency:
+                outcome = "rate_limited"
+            else:
+                draw = self.rng.random()
+                outcome = ("rate_limited" if draw < self.rate_limit else
+                           "timeout" if draw < self.rate_limit + self.timeout_rate else "ok")
+            if outcome != "ok":
+                self._counters["timed_out" if outcome == "timeout" else "rate_limited"] += 1
+            return outcome
+
+    def _delay(self) -> float:
+        with self._lock:
+            return self.latency(self.rng)
+
+    def _chunks(self, text: str) -> List[str]:
+        return [text[i:i + self.chunk_chars] for i in range(0, len(text), self.chunk_chars)] or [""]
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256  # 并发压测时大量连接同时到达，默认的5会导致连接被拒
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # 非流式回复保持长连接，便于测试连接池
+    disable_nagle_algorithm = True  # 头和正文分开写出，不关Nagle时每个回复会多等一次延迟确认(约40ms)
+
+    @property
+    def mock(self) -> MockServer:
+        return self.server.mock
+
+    def log_message(self, format, *args):
+        if self.mock.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/stats":
+            self._send_json(200, self.mock.stats)
+        else:
+            self._send_json(404, {"message": f"Unknown path {self.path}"})
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)) or 0)
+        try:
+            request = json.loads(body or b"{}")
+        except json.JSONDecodeError:
+            self._send_json(400, {"message": "Invalid JSON body"})
+            return
+        path = self.path.split("?")[0].rstrip("/")
+        if path.endswith(OPENAI_PATH):
+            api = "openai"
+        elif path.endswith(DASHSCOPE_PATH):
+            api = "dashscope"
+        else:
+            self._send_json(404, {"message": f"Unknown path {self.path}"})
+            return
+
+        mock = self.mock
+        outcome = mock._admit(api)
+        if outcome == "rate_limited":
+            self._rate_limited(api)
+            return
+        mock._count("active")
+        try:
+            if outcome == "timeout":
+                # 挂起后直接断开，不发送任何回复；客户端应先因超时放弃
+                mock._stopping.wait(mock.hang)
+                self.close_connection = True
+                return
+            mock._stopping.wait(mock._delay())
+            if api == "openai":
+                self._openai(request)
+            else:
+                self._dashscope(request)
+            mock._count("completed")
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True  # 客户端提前断开，例如流式回复读到落子后中断
+        finally:
+            mock._count("active", -1)
+
+    def _send_json(self, status: int, data: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+        payload = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _rate_limited(self, api: str):
+        headers = {"Retry-After": f"{self.mock.retry_after:g}"}
+        if api == "openai":
+            error = {"error": {"message": "Rate limit exceeded (mock server)", "type": "rate_limit_error",
+                               "code": "rate_limit_exceeded"}}
+        else:
+            error = {"request_id": self._request_id(), "code": "Throttling.RateQuota",
+                     "message": "Requests rate limit exceeded (mock server)"}
+        self._send_json(429, error, headers)
+
+    def _request_id(self) -> str:
+        return f"mock-{next(self.mock._ids)}"
+
+    def _start_stream(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")  # 没有Content-Length，以关闭连接表示结束
+        self.end_headers()
+        self.close_connection = True
+
+    def _stream_pieces(self, text: str):
+        """逐段产出回复，段间按chunk_delay等待"""
+        for i, piece in enumerate(self.mock._chunks(text)):
+            if i and self.mock.chunk_delay:
+                self.mock._stopping.wait(self.mock.chunk_delay)
+            yield piece
+
+    @staticmethod
+    def _messages_text(messages: List[Dict[str, Any]]) -> str:
+        return "\n".join(str(message.get("content", "")) for message in messages)
+
+    def _openai(self, request: Dict[str, Any]):
+        prompt = self._messages_text(request.get("messages", []))
+        text = self.mock.responder(prompt)
+        model = request.get("model", "mock")
+        request_id = f"chatcmpl-{self._request_id()}"
+        created = int(time.time())
+        if not request.get("stream"):
+            self._send_json(200, {
+                "id": request_id, "object": "chat.completion", "created": created, "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                "usage": self._usage(prompt, text, "prompt_tokens", "completion_tokens"),
+            })
+            return
+        self._start_stream()
+        def chunk(delta, finish_reason=None):
+            data = {"id": request_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+            self.wfile.write(f"data: {json.dumps(data, ensure_ascii=False)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+        for i, piece in enumerate(self._stream_pieces(text)):
+            chunk({"role": "assistant", "content": piece} if i == 0 else {"content": piece})
+        chunk({}, "stop")
+        self.wfile.write(b"data: [DONE]\n\n")
+
+    def _dashscope(self, request: Dict[str, Any]):
+        inputs = request.get("input", {})
+        parameters = request.get("parameters", {})
+        prompt = inputs["prompt"] if "prompt" in inputs else self._messages_text(inputs.get("messages", []))
+        text = self.mock.responder(prompt)
+        request_id = self._request_id()
+        as_message = parameters.get("result_format") == "message"
+
+        def output(content, finish_reason):
+            if as_message:
+                return {"choices": [{"finish_reason": finish_reason,
+                                     "message": {"role": "assistant", "content": content}}]}
+            return {"text": content, "finish_reason": finish_reason}
+
+        streaming = (self.headers.get("X-DashScope-SSE", "").lower() == "enable"
+                     or "text/event-stream" in self.headers.get("Accept", ""))
+        if not streaming:
+            self._send_json(200, {"request_id": request_id, "output": output(text, "stop"),
+                                  "usage": self._usage(prompt, text, "input_tokens", "output_tokens")})
+            return
+        self._start_stream()
+        pieces = list(self._stream_pieces(text))
+        sent = ""
+        for i, piece in enumerate(pieces, 1):
+            sent += piece
+            last = i == len(pieces)
+            # incremental_output时每段只含新增文本，否则为累计全文
+            content = piece if parameters.get("incremental_output") else sent
+            data = {"request_id": request_id, "output": output(content, "stop" if last else "null"),
+                    "usage": self._usage(prompt, sent, "input_tokens", "output_tokens")}
+            event = f"id:{i}\nevent:result\n:HTTP_STATUS/200\ndata:{json.dumps(data, ensure_ascii=False)}\n\n"
+            self.wfile.write(event.encode("utf-8"))
+            self.wfile.flush()
+
+    @staticmethod
+    def _usage(prompt: str, text: str, input_key: str, output_key: str) -> Dict[str, int]:
+        usage = {input_key: estimate_tokens(prompt), output_key: estimate_tokens(text)}
+        usage["total_tokens"] = usage[input_key] + usage[output_key]
+        return usage
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="本地DashScope/OpenAI兼容接口模拟服务器")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--replies", help="脚本回复(JSON Lines)，不给出时按局面给出空点")
+    parser.add_argument("--latency", default="0", help="首字延迟分布(秒)：0.2、uniform:0.1,0.5、normal:0.3,0.1、exp:0.3")
+    parser.add_argument("--chunk-chars", type=int, default=8, help="流式回复每段的字符数")
+    parser.add_argument("--chunk-delay", type=float, default=0.0, help="流式回复的段间隔(秒)")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="返回429的概率")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="挂起不回复的概率")
+    parser.add_argument("--hang", type=float, default=60.0, help="模拟超时时挂起的秒数")
+    parser.add_argument("--max-concurrency", type=int, default=0, help="同时处理的请求上限，超过时返回429；0表示不限")
+    parser.add_argument("--seed", type=int, help="随机种子，固定后故障和延迟序列可复现")
+    parser.add_argument("--verbose", action="store_true", help="打印每个请求")
+    args = parser.parse_args(argv)
+
+    server = MockServer(args.host, args.port, load_replies(args.replies) if args.replies else None, args.latency,
+                        args.chunk_chars, args.chunk_delay, args.rate_limit, args.timeout_rate, args.hang,
+                        args.max_concurrency, seed=args.seed, verbose=args.verbose)
+    print(f"模拟服务器已启动：{server.url}")
+    print("在.env或环境变量中设置：")
+    print(f"DASHSCOPE_BASE_URL={server.openai_base_url}")
+    print(f"DASHSCOPE_HTTP_BASE_URL={server.dashscope_base_url}")
+    sys.stdout.flush()
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        print(f"统计：{json.dumps(server.stats, ensure_ascii=False)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+# Single-pass, legality-aware extraction of recommended moves from model replies
+import json
+import re
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+# 一次扫描匹配所有坐标写法：行列、列行、以及用逗号/短横/点/空白分隔的两个数；
+# 分组依次为(行, 列)、(列, 行)、(行, 分隔符, 列)，按位置取用，不建groupdict
+_COORD = re.compile(
+    r"(?=\d)(?:(\d{1,2})\s*行\s*第?\s*(\d{1,2})\s*列"
+    r"|(\d{1,2})\s*列\s*第?\s*(\d{1,2})\s*行"
+    r"|(?<![\d.])(\d{1,2})(\s*[,，、]\s*|\s*-\s*|\.|\s+)(\d{1,2})(?![\d%]))"
+)
+# 坐标前面出现这些词时多半是推荐的落子
+_POSITIVE_WORDS = r"建议|推荐|下一步|下一手|应该|最佳|最好|落子|下在|走在|选择|答案|坐标"
+# 这些词多半在描述已有的棋子、对手的着法或手数
+_NEGATIVE_WORDS = r"对手|对方|上一手|刚才|已经|已有|之前|步数|手数"
+_POSITIVE = re.compile(_POSITIVE_WORDS)
+# 坐标前的提示词和断句符一次取出，断句符之前的提示词不属于坐标所在的句子
+_CUES = re.compile(f"({_POSITIVE_WORDS})|({_NEGATIVE_WORDS})|[。；;！!？?\n]")
+_ORDINAL = re.compile(r"第[^\S\n]*\Z")  # 换行即断句，换行前的"第"不算
+_FOLLOWING_NEGATIVE = re.compile(r"\s*(?:步|手|目|子|%|分|秒)")
+_LEADING = " \t\n:：*#-(（"
+# 按提示词要求只回答"行,列"时坐标就在开头
+_LEADING_COORD = re.compile(r"[ \t\n:：*#\-(（]*(\d{1,2})\s*[,，]\s*(\d{1,2})(?![\d%])")
+_JSON_FENCE = re.compile(r"```(?:json)?\s*(\{.*?\})\s*```", re.S)
+_POSITION = re.compile(r"(\d{1,2})\s*[,，]\s*(\d{1,2})")
+
+CONFIDENT = 2.0  # 不低于此分的候选无需看完整段回复即可采用
+_LOOKBEHIND = 16
+
+class Candidate(NamedTuple):
+    """回复中的一个坐标候选，row/col已按origin换算为从0开始"""
+    row: int
+    col: int
+    score: float
+    start: int
+    end: int
+    context: str
+
+def extract_json(text: str) -> Optional[Dict[str, Any]]:
+    """取出回复中的JSON对象(允许包在```json代码块里或前后有说明文字)，没有时返回None"""
+    if "{" not in text:
+        return None
+    fenced = _JSON_FENCE.search(text)
+    body = fenced.group(1) if fenced else text[text.find("{"):text.rfind("}") + 1]
+    try:
+        result = json.loads(body)
+    except json.JSONDecodeError:
+        return None
+    return result if isinstance(result, dict) else None
+
+def _json_candidates(data: Dict[str, Any], origin: int) -> List[Candidate]:
+    """JSON中recommended_moves/move/row+col给出的落子，按priority排序，得分高于任何文本候选"""
+    entries = data.get("recommended_moves")
+    if not isinstance(entries, list):
+        entries = [data]
+    candidates = []
+    for rank, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            continue
+        if "row" in entry and "col" in entry:
+            values = (entry["row"], entry["col"])
+        else:
+            match = _POSITION.search(str(entry.get("position", entry.get("move", ""))))
+            if not match:
+                continue
+            values = match.groups()
+        try:
+            row, col = int(values[0]) - origin, int(values[1]) - origin
+            priority = float(entry.get("priority", rank + 1))
+        except (TypeError, ValueError):
+            continue
+        candidates.append(Candidate(row, col, 100.0 - priority - rank * 1e-3, -1, -1, str(entry)[:60]))
+    return candidates
+
+def _text_candidates(text: str, size: int, origin: int) -> List[Candidate]:
+    """正文中的全部坐标候选(未排序)，每个候选按前后文打分"""
+    candidates = []
+    # 开头的空白和标点之后紧接的坐标算作"回复开头就是坐标"
+    lead = len(text) - len(text.lstrip(_LEADING))
+    for match in _COORD.finditer(text):
+        r1, c1, c2, r2, r3, sep, c3 = match.groups()
+        start, end = match.span()
+        plain = r3 is not None
+        if plain:
+            row, col = int(r3), int(c3)
+            sep = sep.strip()
+            if sep == "-" and row == origin and col == origin + size - 1:
+                continue  # 复述提示词里的坐标范围，如"1-19"
+        elif r1 is not None:
+            row, col = int(r1), int(c1)
+        else:
+            row, col = int(r2), int(c2)
+
+        before = text[max(0, start - _LOOKBEHIND):start]
+        positive = negative = False
+        for positive_cue, negative_cue in _CUES.findall(before):
+            if positive_cue:
+                positive = True
+            elif negative_cue:
+                negative = True
+            else:
+                positive = negative = False  # 只看同一句里的提示词
+        score = 3.0 if positive else 0.0
+        if negative or (plain and (_ORDINAL.search(before) or _FOLLOWING_NEGATIVE.match(text, end))):
+            score -= 3.0
+        if start <= lead:
+            score += 2.0  # 回复开头就是坐标
+        if start > 0 and text[start - 1] in "(（" and text[end:end + 1] in ")）":
+            score += 1.0
+        if not plain or sep == "," or sep == "，":
+            score += 1.0
+        elif sep != "、":
+            score -= 1.0  # 短横、点、空白分隔也常见于范围、小数和编号
+        candidates.append(Candidate(row - origin, col - origin, score, start, end,
+                                    text[max(0, start - _LOOKBEHIND):end + 4]))
+    return candidates
+
+def _ranked(text: str, size: int, origin: int, data: Optional[Dict[str, Any]]) -> List[Candidate]:
+    candidates: List[Candidate] = []
+    if data is None:
+        data = extract_json(text)
+    if data is not None:
+        candidates.extend(_json_candidates(data, origin))
+    candidates.extend(_text_candidates(text, size, origin))
+    candidates.sort(key=_rank)
+    return candidates
+
+def _rank(candidate: Candidate) -> Tuple[float, int]:
+    return -candidate.score, candidate.start
+
+def _first_valid(candidates: List[Candidate], size: int, is_legal: Optional[Callable[[int, int], bool]],
+                 min_score: float) -> Optional[Candidate]:
+    """按排名找第一个在棋盘内且合法的候选，得分低于min_score即停止"""
+    for candidate in candidates:
+        if candidate.score < min_score:
+            return None
+        if 0 <= candidate.row < size and 0 <= candidate.col < size and \
+                (is_legal is None or is_legal(candidate.row, candidate.col)):
+            return candidate
+    return None
+
+def _leading_move(text: str, origin: int) -> Optional[Tuple[int, int, float]]:
+    """回复以"行,列"开头且全文没有推荐语气时直接取开头的坐标
+
+    开头的逗号坐标至少得3分，而没有推荐语气的其他候选最多得2分，所以它就是排名第一的候选，不必为其余坐标打分。
+    """
+    match = _LEADING_COORD.match(text)
+    if match is None or _FOLLOWING_NEGATIVE.match(text, match.end()) or _POSITIVE.search(text):
+        return None
+    return int(match.group(1)) - origin, int(match.group(2)) - origin, 3.0
+
+def parse_moves(text: str, size: int = 19, origin: int = 1, is_legal: Optional[Callable[[int, int], bool]] = None,
+                data: Optional[Dict[str, Any]] = None) -> List[Candidate]:
+    """返回回复中所有坐标候选，按推荐可能性从高到低排序(同分时靠前的优先)
+
+    回复含JSON时JSON给出的落子排在最前(已解析好的JSON可由data传入)；
+    超出棋盘的坐标总被丢弃，给出is_legal时不合法的也丢弃。同一坐标只保留得分最高的一次。
+    """
+    candidates = _ranked(text, size, origin, data)
+    ranked = []
+    seen = set()
+    for candidate in candidates:
+        point = (candidate.row, candidate.col)
+        if point in seen or not (0 <= candidate.row < size and 0 <= candidate.col < size):
+            continue
+        seen.add(point)
+        if is_legal is None or is_legal(candidate.row, candidate.col):
+            ranked.append(candidate)
+    return ranked
+
+def best_move(text: str, size: int = 19, origin: int = 1, is_legal: Optional[Callable[[int, int], bool]] = None,
+              min_score: float = float("-inf"), data: Optional[Dict[str, Any]] = None) -> Optional[Tuple[int, int]]:
+    """排名第一且得分不低于min_score的合法落子(从0开始)，没有时返回None
+
+    与parse_moves的第一项相同，但只做得出第一名所需的工作：JSON给出合法落子时不再扫描正文，
+    回复以坐标开头时不为其余坐标打分，按排名逐个检查合法性，找到即停止。
+    """
+    if data is None:
+        data = extract_json(text)
+    if data is not None:
+        candidate = _first_valid(sorted(_json_candidates(data, origin), key=_rank), size, is_legal, min_score)
+        if candidate is not None:
+            return candidate.row, candidate.col
+    else:
+        leading = _leading_move(text, origin)
+        if leading is not None:
+            row, col, score = leading
+            if score >= min_score and 0 <= row < size and 0 <= col < size and (is_legal is None or is_legal(row, col)):
+                return row, col
+    candidate = _first_valid(sorted(_text_candidates(text, size, origin), key=_rank), size, is_legal, min_score)
+    return (candidate.row, candidate.col) if candidate is not None else None
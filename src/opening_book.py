@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+# Memory-mapped opening book keyed by canonical 64-bit position hash
+import argparse
+import os
+import struct
+import sys
+import numpy as np
+from collections import Counter
+from functools import partial
+from typing import Iterable, List, Tuple, Optional
+from src.go_board import Stone, ZOBRIST_WHITE_TO_MOVE
+from src.symmetry import canonical_hash, transform_move, inverse_move
+from src.sgf import SGFGame, ingest, replay
+
+BOOK_MAGIC = b"GOBOOK1\0"
+BOOK_VERSION = 1
+# 文件头：魔数、版本、棋盘大小、记录数，共32字节
+HEADER = struct.Struct("<8sIIQ8x")
+RECORD_DTYPE = np.dtype([("key", "<u8"), ("count", "<u4"), ("move", "<u2"), ("pad", "<u2")])
+
+DEFAULT_BOOK_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "opening.book")
+
+def book_key(board: np.ndarray, black_to_move: bool) -> Tuple[int, int]:
+    """返回(开局库键, t)：规范局面的Zobrist哈希再区分行棋方，t为原局面到规范局面的变换"""
+    h, t = canonical_hash(board)
+    return (h if black_to_move else h ^ ZOBRIST_WHITE_TO_MOVE), t
+
+class OpeningBook:
+    """只读开局库：按键排序的定长记录，mmap后用二分查找，查询耗时在微秒级"""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            magic, version, size, count = HEADER.unpack(f.read(HEADER.size))
+        if magic != BOOK_MAGIC or version != BOOK_VERSION:
+            raise ValueError(f"Not an opening book file: {path}")
+        self.path = path
+        self.size = size
+        if count:
+            self.records = np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=HEADER.size, shape=(count,))
+        else:
+            self.records = np.zeros(0, dtype=RECORD_DTYPE)
+        self.keys = self.records["key"]
+
+    @classmethod
+    def from_env(cls) -> Optional["OpeningBook"]:
+        """按OPENING_BOOK_PATH加载开局库，文件不存在时返回None"""
+        path = os.getenv("OPENING_BOOK_PATH", DEFAULT_BOOK_PATH)
+        if not path or not os.path.exists(path):
+            return None
+        return cls(path)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def lookup(self, board: np.ndarray, black_to_move: bool, black: int = 1,
+               white: int = 2) -> List[Tuple[int, int, int]]:
+        """返回当前局面的候选(row, col, 出现次数)，按次数降序，坐标已换算到board的朝向"""
+        if board.shape[0] != self.size:
+            return []
+        if black != 1 or white != 2:
+            normalized = np.zeros(board.shape, dtype=np.int8)
+            normalized[board == black] = Stone.BLACK.value
+            normalized[board == white] = Stone.WHITE.value
+            board = normalized
+        key, t = book_key(board, black_to_move)
+        lo = int(np.searchsorted(self.keys, np.uint64(key), side="left"))
+        hi = int(np.searchsorted(self.keys, np.uint64(key), side="right"))
+        candidates = []
+        for record in self.records[lo:hi]:
+            row, col = inverse_move(divmod(int(record["move"]), self.size), t, self.size)
+            candidates.append((row, col, int(record["count"])))
+        candidates.sort(key=lambda c: -c[2])
+        return candidates
+
+def book_entries(game: SGFGame, size: int = 19, max_moves: int = 30) -> List[Tuple[int, int]]:
+    """按规则重放一局的前max_moves手，返回每手的(开局库键, 规范坐标系中的点位)，过手不计"""
+    if game.size != size:
+        return []
+    entries = []
+    for number, (board, (row, col, stone)) in enumerate(replay(game)):
+        if number >= max_moves:
+            break
+        if row < 0:
+            continue
+        key, t = book_key(board.board, stone == Stone.BLACK)
+        r, c = transform_move((row, col), t, size)
+        entries.append((key, r * size + c))
+    return entries
+
+def build_opening_book(games: Iterable[SGFGame], path: str, size: int = 19,
+                       max_moves: int = 30, min_count: int = 2) -> int:
+    """把若干对局的前max_moves手写成开局库，出现少于min_count次的(局面, 落子)舍去；返回记录数"""
+    counter = Counter()
+    for game in games:
+        counter.update(book_entries(game, size, max_moves))
+    return write_book(counter, path, size, min_count)
+
+def build_opening_book_from_sgf(sources: List[str], path: str, size: int = 19, max_moves: int = 30,
+                                min_count: int = 2, workers: Optional[int] = None) -> int:
+    """从SGF文件或目录生成开局库，棋谱的解析和重放分散到多个进程；其他大小的棋谱跳过并给出提示"""
+    counter = Counter()
+    games = 0
+    skipped = Counter()
+    for game_size, entries in ingest(sources, partial(_sized_book_entries, size=size, max_moves=max_moves),
+                                     workers=workers):
+        games += 1
+        if game_size != size:
+            skipped[game_size] += 1
+        counter.update(entries)
+    print(f"已读取{games}局棋谱")
+    if skipped:
+        detail = "，".join(f"{s}路{n}局" for s, n in sorted(skipped.items()))
+        print(f"警告：跳过{sum(skipped.values())}局非{size}路棋谱({detail})，可用--size指定棋盘大小")
+    return write_book(counter, path, size, min_count)
+
+def _sized_book_entries(game: SGFGame, size: int, max_moves: int) -> Tuple[int, List[Tuple[int, int]]]:
+    """子进程内调用：返回(棋盘大小, book_entries)，供主进程统计被跳过的棋谱"""
+    return game.size, book_entries(game, size, max_moves)
+
+def write_book(counter: Counter, path: str, size: int = 19, min_count: int = 2) -> int:
+    """把{(键, 点位): 次数}按键排序写成开局库文件，返回记录数"""
+    entries = sorted((key, move, count) for (key, move), count in counter.items() if count >= min_count)
+    records = np.zeros(len(entries), dtype=RECORD_DTYPE)
+    if entries:
+        records["key"] = [e[0] for e in entries]
+        records["move"] = [e[1] for e in entries]
+        records["count"] = [min(e[2], 2**32 - 1) for e in entries]
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(BOOK_MAGIC, BOOK_VERSION, size, len(records)))
+        f.write(records.tobytes())
+    return len(records)
+
+def main(argv: List[str]):
+    """用法：python -m src.opening_book [--size 19] 输出文件 SGF文件或目录..."""
+    parser = argparse.ArgumentParser(prog="python -m src.opening_book", description="从SGF棋谱生成开局库")
+    parser.add_argument("output", help="输出的开局库文件")
+    parser.add_argument("sources", nargs="+", help="SGF文件或目录")
+    parser.add_argument("--size", type=int, default=19, help="棋盘大小，其他大小的棋谱跳过")
+    args = parser.parse_args(argv)
+    count = build_opening_book_from_sgf(args.sources, args.output, args.size)
+    print(f"开局库已生成：{args.output}，共{count}条记录")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
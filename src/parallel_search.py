@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+# Multi-process parallel MCTS
+import math
+import os
+import pickle
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple, Optional, Dict
+from src.go_board import GoBoard, Stone
+from src.mcts import MCTSGoAI, MCTSNode, PASS_MOVE
+
+def _root_search_worker(board: GoBoard, current_player: Stone, options: dict,
+                        seed: int) -> List[Tuple[Tuple[int, int], int, float, float]]:
+    """子进程内独立搜索一棵树，返回根节点各候选的(落子, 访问次数, 累计胜局, 先验)"""
+    engine = MCTSGoAI(seed=seed, **options)
+    root = engine.search(board, current_player)
+    return [(c.move, c.visits, c.value_sum, c.prior) for c in root.children or []]
+
+# 子进程缓存的根局面：(根局面文件路径, 棋盘)，每次搜索只读一次
+_leaf_root: Optional[Tuple[str, GoBoard]] = None
+
+def _rollout_worker(root_path: str, path: List[Tuple[int, int, int]], player: Stone, consecutive_passes: int,
+                    komi: float, max_playout_moves: Optional[int], seed: int) -> bool:
+    """子进程内从根局面按path走到叶子做一次随机模拟，返回黑棋是否获胜
+
+    根局面在每次搜索的第一个任务里从root_path读入并缓存，之后每个叶子只传从根出发的着手。
+    """
+    global _leaf_root
+    if _leaf_root is None or _leaf_root[0] != root_path:
+        with open(root_path, "rb") as f:
+            _leaf_root = (root_path, pickle.load(f))
+    board = _leaf_root[1]
+    for row, col, stone in path:
+        MCTSGoAI._play(board, (row, col), Stone(stone))
+    try:
+        engine = MCTSGoAI(komi=komi, max_playout_moves=max_playout_moves, seed=seed)
+        return engine.simulate(board, player, consecutive_passes) == Stone.BLACK
+    finally:
+        for _ in path:
+            board.undo()
+
+class ParallelMCTSGoAI(MCTSGoAI):
+    """多进程MCTS，接口与MCTSGoAI相同
+
+    mode="root"：每个进程独立搜索一棵树，最后在根节点合并各候选的访问次数和胜局；
+    mode="leaf"：主进程维护一棵树，每到一个叶子就让所有进程同时各做一次模拟；
+    根局面每次搜索只写一次临时文件，各进程读入后缓存，每个叶子只传从根出发的着手。
+    max_playouts是所有进程合计的模拟次数，time_limit对每个进程都生效。
+    """
+
+    def __init__(self, workers: Optional[int] = None, mode: str = "root", **kwargs):
+        super().__init__(**kwargs)
+        if mode not in ("root", "leaf"):
+            raise ValueError(f"Unknown parallel mode: {mode}")
+        self.workers = workers or os.cpu_count() or 1
+        self.mode = mode
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def close(self):
+        """关闭进程池"""
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def search(self, board: GoBoard, current_player: Stone) -> MCTSNode:
+        if self.mode == "root":
+            root = self._root_parallel(board, current_player)
+        else:
+            root = self._leaf_parallel(board, current_player)
+        self.last_root = root
+        return root
+
+    def _root_parallel(self, board: GoBoard, current_player: Stone) -> MCTSNode:
+        options = {
+            "max_playouts": math.ceil(self.max_playouts / self.workers),
+            "time_limit": self.time_limit,
+            "selection": self.selection,
+            "exploration": self.exploration,
+            "komi": self.komi,
+            "max_playout_moves": self.max_playout_moves,
+        }
+        futures = [self.executor.submit(_root_search_worker, board, current_player, options,
+                                        self.rng.getrandbits(32))
+                   for _ in range(self.workers)]
+
+        root = MCTSNode(PASS_MOVE, current_player.opponent)
+        merged: Dict[Tuple[int, int], MCTSNode] = {}
+        for future in futures:
+            for move, visits, value_sum, prior in future.result():
+                child = merged.get(move)
+                if child is None:
+                    child = merged[move] = MCTSNode(move, current_player, root, prior)
+                child.visits += visits
+                child.value_sum += value_sum
+                root.visits += visits
+        root.children = list(merged.values())
+        return root
+
+    def _leaf_parallel(self, board: GoBoard, current_player: Stone) -> MCTSNode:
+        board = board.copy()
+        fd, root_path = tempfile.mkstemp(prefix="mcts_root_", suffix=".pickle")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(board, f)
+        try:
+            return self._leaf_search(board, current_player, root_path)
+        finally:
+            os.remove(root_path)
+
+    def _leaf_search(self, board: GoBoard, current_player: Stone, root_path: str) -> MCTSNode:
+        root = MCTSNode(PASS_MOVE, current_player.opponent)
+        deadline = time.monotonic() + self.time_limit if self.time_limit else None
+        playouts = 0
+        while playouts < self.max_playouts:
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            node, depth, consecutive_passes = self._descend(board, root)
+            path = []
+            leaf = node
+            while leaf.parent is not None:
+                path.append((leaf.move[0], leaf.move[1], leaf.player.value))
+                leaf = leaf.parent
+            path.reverse()
+            futures = [self.executor.submit(_rollout_worker, root_path, path, node.player.opponent,
+                                            consecutive_passes, self.komi, self.max_playout_moves,
+                                            self.rng.getrandbits(32))
+                       for _ in range(self.workers)]
+            black_wins = sum(1 for future in futures if future.result())
+            for _ in range(depth):
+                board.undo()
+            self._backup(node, len(futures), black_wins)
+            playouts += len(futures)
+        return root
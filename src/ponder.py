@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+# Pondering: speculatively request the AI's replies while the human is thinking
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from src.go_board import GoBoard, Stone
+
+STAR_POINTS = [(3, 3), (3, 9), (3, 15), (9, 3), (9, 9), (9, 15), (15, 3), (15, 9), (15, 15)]
+
+def _dilate(mask: np.ndarray, steps: int) -> np.ndarray:
+    """把True区域向八个方向各扩展steps格"""
+    out = mask.copy()
+    for _ in range(steps):
+        grown = out.copy()
+        grown[1:, :] |= out[:-1, :]
+        grown[:-1, :] |= out[1:, :]
+        grown[:, 1:] |= out[:, :-1]
+        grown[:, :-1] |= out[:, 1:]
+        out = grown
+    return out
+
+def predict_moves(board: np.ndarray, move_history: Sequence[Tuple[int, int, Stone]],
+                  count: int = 3) -> List[Tuple[int, int]]:
+    """用简单的局部启发式猜测下一手最可能的count个落子，按可能性降序
+
+    贴近上一手的点(应对)、靠近已有棋子的点得分高，开局阶段星位和小目加分，一二线减分。
+    """
+    size = board.shape[0]
+    empty = board == 0
+    score = np.zeros(board.shape, dtype=float)
+    if move_history:
+        last = np.zeros(board.shape, dtype=bool)
+        row, col = move_history[-1][:2]
+        if row >= 0:
+            last[row, col] = True
+            score += 3.0 * _dilate(last, 1) + 2.0 * _dilate(last, 2)
+    score += 1.0 * _dilate(~empty, 2)
+    if len(move_history) < 20:
+        for row, col in STAR_POINTS:
+            if row < size and col < size:
+                score[row, col] += 2.5
+        corners = [3, size - 4]
+        for r in corners:
+            for c in corners:
+                for dr, dc in ((0, 1), (1, 0), (0, -1), (-1, 0)):
+                    if 0 <= r + dr < size and 0 <= c + dc < size:
+                        score[r + dr, c + dc] += 1.5
+    edge = np.zeros(board.shape, dtype=bool)
+    edge[[0, -1], :] = edge[:, [0, -1]] = True
+    score[edge] -= 2.0
+    score[~empty] = -np.inf
+
+    flat = score.reshape(-1)
+    count = min(count, int(empty.sum()))
+    if count <= 0:
+        return []
+    top = np.argpartition(-flat, count - 1)[:count]
+    top = top[np.argsort(-flat[top], kind="stable")]
+    return [divmod(int(point), size) for point in top]
+
+class _Prediction:
+    """一个假想局面的预判请求：线程池中的任务，以及开始读取后的流式回复"""
+    __slots__ = ("future", "reply", "cancelled")
+
+    def __init__(self):
+        self.future: Optional[Future] = None
+        self.reply = None
+        self.cancelled = False
+
+class Ponderer:
+    """预判：轮到用户时猜测其可能的落子，在后台为每个假想局面请求AI应手
+
+    假想局面按规则落子(含提子)得到，不合法的猜测直接跳过。用户真正落子后take()取出对应局面的结果
+    (可能仍在请求中)，其余预判全部取消：尚未开始的不再发出，已在进行的中断流式回复、断开连接，
+    不再消耗配额，半截回复也不会写入缓存。
+    """
+
+    def __init__(self, ai, max_candidates: int = 3, workers: Optional[int] = None):
+        self.ai = ai
+        self.max_candidates = max_candidates
+        self.executor = ThreadPoolExecutor(max_workers=workers or max_candidates, thread_name_prefix="ponder")
+        self._pending: Dict[Tuple[bytes, Stone], _Prediction] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(board: np.ndarray, current_player: Stone) -> Tuple[bytes, Stone]:
+        return board.tobytes(), current_player
+
+    def start(self, position: GoBoard, move_history: Sequence[Tuple[int, int, Stone]], current_player: Stone):
+        """轮到current_player(用户)思考时调用，为其最可能的几手预先请求AI应手；position不会被修改"""
+        self.cancel()
+        for row, col in predict_moves(position.get_board_state(), move_history, self.max_candidates):
+            next_position = position.copy()
+            if not next_position.place_stone(row, col, current_player):
+                continue  # 自杀、劫或同形，用户不可能这样下
+            next_board = next_position.get_board_state()
+            next_history = tuple(move_history) + ((row, col, current_player),)
+            ai_player = current_player.opponent
+            # 开局库局面本来就不需要请求
+            if self.ai.get_book_move(next_board, ai_player) is not None:
+                continue
+            prediction = _Prediction()
+            with self._lock:
+                self._pending[self._key(next_board, ai_player)] = prediction
+                prediction.future = self.executor.submit(self._request, prediction, next_position,
+                                                         next_history, ai_player)
+
+    def _request(self, prediction: _Prediction, position: GoBoard, move_history, current_player: Stone):
+        def track(reply):
+            # 记下流式回复以便取消；请求开始前已被取消时立即中断
+            with self._lock:
+                prediction.reply = reply
+                cancelled = prediction.cancelled
+            if cancelled:
+                reply.cancel()
+        return self.ai.request_quick_move(position, move_history, current_player, on_reply=track)
+
+    def take(self, board: np.ndarray, current_player: Stone) -> Optional[Future]:
+        """用户落子后调用：返回当前局面的预判结果(Future)，未猜中时返回None；其余预判一律取消"""
+        with self._lock:
+            prediction = self._pending.pop(self._key(board, current_player), None)
+        self.cancel()
+        if prediction is None or prediction.future.cancelled():
+            self.misses += 1
+            return None
+        self.hits += 1
+        return prediction.future
+
+    def cancel(self):
+        """取消所有预判：尚未开始的不再执行，正在进行的中断流式回复"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            for prediction in pending.values():
+                prediction.cancelled = True
+        for prediction in pending.values():
+            prediction.future.cancel()
+            if prediction.reply is not None:
+                prediction.reply.cancel()
+
+    def shutdown(self):
+        self.cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
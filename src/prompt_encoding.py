@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+# Compact, incrementally maintained board encodings for prompts, with token estimates
+import os
+import re
+import threading
+from typing import Dict, List, Optional
+import numpy as np
+
+ENCODINGS = ("grid", "rle", "coords")
+GLYPHS = {0: ".", 1: "X", 2: "O"}
+
+_CJK = re.compile(r"[　-〿一-鿿＀-￯]")
+_DIGIT = re.compile(r"\d")
+_WORD = re.compile(r"[A-Za-z]+|[^\sA-Za-z\d　-〿一-鿿＀-￯]")
+
+def estimate_tokens(text: str) -> int:
+    """粗略估计Qwen分词后的token数：汉字和数字各算1个，英文单词约4个字母1个，其余符号各1个"""
+    cjk = len(_CJK.findall(text))
+    digits = len(_DIGIT.findall(text))
+    others = sum((len(w) + 3) // 4 if w.isalpha() else 1 for w in _WORD.findall(text))
+    return cjk + digits + others
+
+def default_encoding() -> str:
+    """由环境变量PROMPT_ENCODING选择编码，默认grid"""
+    encoding = os.getenv("PROMPT_ENCODING", "grid")
+    if encoding not in ENCODINGS:
+        raise ValueError(f"Unknown prompt encoding: {encoding} (choose from {', '.join(ENCODINGS)})")
+    return encoding
+
+class BoardEncoder:
+    """把棋盘编码成提示词中的紧凑文本，编码结果随局面增量维护
+
+    sync()与上次同步的局面做差，只重新生成有变化的行(或棋子列表项)，
+    因此每手的开销与变化的点数成正比，而与对局长度无关。
+    grid：每行一串字符，大小固定；rle：每行游程编码，省略空行；coords：黑白棋子的坐标列表。
+    行号和坐标从origin开始计数，须与提示词中对坐标的约定一致。
+    """
+
+    def __init__(self, size: int = 19, encoding: str = "grid", black: int = 1, white: int = 2, origin: int = 1):
+        if encoding not in ENCODINGS:
+            raise ValueError(f"Unknown prompt encoding: {encoding} (choose from {', '.join(ENCODINGS)})")
+        self.encoding = encoding
+        self.black = black
+        self.white = white
+        self.origin = origin
+        self.lock = threading.Lock()
+        self._reset(size)
+
+    def _reset(self, size: int):
+        self.size = size
+        self._board = np.zeros((size, size), dtype=np.int8)
+        self._rows: List[str] = [self._encode_row(r) for r in range(size)]
+        self._stones: Dict[int, Dict[int, str]] = {1: {}, 2: {}}
+        self._text: Optional[str] = None
+
+    @property
+    def legend(self) -> str:
+        first, last = self.origin, self.origin + self.size - 1
+        if self.encoding == "grid":
+            return f"X=黑棋，O=白棋，.=空；行号{first}-{last}，每行{self.size}个字符依次为第{first}-{last}列"
+        if self.encoding == "rle":
+            return f"X=黑棋，O=白棋，.=空；行号{first}-{last}，每行按游程编码，如3.X表示3个空点后接1个黑棋；未列出的行全空"
+        return f"按行,列列出黑棋和白棋的位置(从{first}开始计数)，其余为空"
+
+    def copy(self) -> "BoardEncoder":
+        other = BoardEncoder.__new__(BoardEncoder)
+        other.__dict__.update(self.__dict__)
+        other._board = self._board.copy()
+        other._rows = list(self._rows)
+        other._stones = {color: dict(points) for color, points in self._stones.items()}
+        other.lock = threading.Lock()
+        return other
+
+    def sync(self, board: np.ndarray) -> int:
+        """同步到board(取值按构造时的black/white)，返回变化的点数"""
+        if board.shape[0] != self.size:
+            self._reset(board.shape[0])
+        normalized = np.zeros(board.shape, dtype=np.int8)
+        normalized[board == self.black] = 1
+        normalized[board == self.white] = 2
+        changed = np.flatnonzero(normalized != self._board)
+        if changed.size == 0:
+            return 0
+        self._board = normalized
+        if self.encoding == "coords":
+            for point in changed.tolist():
+                row, col = divmod(point, self.size)
+                for points in self._stones.values():
+                    points.pop(point, None)
+                color = int(normalized[row, col])
+                if color:
+                    self._stones[color][point] = f"{row + self.origin},{col + self.origin}"
+        else:
+            for row in np.unique(changed // self.size).tolist():
+                self._rows[row] = self._encode_row(row)
+        self._text = None
+        return int(changed.size)
+
+    def _encode_row(self, row: int) -> str:
+        values = self._board[row].tolist()
+        if self.encoding == "grid":
+            return f"{row + self.origin:2d} " + "".join(GLYPHS[v] for v in values)
+        if not any(values):
+            return ""
+        runs = []
+        start = 0
+        for i in range(1, len(values) + 1):
+            if i == len(values) or values[i] != values[start]:
+                length = i - start
+                runs.append((str(length) if length > 1 else "") + GLYPHS[values[start]])
+                start = i
+        return f"{row + self.origin}:" + "".join(runs)
+
+    def text(self) -> str:
+        if self._text is None:
+            if self.encoding == "coords":
+                parts = []
+                for color, name in ((1, "黑"), (2, "白")):
+                    points = self._stones[color]
+                    parts.append(f"{name}({len(points)}): " + " ".join(points[p] for p in sorted(points)))
+                self._text = "\n".join(parts)
+            elif self.encoding == "rle":
+                self._text = "\n".join(row for row in self._rows if row) or "(空棋盘)"
+            else:
+                self._text = "\n".join(self._rows)
+        return self._text
+
+    def render(self, board: np.ndarray) -> str:
+        """同步到board并返回编码文本；多个线程共用一个编码器时在锁内完成"""
+        with self.lock:
+            self.sync(board)
+            return self.text()
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+# Multi-turn prompt sessions with a byte-stable prefix, so the provider's prefix cache can be reused
+import os
+import threading
+from typing import Callable, Dict, List, NamedTuple, Sequence, Tuple
+from src.prompt_encoding import estimate_tokens
+
+Move = Tuple[int, int, int]  # (row, col, 颜色)，过手时row为-1
+
+DEFAULT_MAX_TOKENS = 8000
+
+def session_max_tokens() -> int:
+    """由环境变量决定会话模式：PROMPT_SESSION=1时返回压缩阈值(PROMPT_SESSION_MAX_TOKENS，默认8000)，未启用时返回0"""
+    if os.getenv("PROMPT_SESSION", "0").lower() not in ("1", "true", "yes", "on"):
+        return 0
+    max_tokens = int(os.getenv("PROMPT_SESSION_MAX_TOKENS", DEFAULT_MAX_TOKENS))
+    if max_tokens <= 0:
+        raise ValueError("PROMPT_SESSION_MAX_TOKENS must be positive")
+    return max_tokens
+
+class SessionTurn(NamedTuple):
+    """一轮请求：messages是要发送的完整对话，提交回复时凭generation确认会话在此期间没有变化"""
+    messages: List[Dict[str, str]]
+    moves: Tuple[Move, ...]  # 这一轮之后模型已知的全部落子
+    generation: int
+    reused_tokens: int       # 与之前请求完全相同的前缀的估计token数
+
+class PromptSession:
+    """多轮会话：系统提示词(规则、棋盘编码说明、回答格式)固定不变，之后的对话只追加不修改
+
+    每轮只发送上一轮之后新增的落子和本轮的问题，整段对话因此是上一次请求的严格延伸，
+    服务端的前缀缓存可以跳过已经处理过的部分。对话的估计token数超过max_tokens时压缩：
+    以当前局面的完整编码开始新的对话，系统提示词仍保持不变。
+    落子记录与已告知模型的不连续(悔棋、新对局)时同样从当前局面重新开始。
+    """
+
+    def __init__(self, system: str, format_move: Callable[[Move], str], max_tokens: int = DEFAULT_MAX_TOKENS):
+        if max_tokens <= 0:
+            raise ValueError("max_tokens must be positive")
+        self.system = {"role": "system", "content": system}
+        self.format_move = format_move
+        self.max_tokens = max_tokens
+        self._system_tokens = estimate_tokens(system)
+        self._lock = threading.Lock()
+        self.compactions = 0
+        self._generation = 0
+        self.reset()
+
+    def reset(self):
+        """丢弃已有对话，下一轮从当前局面重新开始"""
+        with self._lock:
+            self._history: List[Dict[str, str]] = []
+            self._moves: Tuple[Move, ...] = ()
+            self._tokens = self._system_tokens
+            self._generation += 1
+
+    def turn(self, moves: Sequence[Move], snapshot: Callable[[], str], question: str) -> SessionTurn:
+        """构造本轮请求；snapshot()返回当前局面的完整编码，只在开始新对话时调用"""
+        moves = tuple(moves)
+        with self._lock:
+            known = len(self._moves)
+            if self._history and moves[:known] == self._moves:
+                delta = moves[known:]
+                content = (f"新的落子：{' '.join(map(self.format_move, delta))}\n" if delta else "") + question
+                if self._tokens + estimate_tokens(content) <= self.max_tokens:
+                    messages = [self.system] + self._history + [{"role": "user", "content": content}]
+                    return SessionTurn(messages, moves, self._generation, self._tokens)
+                self.compactions += 1
+            messages = [self.system, {"role": "user", "content": f"当前局面：\n{snapshot()}\n{question}"}]
+            return SessionTurn(messages, moves, self._generation, self._system_tokens)
+
+    def commit(self, turn: SessionTurn, reply: str) -> bool:
+        """把本轮的问答记入对话；会话在此期间已被其他请求推进或重置时放弃，返回False"""
+        with self._lock:
+            if turn.generation != self._generation:
+                return False
+            self._history = turn.messages[1:] + [{"role": "assistant", "content": reply}]
+            self._moves = turn.moves
+            self._tokens = self._system_tokens + sum(estimate_tokens(m["content"]) for m in self._history)
+            self._generation += 1
+            return True
+
+    def __len__(self) -> int:
+        """对话中已完成的轮数"""
+        return len(self._history) // 2
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+# Two-tier (memory LRU + SQLite) cache for model responses
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+import numpy as np
+from src.symmetry import canonicalize
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(__file__), "..", ".cache", "ai_responses.sqlite3")
+
+def position_fingerprint(board: np.ndarray, black_to_move: bool, black: int = 1,
+                         white: int = 2) -> Tuple[str, int]:
+    """返回(局面指纹, t)：局面先统一成0空/1黑/2白，再取8种旋转/镜像中的规范形式，
+    因此与棋盘编码方式和朝向都无关；t是原局面到规范局面的变换(见symmetry)"""
+    normalized = np.zeros(board.shape, dtype=np.int8)
+    normalized[board == black] = 1
+    normalized[board == white] = 2
+    canonical, t = canonicalize(normalized)
+    digest = hashlib.sha1(canonical.tobytes())
+    digest.update(b"B" if black_to_move else b"W")
+    return digest.hexdigest(), t
+
+class ResponseCache:
+    """模型回复缓存：内存LRU(按字节数淘汰) + SQLite持久层，条目带过期时间
+
+    键由局面指纹、模型名、提示模板和temperature共同决定，值为回复文本。
+    多个AI线程共用一个实例，所有读写都在锁内进行。
+    """
+
+    def __init__(self, db_path: Optional[str] = DEFAULT_CACHE_PATH, max_memory_bytes: int = 16 * 1024 * 1024,
+                 ttl: Optional[float] = 7 * 24 * 3600):
+        self.max_memory_bytes = max_memory_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._db = None
+        if db_path:
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("""CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at REAL
+            )""")
+            self._db.commit()
+
+    @classmethod
+    def from_env(cls) -> "ResponseCache":
+        """按环境变量创建：AI_CACHE_PATH(为空则只用内存)、AI_CACHE_TTL(秒，0表示不过期)"""
+        db_path = os.getenv("AI_CACHE_PATH", DEFAULT_CACHE_PATH)
+        ttl = float(os.getenv("AI_CACHE_TTL", 7 * 24 * 3600))
+        return cls(db_path=db_path or None, ttl=ttl or None)
+
+    @staticmethod
+    def make_key(position: str, model: str, template: str, temperature: float) -> str:
+        material = "\x1f".join([position, model, template, repr(float(temperature))])
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > now:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return value
+                self._evict(key)
+
+            if self._db is not None:
+                row = self._db.execute("SELECT value, expires_at FROM responses WHERE key = ?",
+                                       (key,)).fetchone()
+                if row is not None:
+                    value, expires_at = row
+                    if expires_at is None or expires_at > now:
+                        self._remember(key, value, expires_at)
+                        self.hits += 1
+                        return value
+                    self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._db.commit()
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._remember(key, value, expires_at)
+            if self._db is not None:
+                self._db.execute("INSERT OR REPLACE INTO responses (key, value, expires_at) VALUES (?, ?, ?)",
+                                 (key, value, expires_at))
+                self._db.commit()
+
+    def _remember(self, key: str, value: str, expires_at: Optional[float]):
+        """写入内存层，超出字节上限时从最久未用的条目开始淘汰"""
+        self._evict(key)
+        self._memory[key] = (value, expires_at)
+        self._memory_bytes += self._entry_size(key, value)
+        while self._memory_bytes > self.max_memory_bytes and len(self._memory) > 1:
+            self._evict(next(iter(self._memory)))
+
+    def _evict(self, key: str):
+        entry = self._memory.pop(key, None)
+        if entry is not None:
+            self._memory_bytes -= self._entry_size(key, entry[0])
+
+    @staticmethod
+    def _entry_size(key: str, value: str) -> int:
+        return len(key) + len(value.encode("utf-8"))
+
+    def purge_expired(self):
+        """删除所有已过期的条目"""
+        now = time.time()
+        with self._lock:
+            for key in [k for k, (_, exp) in self._memory.items() if exp is not None and exp <= now]:
+                self._evict(key)
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+                self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
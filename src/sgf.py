@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+# Streaming SGF reader/writer and parallel corpus ingest
+import io
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, IO, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+from src.go_board import GoBoard, Stone
+
+Move = Tuple[int, int, Stone]
+
+# 属性值：方括号内除转义字符外不含"]"(展开写法，避免逐字符回溯)
+_VALUE_RE = r"\[[^\]\\]*(?:\\.[^\]\\]*)*\]"
+# 顶层扫描只关心括号和属性值；单独的"["表示属性值在缓冲区末尾被截断
+_SCAN = re.compile(_VALUE_RE + r"|[()]|\[", re.S)
+_TOKEN = re.compile(r"([;()])|([A-Za-z]+)\s*((?:" + _VALUE_RE + r"\s*)+)", re.S)
+_VALUE = re.compile(r"\[([^\]\\]*(?:\\.[^\]\\]*)*)\]", re.S)
+_ESCAPE = re.compile(r"\\(\r\n|\n\r|\r|\n|.)", re.S)
+
+class SGFGame(NamedTuple):
+    """一局棋谱的主线：根节点属性、摆子(AB/AW)和着手序列，过手记为(-1, -1, stone)"""
+    size: int
+    properties: Dict[str, List[str]]
+    setup: List[Move]
+    moves: List[Move]
+
+    @property
+    def first_player(self) -> Stone:
+        """摆子之后先走的一方：PL属性，否则第一手的颜色，让子局(HA>=2)为白棋，其余为黑棋"""
+        player = self.properties.get("PL", [""])[0].strip().upper()
+        if player in ("B", "W"):
+            return Stone.BLACK if player == "B" else Stone.WHITE
+        if self.moves:
+            return self.moves[0][2]
+        handicap = self.properties.get("HA", ["0"])[0].strip()
+        return Stone.WHITE if handicap.isdigit() and int(handicap) >= 2 else Stone.BLACK
+
+def _unescape(value: str) -> str:
+    """去掉转义符，转义的换行(软换行)整体删除"""
+    return _ESCAPE.sub(lambda m: "" if m.group(1) in ("\n", "\r", "\r\n", "\n\r") else m.group(1), value)
+
+def _point(value: str, size: int) -> Optional[Tuple[int, int]]:
+    """SGF坐标[列行]转(row, col)，空值或19路以内的"tt"为过手，返回None"""
+    if len(value) != 2 or (value == "tt" and size <= 19):
+        return None
+    col, row = ord(value[0]) - ord("a"), ord(value[1]) - ord("a")
+    if not (0 <= row < size and 0 <= col < size):
+        raise ValueError(f"SGF point out of range: {value}")
+    return row, col
+
+_point_tables: Dict[int, Dict[str, Tuple[int, int]]] = {}
+
+def _point_table(size: int) -> Dict[str, Tuple[int, int]]:
+    """棋盘上所有SGF坐标到(row, col)的查找表"""
+    table = _point_tables.get(size)
+    if table is None:
+        table = _point_tables[size] = {_format_point(row, col): (row, col)
+                                       for row in range(size) for col in range(size)}
+    return table
+
+def _points(value: str, size: int) -> Iterator[Tuple[int, int]]:
+    """展开摆子属性中的点或"aa:cc"形式的矩形"""
+    if ":" in value:
+        first, last = (_point(v, size) for v in value.split(":", 1))
+        if first is None or last is None:
+            raise ValueError(f"SGF rectangle with empty endpoint: {value}")
+        for row in range(min(first[0], last[0]), max(first[0], last[0]) + 1):
+            for col in range(min(first[1], last[1]), max(first[1], last[1]) + 1):
+                yield row, col
+    else:
+        point = _point(value, size)
+        if point is not None:
+            yield point
+
+def iter_game_texts(source: Union[str, IO[str]], chunk_size: int = 1 << 20) -> Iterator[str]:
+    """逐局产出合集中每局棋谱的原文，按块读取，内存占用与单局大小相当而与文件大小无关"""
+    if isinstance(source, str):
+        with open(source, encoding="utf-8", errors="replace") as f:
+            yield from iter_game_texts(f, chunk_size)
+        return
+
+    buffer = ""
+    depth = 0
+    start = None  # 当前对局在buffer中的起点
+    pos = 0       # 已扫描到的位置
+    while True:
+        chunk = source.read(chunk_size)
+        buffer += chunk
+        while True:
+            match = _SCAN.search(buffer, pos)
+            if match is None:
+                pos = len(buffer)
+                break
+            token = match.group(0)
+            if token == "[":
+                pos = match.start()  # 属性值不完整，等待下一块
+                break
+            pos = match.end()
+            if token == "(":
+                if depth == 0:
+                    start = match.start()
+                depth += 1
+            elif token == ")" and depth > 0:
+                depth -= 1
+                if depth == 0:
+                    yield buffer[start:pos]
+                    start = None
+        # 丢弃已完成的部分，只保留当前对局
+        keep = start if start is not None else pos
+        buffer = buffer[keep:]
+        pos -= keep
+        if start is not None:
+            start = 0
+        if not chunk:
+            return
+
+def parse_game(text: str) -> SGFGame:
+    """解析一局棋谱的主线(每处分支取第一个变化)"""
+    properties: Dict[str, List[str]] = {}
+    raw_setup: List[Tuple[str, str]] = []
+    raw_moves: List[Tuple[str, str]] = []
+    nodes = 0
+    started = False
+    # findall一次取出全部记号，比逐个取Match对象快得多
+    for punct, ident, values in _TOKEN.findall(text):
+        if punct:
+            if punct == ";":
+                nodes += 1
+            elif punct == "(":
+                started = True
+            elif started:
+                break  # 第一个变化结束即主线结束，其后都是兄弟分支
+            continue
+        if ident == "B" or ident == "W":
+            # 常见的单值着手直接切片，不再走正则
+            raw_moves.append((ident, values[1:-1] if len(values) == 4 else _VALUE.findall(values)[0]))
+            continue
+        if not ident.isupper():
+            # 老版本SGF允许在属性名中夹小写字母(如AddBlack)，读取时忽略
+            ident = "".join(ch for ch in ident if ch.isupper())
+        if ident == "AB" or ident == "AW":
+            raw_setup.extend((ident[1], v) for v in _VALUE.findall(values))
+        elif nodes == 1:
+            properties[ident] = [_unescape(v) for v in _VALUE.findall(values)]
+
+    size = int(properties.get("SZ", ["19"])[0].split(":")[0])
+    setup = [(row, col, Stone.BLACK if color == "B" else Stone.WHITE)
+             for color, value in raw_setup for row, col in _points(value, size)]
+    points = _point_table(size)
+    moves = []
+    for color, value in raw_moves:
+        point = points.get(value)
+        if point is None:
+            point = _point(value, size) or (-1, -1)
+        moves.append((point[0], point[1], Stone.BLACK if color == "B" else Stone.WHITE))
+    return SGFGame(size, properties, setup, moves)
+
+def iter_games(source: Union[str, IO[str]], chunk_size: int = 1 << 20) -> Iterator[SGFGame]:
+    """逐局解析SGF文件或文本流，无法解析的对局打印后跳过"""
+    for text in iter_game_texts(source, chunk_size):
+        try:
+            yield parse_game(text)
+        except ValueError as e:
+            print(f"跳过无法解析的棋谱: {e}")
+
+def load_game(path: str) -> SGFGame:
+    """读取文件中的第一局"""
+    for game in iter_games(path):
+        return game
+    raise ValueError(f"No SGF game found in {path}")
+
+def replay(game: SGFGame, board: Optional[GoBoard] = None) -> Iterator[Tuple[GoBoard, Move]]:
+    """按规则重放棋谱，每手合法的落子前产出(棋盘, 着手)；遇到非法着手即停止，不产出该手
+
+    摆子(AB/AW)用GoBoard.setup_stone摆上，不计入落子历史。产出的棋盘是同一个对象，调用方如需保存须自行复制。
+    """
+    board = board if board is not None else GoBoard(game.size)
+    for row, col, stone in game.setup:
+        if not board.setup_stone(row, col, stone):
+            return
+    for move in game.moves:
+        row, col, stone = move
+        if row >= 0 and not board.is_valid_move(row, col, stone):
+            return
+        yield board, move
+        if row < 0:
+            board.pass_move(stone)
+        elif not board.place_stone(row, col, stone):
+            return
+
+def load_board(game: SGFGame) -> GoBoard:
+    """把棋谱重放到终局(或第一个非法着手之前)，返回GoBoard"""
+    board = GoBoard(game.size)
+    for _ in replay(game, board):
+        pass
+    return board
+
+def _format_value(value: str) -> str:
+    return "[" + str(value).replace("\\", "\\\\").replace("]", "\\]") + "]"
+
+def _format_point(row: int, col: int) -> str:
+    if row < 0:
+        return ""
+    return chr(ord("a") + col) + chr(ord("a") + row)
+
+def dumps(moves: Iterable[Move], size: int = 19, komi: float = 7.5,
+          properties: Optional[Dict[str, str]] = None, setup: Iterable[Move] = ()) -> str:
+    """把着手序列写成一局SGF文本"""
+    root = {"GM": "1", "FF": "4", "CA": "UTF-8", "AP": "Go_Playing_Robot", "SZ": str(size), "KM": str(komi)}
+    root.update(properties or {})
+    out = io.StringIO()
+    out.write("(;" + "".join(key + _format_value(value) for key, value in root.items()))
+    for color in (Stone.BLACK, Stone.WHITE):
+        points = [_format_point(r, c) for r, c, s in setup if s == color]
+        if points:
+            out.write(("AB" if color == Stone.BLACK else "AW") + "".join(f"[{p}]" for p in points))
+    for i, (row, col, stone) in enumerate(moves):
+        out.write(("\n" if i % 10 == 0 else "") + f";{'B' if stone == Stone.BLACK else 'W'}[{_format_point(row, col)}]")
+    out.write(")\n")
+    return out.getvalue()
+
+def dumps_board(board: GoBoard, komi: float = 7.5, properties: Optional[Dict[str, str]] = None) -> str:
+    """GoBoard的摆子(写成AB/AW)和落子历史转SGF"""
+    return dumps(board.move_history, board.size, komi, properties, board.setup)
+
+def dumps_go_ai(ai, komi: float = 7.5, properties: Optional[Dict[str, str]] = None) -> str:
+    """GoAI的对局转SGF"""
+    return dumps_board(ai.game.go_board, komi, properties)
+
+def save(path: str, sgf_text: str, append: bool = False):
+    """保存SGF文本，append=True时追加到合集文件末尾"""
+    with open(path, "a" if append else "w", encoding="utf-8") as f:
+        f.write(sgf_text)
+
+def iter_sgf_files(paths: Iterable[str]) -> Iterator[str]:
+    """展开路径列表，目录递归查找.sgf文件"""
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    if name.lower().endswith(".sgf"):
+                        yield os.path.join(root, name)
+        else:
+            yield path
+
+def _ingest_batch(handler: Callable[[SGFGame], object], texts: List[str]) -> list:
+    """子进程内解析一批棋谱原文并逐局调用handler"""
+    results = []
+    for text in texts:
+        try:
+            game = parse_game(text)
+        except ValueError:
+            continue
+        results.append(handler(game))
+    return results
+
+def ingest(paths: Iterable[str], handler: Callable[[SGFGame], object], workers: Optional[int] = None,
+           batch_size: int = 256) -> Iterator[object]:
+    """多进程处理棋谱库：主进程流式切分对局，子进程解析并调用handler，按对局顺序产出结果
+
+    handler须是模块级函数(或其functools.partial)以便传给子进程；同时在途的批次数有上限，
+    因此再大的棋谱库内存占用也是常数。
+    """
+    workers = workers or os.cpu_count() or 1
+    texts = (text for path in iter_sgf_files(paths) for text in iter_game_texts(path))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = []
+        batch: List[str] = []
+        for text in texts:
+            batch.append(text)
+            if len(batch) >= batch_size:
+                pending.append(executor.submit(_ingest_batch, handler, batch))
+                batch = []
+                if len(pending) >= workers * 2:
+                    yield from pending.pop(0).result()
+        if batch:
+            pending.append(executor.submit(_ingest_batch, handler, batch))
+        for future in pending:
+            yield from future.result()
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+# Incremental model replies: read as tokens arrive, stop early or finish later
+import re
+import threading
+from typing import Callable, Iterator, Optional
+
+_TRAILING_NUMBER = re.compile(r"\d+\s*$")
+
+def confirmed_prefix(text: str) -> str:
+    """去掉末尾可能尚未写完的数字，例如"10,1"可能是"10,11"的前半截"""
+    return _TRAILING_NUMBER.sub("", text)
+
+class StreamingReply:
+    """一次流式回复：迭代时逐段产出累计文本
+
+    读到所需内容后可以cancel()中断请求，或finish()/finish_in_background()读完剩余部分。
+    只有回复自然读完且没有出错时才以全文调用on_complete(例如写入缓存)，被中断的半截回复不调用。
+    请求出错时迭代结束，错误信息保存在error中。cancel()可以在其他线程调用，正在读取的线程读到下一段时停止。
+    """
+
+    def __init__(self, pieces: Iterator[str], on_complete: Optional[Callable[[str], None]] = None,
+                 to_current: Callable = lambda row, col: (row, col), text: str = ""):
+        self._pieces = pieces
+        self._on_complete = on_complete
+        self.to_current = to_current
+        self.text = text
+        self._unread = bool(text)  # 预置的全文(缓存命中)还没有产出过
+        self.error: Optional[str] = None
+        self.done = False
+        self.cancelled = False
+        self._lock = threading.Lock()
+
+    def __iter__(self) -> Iterator[str]:
+        if self._unread:
+            self._unread = False
+            yield self.text
+        try:
+            for piece in self._pieces:
+                if self.cancelled:
+                    break
+                self.text += piece
+                yield self.text
+        except Exception as e:
+            self.error = str(e)
+        if self.cancelled:
+            self._close()
+        else:
+            self._complete()
+
+    def _complete(self):
+        with self._lock:
+            if self.done:
+                return
+            self.done = True
+        if self._on_complete and self.text and self.error is None:
+            self._on_complete(self.text)
+
+    def _close(self):
+        close = getattr(self._pieces, "close", None)
+        if close is not None:
+            try:
+                close()
+            except ValueError:
+                pass  # 其他线程正在读取，由它读到下一段时停止并关闭
+
+    def cancel(self):
+        """中断请求(关闭底层流)；回复不完整，不调用on_complete"""
+        with self._lock:
+            if self.done:
+                return
+            self.done = True
+            self.cancelled = True
+        self._close()
+
+    def finish(self) -> str:
+        """读完剩余部分，返回全文"""
+        for _ in self:
+            pass
+        return self.text
+
+    def finish_in_background(self, callback: Callable[[str], None]) -> threading.Thread:
+        """在后台线程读完剩余部分，完成后以全文调用callback"""
+        thread = threading.Thread(target=lambda: callback(self.finish()), daemon=True)
+        thread.start()
+        return thread
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+# D4 board symmetries: canonical orientation for positions, hashes and moves
+import numpy as np
+from typing import Tuple
+from src.go_board import zobrist_table
+
+# 8种对称变换下(row, col)的像，n = size - 1
+TRANSFORMS = (
+    lambda r, c, n: (r, c),          # 0 恒等
+    lambda r, c, n: (c, n - r),      # 1 顺时针90°
+    lambda r, c, n: (n - r, n - c),  # 2 180°
+    lambda r, c, n: (n - c, r),      # 3 顺时针270°
+    lambda r, c, n: (r, n - c),      # 4 左右镜像
+    lambda r, c, n: (n - r, c),      # 5 上下镜像
+    lambda r, c, n: (c, r),          # 6 主对角线
+    lambda r, c, n: (n - c, n - r),  # 7 副对角线
+)
+INVERSE = (0, 3, 2, 1, 4, 5, 6, 7)
+
+_permutations = {}
+
+def point_permutations(size: int) -> np.ndarray:
+    """(8, size*size)：第t行第p列是点位p经变换t后的点位"""
+    perm = _permutations.get(size)
+    if perm is None:
+        rows, cols = np.divmod(np.arange(size * size), size)
+        perm = np.empty((8, size * size), dtype=np.intp)
+        for t, transform in enumerate(TRANSFORMS):
+            r, c = transform(rows, cols, size - 1)
+            perm[t] = r * size + c
+        perm.setflags(write=False)
+        _permutations[size] = perm
+    return perm
+
+def all_transforms(board: np.ndarray) -> np.ndarray:
+    """返回(8, size, size)：棋盘在8种变换下的像，第t个即transform_board(board, t)"""
+    size = board.shape[0]
+    inverse = point_permutations(size)[list(INVERSE)]
+    return board.reshape(-1)[inverse].reshape(8, size, size)
+
+def transform_board(board: np.ndarray, t: int) -> np.ndarray:
+    size = board.shape[0]
+    return board.reshape(-1)[point_permutations(size)[INVERSE[t]]].reshape(size, size)
+
+def canonicalize(board: np.ndarray) -> Tuple[np.ndarray, int]:
+    """返回(规范局面, t)：8种像中按字节序最小的一个，满足canonical == transform_board(board, t)"""
+    images = all_transforms(board).reshape(8, -1)
+    t = int(np.lexsort(images.T[::-1])[0])
+    return images[t].reshape(board.shape), t
+
+def canonical_hash(board: np.ndarray) -> Tuple[int, int]:
+    """返回(规范Zobrist哈希, t)：8种像的Zobrist哈希中最小的一个，board取值须为0空/1黑/2白"""
+    size = board.shape[0]
+    flat = board.reshape(-1)
+    stones = np.flatnonzero(flat)
+    if stones.size == 0:
+        return 0, 0
+    keys = zobrist_table(size)[flat[stones][None, :], point_permutations(size)[:, stones]]
+    hashes = np.bitwise_xor.reduce(keys, axis=1)
+    t = int(np.argmin(hashes))
+    return int(hashes[t]), t
+
+def transform_move(move: Tuple[int, int], t: int, size: int) -> Tuple[int, int]:
+    """把原局面坐标系中的落子映射到变换t后的坐标系"""
+    row, col = move
+    if row < 0:
+        return move
+    return tuple(int(v) for v in TRANSFORMS[t](row, col, size - 1))
+
+def inverse_move(move: Tuple[int, int], t: int, size: int) -> Tuple[int, int]:
+    """transform_move的逆：把规范坐标系中的落子映射回原局面"""
+    return transform_move(move, INVERSE[t], size)
+
+def remap_move(move: Tuple[int, int], from_t: int, to_t: int, size: int) -> Tuple[int, int]:
+    """两个等价局面之间换算落子：from_t/to_t分别是两者到同一规范局面的变换"""
+    return inverse_move(transform_move(move, from_t, size), to_t, size)
@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+# 让测试可以按"from src.x import ..."导入项目模块，并提供不联网的GoAI
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+class FakeResponse:
+    """DashScope Generation.call返回值中被用到的部分"""
+
+    def __init__(self, text: str = "", status_code: int = 200, message: str = ""):
+        self.status_code = status_code
+        self.message = message
+        self.output = SimpleNamespace(text=text, choices=None)
+
+@pytest.fixture
+def go_ai(monkeypatch):
+    """不读.env里的密钥、开局库和磁盘缓存的GoAI；测试自行替换_generation_call"""
+    monkeypatch.setenv("DASHSCOPE_API_KEY", "test-key")
+    monkeypatch.setenv("OPENING_BOOK_PATH", "")
+    from src.go_ai import GoAI
+    from src.response_cache import ResponseCache
+    return GoAI(cache=ResponseCache(db_path=None), session_tokens=0)
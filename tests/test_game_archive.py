@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+# Binary game archive: round-trips, appends and recovery from interrupted writes
+import random
+
+import numpy as np
+import pytest
+
+from src.game_archive import HEADER, INDEX_DTYPE, MOVE_DTYPE, ArchiveWriter, GameArchive, decode_moves, encode_moves
+from src.go_board import GoBoard, Stone
+
+def random_moves(rng: random.Random, size: int, count: int):
+    board = GoBoard(size)
+    stone = Stone.BLACK
+    moves = []
+    for _ in range(count):
+        legal = board.get_valid_moves(stone)
+        if not legal or rng.random() < 0.05:
+            board.pass_move(stone)
+            moves.append((-1, -1, stone))
+        else:
+            row, col = rng.choice(legal)
+            board.place_stone(row, col, stone)
+            moves.append((row, col, stone))
+        stone = stone.opponent
+    return moves
+
+GAMES = [random_moves(random.Random(seed), 9, length) for seed, length in enumerate([0, 1, 30, 57])]
+
+def test_encode_decode_round_trip():
+    moves = GAMES[3]
+    rows, cols, colors = decode_moves(encode_moves(moves, 9), 9)
+    assert list(zip(rows.tolist(), cols.tolist(), [Stone(c) for c in colors.tolist()])) == moves
+
+def test_archive_round_trip(tmp_path):
+    path = str(tmp_path / "games.arc")
+    with ArchiveWriter(path, 9) as writer:
+        for i, moves in enumerate(GAMES):
+            assert writer.add_game(moves, Stone.WHITE if i % 2 else Stone.BLACK, 6.5) == i
+    with GameArchive(path) as archive:
+        assert len(archive) == len(GAMES)
+        assert list(archive) == GAMES
+        assert [archive.winner(i) for i in range(len(GAMES))] == [Stone.BLACK, Stone.WHITE] * 2
+        assert archive.komi(2) == 6.5
+        assert archive.moves(3, 10, 20) == GAMES[3][10:20]
+        replayed = archive.board(3)
+        assert replayed.move_history == GAMES[3]
+
+def test_append(tmp_path):
+    path = str(tmp_path / "games.arc")
+    with ArchiveWriter(path, 9) as writer:
+        writer.add_game(GAMES[2])
+    with ArchiveWriter(path, 9, append=True) as writer:
+        assert len(writer) == 1
+        writer.add_game(GAMES[3])
+    with GameArchive(path) as archive:
+        assert list(archive) == [GAMES[2], GAMES[3]]
+    with pytest.raises(ValueError):
+        ArchiveWriter(path, 19, append=True)
+
+def test_recovers_from_truncation_at_every_byte(tmp_path):
+    path = tmp_path / "games.arc"
+    writer = ArchiveWriter(str(path), 9)
+    for moves in GAMES[1:]:
+        writer.add_game(moves)
+    writer._file.flush()
+    data = path.read_bytes()
+    writer.close()
+
+    # 写入中途的文件在任意位置截断，都能读出截断前写完的对局
+    ends = np.cumsum([INDEX_DTYPE.itemsize + MOVE_DTYPE.itemsize * len(moves) for moves in GAMES[1:]]) + HEADER.size
+    partial = tmp_path / "partial.arc"
+    for length in range(HEADER.size, len(data) + 1):
+        partial.write_bytes(data[:length])
+        with GameArchive(str(partial)) as archive:
+            complete = int(np.searchsorted(ends, length, side="right"))
+            assert list(archive) == GAMES[1:1 + complete]
+
+def test_interrupted_append_keeps_earlier_games(tmp_path):
+    path = str(tmp_path / "games.arc")
+    with ArchiveWriter(path, 9) as writer:
+        writer.add_game(GAMES[2])
+    # 追加过程中进程退出：一局写完，另一局只写了一半，文件头和索引都没有回填
+    writer = ArchiveWriter(path, 9, append=True)
+    writer.add_game(GAMES[3])
+    writer._file.write(encode_moves(GAMES[3], 9).tobytes()[:7])
+    writer._file.flush()
+    with GameArchive(path) as archive:
+        assert list(archive) == [GAMES[2], GAMES[3]]
+    # 再次追加时截掉写了一半的部分
+    with ArchiveWriter(path, 9, append=True) as writer:
+        writer.add_game(GAMES[1])
+    with GameArchive(path) as archive:
+        assert list(archive) == [GAMES[2], GAMES[3], GAMES[1]]
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+# GameState: observer notifications outside the lock, version compare-and-set and snapshots
+import threading
+
+from src.game_state import GameState
+from src.go_board import Stone
+
+def test_observer_error_does_not_undo_or_escape_the_move():
+    game = GameState(9)
+    events = []
+
+    def broken(event):
+        raise RuntimeError("observer failed")
+
+    game.subscribe(broken)
+    game.subscribe(events.append)
+    assert game.play(3, 3)
+    assert game.version == 1
+    assert [event.kind for event in events] == ["move"]
+
+def test_observer_can_wait_for_another_thread_that_changes_the_game():
+    game = GameState(9)
+    order = []
+    finished = threading.Event()
+
+    def waits_for_reset(event):
+        # 模拟界面观察者等待主线程，而主线程此时正要重置对局
+        if event.kind == "move":
+            other = threading.Thread(target=lambda: (game.reset(), finished.set()))
+            other.start()
+            other.join(5)
+
+    game.subscribe(waits_for_reset)
+    game.subscribe(lambda event: order.append((event.kind, event.version)))
+    game.play(3, 3)
+    assert finished.is_set()
+    # 另一个线程的事件排在后面，仍按发生顺序通知
+    assert order == [("move", 1), ("reset", 2)]
+
+def test_stale_version_is_rejected_after_every_change():
+    game = GameState(9)
+    for change in (lambda: game.play(3, 3), lambda: game.undo(), lambda: game.reset()):
+        if not game.move_history:
+            game.play(4, 4)
+        version = game.snapshot().version
+        change()
+        assert game.is_stale(version)
+        moves = list(game.move_history)
+        assert not game.play(2, 2, version=version)
+        assert list(game.move_history) == moves
+        assert game.play(2, 2, version=game.version)
+
+def test_snapshot_does_not_change_after_later_moves():
+    game = GameState(9)
+    game.play(3, 3)
+    snapshot = game.snapshot()
+    board = snapshot.board.copy()
+    history = list(snapshot.move_history)
+    game.play(4, 4)
+    game.undo()
+    game.undo()
+    game.play(5, 5)
+    assert (snapshot.board == board).all()
+    assert list(snapshot.move_history) == history == [(3, 3, Stone.BLACK)]
+    assert (snapshot.go_board().board == board).all()
+    assert game.snapshot() is not snapshot
+
+def test_observers_receive_captures():
+    game = GameState(9)
+    events = []
+    game.subscribe(events.append)
+    for row, col, stone in [(0, 1, Stone.BLACK), (0, 0, Stone.WHITE), (1, 0, Stone.BLACK)]:
+        assert game.play(row, col, stone)
+    capture = events[-1]
+    assert (capture.kind, capture.row, capture.col, capture.stone) == ("move", 1, 0, Stone.BLACK)
+    assert capture.captured == ((0, 0),)
+    undo = game.undo()
+    assert events[-1] is undo
+    assert undo.captured == ((0, 0),)
+    assert game.board[0, 0] == Stone.WHITE.value
+    assert game.redo().captured == ((0, 0),)
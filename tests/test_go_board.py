@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+# GoBoard rules checked against a naive flood-fill reference implementation
+import copy
+import random
+from typing import List, Optional, Set, Tuple
+
+import numpy as np
+import pytest
+
+from src.go_board import GoBoard, Stone, zobrist_table
+
+Grid = Tuple[Tuple[int, ...], ...]
+
+class ReferenceBoard:
+    """朴素实现：每次落子复制整盘并洪水填充找棋串，规则与GoBoard相同(提子、禁自杀、全局同形禁着)"""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.grid: Grid = tuple((0,) * size for _ in range(size))
+        self.seen: Set[Grid] = {self.grid}
+        self.captured = {Stone.BLACK.value: 0, Stone.WHITE.value: 0}
+
+    def neighbors(self, row: int, col: int):
+        for r, c in ((row - 1, col), (row + 1, col), (row, col - 1), (row, col + 1)):
+            if 0 <= r < self.size and 0 <= c < self.size:
+                yield r, c
+
+    def group(self, grid: Grid, row: int, col: int) -> Tuple[Set[Tuple[int, int]], Set[Tuple[int, int]]]:
+        """(row, col)所在棋串的(棋子, 气)"""
+        color = grid[row][col]
+        stones, liberties, stack = {(row, col)}, set(), [(row, col)]
+        while stack:
+            point = stack.pop()
+            for r, c in self.neighbors(*point):
+                if grid[r][c] == 0:
+                    liberties.add((r, c))
+                elif grid[r][c] == color and (r, c) not in stones:
+                    stones.add((r, c))
+                    stack.append((r, c))
+        return stones, liberties
+
+    def result(self, row: int, col: int, color: int) -> Optional[Tuple[Grid, int]]:
+        """落子后的(局面, 提子数)，不合法时返回None"""
+        if self.grid[row][col]:
+            return None
+        cells = [list(line) for line in self.grid]
+        cells[row][col] = color
+        captured = 0
+        for r, c in self.neighbors(row, col):
+            if cells[r][c] == 3 - color:
+                stones, liberties = self.group(tuple(map(tuple, cells)), r, c)
+                if not liberties:
+                    for sr, sc in stones:
+                        cells[sr][sc] = 0
+                    captured += len(stones)
+        grid = tuple(map(tuple, cells))
+        if not self.group(grid, row, col)[1] or grid in self.seen:
+            return None
+        return grid, captured
+
+    def legal_moves(self, color: int) -> Set[Tuple[int, int]]:
+        return {(r, c) for r in range(self.size) for c in range(self.size) if self.result(r, c, color)}
+
+    def play(self, row: int, col: int, color: int):
+        grid, captured = self.result(row, col, color)
+        self.grid = grid
+        self.seen.add(grid)
+        self.captured[3 - color] += captured
+
+def assert_same(board: GoBoard, reference: ReferenceBoard, stone: Stone):
+    assert board.board.tolist() == [list(line) for line in reference.grid]
+    assert set(board.get_valid_moves(stone)) == reference.legal_moves(stone.value)
+    assert (board.captured_black, board.captured_white) == (reference.captured[1], reference.captured[2])
+    for row in range(board.size):
+        for col in range(board.size):
+            if reference.grid[row][col]:
+                assert board.get_liberties(row, col) == len(reference.group(reference.grid, row, col)[1])
+
+def random_game(board: GoBoard, reference: ReferenceBoard, rng: random.Random, plies: int):
+    """双方随机落子(偶尔过手)，每手后与参考实现比较"""
+    stone = Stone.BLACK
+    for _ in range(plies):
+        moves = sorted(reference.legal_moves(stone.value))
+        if not moves or rng.random() < 0.05:
+            board.pass_move(stone)
+        else:
+            row, col = rng.choice(moves)
+            assert board.place_stone(row, col, stone)
+            reference.play(row, col, stone.value)
+        stone = stone.opponent
+        assert_same(board, reference, stone)
+
+def play(board: GoBoard, moves: List[Tuple[int, int]], stone: Stone = Stone.BLACK) -> Stone:
+    """从stone开始交替落子，每手都须合法，返回下一手的颜色"""
+    for row, col in moves:
+        assert board.place_stone(row, col, stone), (row, col, stone)
+        stone = stone.opponent
+    return stone
+
+def test_capture_single_stone():
+    board = GoBoard(5)
+    play(board, [(0, 1), (0, 0), (1, 0)])
+    assert board.board[0, 0] == Stone.EMPTY.value
+    assert board.captured_white == 1
+    assert board.get_liberties(0, 1) == 3
+
+def test_capture_group_and_multiple_groups():
+    board = GoBoard(5)
+    # 白棋两串(0,0)-(0,1)和(0,3)共用(0,2)这口气，黑棋一手同时提掉
+    play(board, [(1, 0), (0, 0), (1, 1), (0, 1), (1, 3), (0, 3), (0, 4), (4, 4), (0, 2)])
+    assert board.board[0].tolist() == [0, 0, 1, 0, 1]
+    assert board.captured_white == 3
+    assert sorted(divmod(p, 5) for p in board.last_delta.captured) == [(0, 0), (0, 1), (0, 3)]
+
+def test_suicide_is_illegal_unless_it_captures():
+    board = GoBoard(5)
+    play(board, [(0, 1), (4, 4), (1, 0)])
+    assert not board.is_valid_move(0, 0, Stone.WHITE)
+    assert not board.place_stone(0, 0, Stone.WHITE)
+    # (0,0)四周都是黑子，但白棋落下即提掉两颗只剩这口气的黑子，不算自杀
+    board = GoBoard(5)
+    play(board, [(0, 1), (0, 2), (1, 0), (1, 1), (4, 4), (2, 0), (4, 3)])
+    assert board.place_stone(0, 0, Stone.WHITE)
+    assert board.captured_black == 2
+
+@pytest.mark.parametrize("size", [5, 7])
+def test_random_games_match_reference(size):
+    for seed in range(8):
+        random_game(GoBoard(size), ReferenceBoard(size), random.Random(seed), 3 * size * size)
+
+def test_legal_mask_matches_is_valid_move():
+    rng = random.Random(1)
+    board, reference = GoBoard(7), ReferenceBoard(7)
+    random_game(board, reference, rng, 60)
+    for stone in (Stone.BLACK, Stone.WHITE):
+        expected = np.array([[board.is_valid_move(r, c, stone) for c in range(7)] for r in range(7)])
+        assert (board.legal_mask(stone) == expected).all()
+
+def test_simple_ko():
+    board = GoBoard(5)
+    # 黑棋在(1,2)提掉(1,1)的白子形成劫，白棋不能立即提回，隔一手后可以
+    play(board, [(0, 1), (0, 2), (1, 0), (1, 3), (2, 1), (2, 2), (4, 4), (1, 1), (1, 2)])
+    assert board.ko_position == (1, 1)
+    assert not board.is_valid_move(1, 1, Stone.WHITE)
+    assert not board.legal_mask(Stone.WHITE)[1, 1]
+    play(board, [(4, 0), (4, 1)], Stone.WHITE)
+    assert board.place_stone(1, 1, Stone.WHITE)
+
+def test_positional_superko():
+    board = GoBoard(3)
+    # 白棋(0,0)一手提两子，不是单劫；黑棋在(0,1)提回会重现第4手后的局面
+    play(board, [(1, 0), (1, 1), (0, 1), (1, 2), (0, 2), (0, 0)])
+    assert board.ko_position is None
+    assert not board.is_valid_move(0, 1, Stone.BLACK)
+    assert not board.legal_mask(Stone.BLACK)[0, 1]
+    assert not board.place_stone(0, 1, Stone.BLACK)
+
+def test_incremental_hash_matches_recomputed():
+    board = GoBoard(7)
+    random_game(board, ReferenceBoard(7), random.Random(3), 120)
+    table = zobrist_table(7)
+    expected = 0
+    for point in np.flatnonzero(board.board).tolist():
+        expected ^= int(table[board.board.flat[point]][point])
+    assert board.hash == expected
+    assert expected in board.position_hashes
+
+def test_random_undo_redo_matches_reference():
+    for seed in range(6):
+        rng = random.Random(seed)
+        board = GoBoard(5)
+        states = [ReferenceBoard(5)]  # 每手之后参考实现的完整状态，最后一个是当前局面
+        undone: List[ReferenceBoard] = []
+        stone = Stone.BLACK
+        for _ in range(150):
+            action = rng.random()
+            if action < 0.2 and board.can_undo():
+                stone = board.undo().stone
+                undone.append(states.pop())
+            elif action < 0.3 and board.can_redo():
+                stone = board.redo().stone.opponent
+                states.append(undone.pop())
+            else:
+                reference = copy.deepcopy(states[-1])
+                moves = sorted(reference.legal_moves(stone.value))
+                if not moves or rng.random() < 0.05:
+                    board.pass_move(stone)
+                else:
+                    row, col = rng.choice(moves)
+                    assert board.place_stone(row, col, stone)
+                    reference.play(row, col, stone.value)
+                states.append(reference)
+                undone.clear()  # 新落子后不能再重做
+                stone = stone.opponent
+            assert len(board.move_history) == len(states) - 1
+            assert board.can_redo() == bool(undone)
+            assert_same(board, states[-1], stone)
+
+def test_undo_all_then_redo_all():
+    board = GoBoard(7)
+    random_game(board, ReferenceBoard(7), random.Random(5), 100)
+    final = (board.board.copy(), board.hash, set(board.position_hashes), list(board.move_history),
+             board.captured_black, board.captured_white, board.ko_position)
+    while board.undo() is not None:
+        pass
+    fresh = GoBoard(7)
+    assert (board.board == fresh.board).all()
+    assert (board.hash, board.position_hashes, board.move_history) == (fresh.hash, fresh.position_hashes, [])
+    assert (board.captured_black, board.captured_white) == (0, 0)
+    while board.redo() is not None:
+        pass
+    assert (board.board == final[0]).all()
+    assert (board.hash, board.position_hashes, board.move_history, board.captured_black,
+            board.captured_white, board.ko_position) == final[1:]
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+# Response cache tiers and GoAI.call_model caching only successful replies
+import time
+
+import numpy as np
+
+from conftest import FakeResponse
+from src.response_cache import ResponseCache
+
+def test_memory_and_sqlite_tiers(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = ResponseCache(db_path=path)
+    cache.set("k", "回复")
+    assert cache.get("k") == "回复"
+    cache.close()
+    # 新实例的内存层为空，从SQLite读回
+    reopened = ResponseCache(db_path=path)
+    assert reopened.get("k") == "回复"
+    assert reopened.get("missing") is None
+    assert (reopened.hits, reopened.misses) == (1, 1)
+    reopened.close()
+
+def test_expired_entries_are_misses():
+    cache = ResponseCache(db_path=None, ttl=None)
+    cache.set("old", "x", ttl=0.01)
+    cache.set("new", "y")
+    time.sleep(0.02)
+    assert cache.get("old") is None
+    assert cache.get("new") == "y"
+
+def test_memory_limit_evicts_least_recently_used():
+    cache = ResponseCache(db_path=None, max_memory_bytes=3 * (len("k0") + 100))
+    for i in range(3):
+        cache.set(f"k{i}", "x" * 100)
+    cache.get("k0")
+    cache.set("k3", "x" * 100)
+    assert cache.get("k1") is None
+    assert [cache.get(k) is not None for k in ("k0", "k2", "k3")] == [True] * 3
+
+def test_call_model_caches_only_success(go_ai):
+    calls = []
+    responses = [FakeResponse(status_code=429, message="Throttling"), FakeResponse("4,4")]
+    go_ai._generation_call = lambda prompt, turn, **kwargs: calls.append(prompt) or responses.pop(0)
+    board = np.zeros((19, 19), dtype=int)
+
+    assert go_ai.call_model("p", "quick", 10, 0.5, board=board)[:2] == (None, "Throttling")
+    assert go_ai.call_model("p", "quick", 10, 0.5, board=board)[:2] == ("4,4", None)
+    assert go_ai.call_model("p", "quick", 10, 0.5, board=board)[:2] == ("4,4", None)
+    assert len(calls) == 2
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+# SGF round-trips, setup stones (AB/AW) and chunked collection reading
+import io
+
+import pytest
+
+from src import sgf
+from src.go_board import GoBoard, Stone
+from src.opening_book import book_entries
+
+def test_moves_round_trip():
+    moves = [(3, 3, Stone.BLACK), (15, 15, Stone.WHITE), (-1, -1, Stone.BLACK), (2, 16, Stone.WHITE)]
+    text = sgf.dumps(moves, 19, 6.5, {"PB": "a]b\\c", "RE": "W+R"})
+    game = sgf.parse_game(text)
+    assert game.size == 19
+    assert game.moves == moves
+    assert game.setup == []
+    assert game.properties["KM"] == ["6.5"]
+    assert game.properties["PB"] == ["a]b\\c"]
+
+def test_setup_stones_round_trip():
+    board = GoBoard(9)
+    for row, col, stone in [(2, 2, Stone.BLACK), (6, 6, Stone.BLACK), (2, 6, Stone.WHITE)]:
+        assert board.setup_stone(row, col, stone)
+    board.place_stone(4, 4, Stone.WHITE)
+    board.place_stone(4, 5, Stone.BLACK)
+
+    game = sgf.parse_game(sgf.dumps_board(board))
+    assert sorted(game.setup) == sorted(board.setup)
+    assert game.moves == board.move_history
+    loaded = sgf.load_board(game)
+    assert (loaded.board == board.board).all()
+    assert loaded.setup == game.setup
+    assert loaded.move_history == board.move_history
+    assert loaded.hash == board.hash
+
+def test_setup_stones_are_not_moves():
+    game = sgf.parse_game("(;GM[1]SZ[9]HA[2]AB[cc][gg])")
+    assert game.moves == []
+    assert game.first_player == Stone.WHITE
+    board = sgf.load_board(game)
+    assert board.move_history == []
+    assert board.board[2, 2] == board.board[6, 6] == Stone.BLACK.value
+    assert board.undo() is None
+    # 第一手之后不能再摆子
+    board.place_stone(4, 4, Stone.WHITE)
+    assert not board.setup_stone(0, 0, Stone.BLACK)
+
+def test_setup_rectangle_and_first_player():
+    game = sgf.parse_game("(;SZ[9]PL[B]AW[aa:bb];B[ee])")
+    assert sorted(game.setup) == [(0, 0, Stone.WHITE), (0, 1, Stone.WHITE), (1, 0, Stone.WHITE), (1, 1, Stone.WHITE)]
+    assert game.first_player == Stone.BLACK
+    assert sgf.parse_game("(;SZ[9];W[ee])").first_player == Stone.WHITE
+    assert sgf.parse_game("(;SZ[9])").first_player == Stone.BLACK
+
+def test_main_line_only():
+    game = sgf.parse_game("(;SZ[9];B[aa](;W[bb];B[cc])(;W[dd]))")
+    assert [(row, col) for row, col, _ in game.moves] == [(0, 0), (1, 1), (2, 2)]
+
+def test_replay_stops_at_illegal_move():
+    game = sgf.parse_game("(;SZ[9];B[aa];W[aa];B[bb])")
+    board = sgf.load_board(game)
+    assert board.move_history == [(0, 0, Stone.BLACK)]
+    assert [move for _, move in sgf.replay(game)] == [(0, 0, Stone.BLACK)]
+
+def test_illegal_move_is_not_a_book_move():
+    game = sgf.parse_game("(;SZ[19];B[dd];W[dd];B[pp])")
+    assert len(book_entries(game)) == 1
+
+def test_rectangle_with_empty_endpoint_is_rejected():
+    for text in ("(;SZ[9]AB[aa:tt])", "(;SZ[9]AB[:cc])"):
+        with pytest.raises(ValueError):
+            sgf.parse_game(text)
+    games = list(sgf.iter_games(io.StringIO("(;SZ[9]AB[aa:tt])(;SZ[9];B[ee])")))
+    assert [game.moves for game in games] == [[(4, 4, Stone.BLACK)]]
+
+def test_collection_read_in_small_chunks():
+    games = [sgf.dumps([(i, i, Stone.BLACK), (i, i + 1, Stone.WHITE)], 9, properties={"C": f"第{i}局 (x)[y\\]"})
+             for i in range(5)]
+    collection = "".join(games)
+    for chunk_size in (1, 7, 1 << 20):
+        texts = list(sgf.iter_game_texts(io.StringIO(collection), chunk_size))
+        assert [sgf.parse_game(text).moves for text in texts] == [sgf.parse_game(text).moves for text in games]
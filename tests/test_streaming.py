@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+# Streaming replies: on_complete (and so the cache) only runs for a reply that was read to the end
+import queue
+import threading
+
+import numpy as np
+
+from conftest import FakeResponse
+from src.go_board import GoBoard, Stone
+from src.streaming import StreamingReply, confirmed_prefix
+
+class Pieces:
+    """可迭代的分段回复，记录是否被关闭"""
+
+    def __init__(self, pieces, error_at=None):
+        self.pieces = pieces
+        self.error_at = error_at
+        self.closed = False
+
+    def __iter__(self):
+        try:
+            for i, piece in enumerate(self.pieces):
+                if i == self.error_at:
+                    raise RuntimeError("连接中断")
+                yield piece
+        finally:
+            self.closed = True
+
+def reply_for(source: Pieces, completed: list) -> StreamingReply:
+    return StreamingReply(iter(source), completed.append)
+
+def test_confirmed_prefix_drops_trailing_number():
+    assert confirmed_prefix("建议 10,1") == "建议 10,"
+    assert confirmed_prefix("10,11。") == "10,11。"
+
+def test_full_read_calls_on_complete_once():
+    completed = []
+    reply = reply_for(Pieces(["4,", "4", "。"]), completed)
+    assert list(reply) == ["4,", "4,4", "4,4。"]
+    reply.finish()
+    assert completed == ["4,4。"]
+    assert reply.done and not reply.cancelled
+
+def test_cancel_skips_on_complete_and_closes_stream():
+    completed = []
+    source = Pieces(["4,4", "\n理由", "：占角"])
+    reply = reply_for(source, completed)
+    for text in reply:
+        reply.cancel()
+    assert text == "4,4"
+    assert completed == []
+    assert reply.cancelled and source.closed
+    # 取消后读完也不会补调on_complete
+    assert reply.finish() == "4,4"
+    assert completed == []
+
+def test_error_skips_on_complete():
+    completed = []
+    reply = reply_for(Pieces(["4,4", "后半段"], error_at=1), completed)
+    assert reply.finish() == "4,4"
+    assert reply.error == "连接中断"
+    assert completed == []
+
+def test_cancel_from_another_thread():
+    completed = []
+    pieces = queue.Queue()
+    reply = StreamingReply(iter(pieces.get, None), completed.append)
+    seen = []
+    reader = threading.Thread(target=lambda: seen.extend(reply))
+    reader.start()
+    pieces.put("4,")
+    reply.cancel()
+    pieces.put("4")
+    pieces.put(None)
+    reader.join(5)
+    assert not reader.is_alive()
+    assert "4,4" not in seen
+    assert completed == []
+
+def fake_stream(go_ai, *texts, error_at=None):
+    """让go_ai的每次流式请求依次返回texts中的一段回复，返回每次请求的Pieces"""
+    sources = []
+
+    def call(prompt, turn, **kwargs):
+        assert kwargs.get("stream")
+        source = Pieces([FakeResponse(piece) for piece in texts[len(sources)]], error_at)
+        sources.append(source)
+        return iter(source)
+
+    go_ai._generation_call = call
+    return sources
+
+def test_stream_model_caches_only_complete_replies(go_ai):
+    sources = fake_stream(go_ai, ["4,4", "\n占角"], ["4,4", "\n占角"])
+    board = np.zeros((19, 19), dtype=int)
+
+    reply = go_ai.stream_model("p", "quick", 10, 0.5, board=board)
+    next(iter(reply))
+    reply.cancel()
+    assert sources[0].closed
+
+    reply = go_ai.stream_model("p", "quick", 10, 0.5, board=board)
+    assert reply.finish() == "4,4\n占角"
+    assert len(sources) == 2
+
+    cached = go_ai.stream_model("p", "quick", 10, 0.5, board=board)
+    assert cached.finish() == "4,4\n占角"
+    assert len(sources) == 2
+
+def test_stream_error_is_not_cached(go_ai):
+    sources = fake_stream(go_ai, ["4,4", "\n占角"], ["5,5"], error_at=1)
+    board = np.zeros((19, 19), dtype=int)
+    reply = go_ai.stream_model("p", "quick", 10, 0.5, board=board)
+    reply.finish()
+    assert reply.error is not None
+    go_ai.stream_model("p", "quick", 10, 0.5, board=board).finish()
+    assert len(sources) == 2
+
+def test_quick_move_stops_early_without_caching(go_ai):
+    # 开头的1,1已被占用；"4,4"在下一段到达前不算写完
+    sources = fake_stream(go_ai, ["1,1", "\n被占，改下", "建议 4,", "4", "。", "\n理由：占角"])
+    position = GoBoard(19)
+    position.place_stone(0, 0, Stone.BLACK)
+    text, error, move = go_ai.request_quick_move(position, [(0, 0, Stone.BLACK)], Stone.WHITE)
+    assert error is None
+    assert move == (3, 3)
+    assert "理由" not in text
+    assert sources[0].closed
+    assert len(go_ai.cache._memory) == 0
+
+def test_quick_move_commentary_is_cached_after_full_read(go_ai):
+    fake_stream(go_ai, ["4,4", "\n理由", "：占角"])
+    done = threading.Event()
+    texts = []
+    _, _, move = go_ai.request_quick_move(GoBoard(19), [], Stone.BLACK,
+                                          on_commentary=lambda text: (texts.append(text), done.set()))
+    assert move == (3, 3)
+    assert done.wait(5)
+    assert texts == ["4,4\n理由：占角"]
+    assert len(go_ai.cache._memory) == 1
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+# D4 symmetry round-trips for boards, moves and cache fingerprints
+import numpy as np
+import pytest
+
+from src.response_cache import position_fingerprint
+from src.symmetry import (INVERSE, all_transforms, canonical_hash, canonicalize, inverse_move, remap_move,
+                          transform_board, transform_move)
+
+def random_board(size: int, seed: int) -> np.ndarray:
+    return np.random.default_rng(seed).integers(0, 3, size=(size, size))
+
+@pytest.mark.parametrize("size", [5, 9, 19])
+def test_board_round_trip(size):
+    board = random_board(size, size)
+    images = all_transforms(board)
+    for t in range(8):
+        assert (images[t] == transform_board(board, t)).all()
+        assert (transform_board(images[t], INVERSE[t]) == board).all()
+
+@pytest.mark.parametrize("size", [5, 19])
+def test_move_round_trip_follows_stones(size):
+    board = random_board(size, 1)
+    for t in range(8):
+        image = transform_board(board, t)
+        for row in range(size):
+            for col in range(size):
+                moved = transform_move((row, col), t, size)
+                assert image[moved] == board[row, col]
+                assert inverse_move(moved, t, size) == (row, col)
+        assert transform_move((-1, -1), t, size) == (-1, -1)
+
+def test_canonical_form_is_shared_by_all_images():
+    board = random_board(9, 2)
+    canonical, t = canonicalize(board)
+    assert (canonical == transform_board(board, t)).all()
+    digest, _ = canonical_hash(board)
+    for image in all_transforms(board):
+        image_canonical, image_t = canonicalize(image)
+        assert (image_canonical == canonical).all()
+        assert (transform_board(image, image_t) == canonical).all()
+        assert canonical_hash(image)[0] == digest
+
+def test_remap_move_between_equivalent_positions():
+    board = np.zeros((9, 9), dtype=int)
+    board[2, 3] = 1
+    board[6, 6] = 2
+    move = (2, 6)
+    _, from_t = canonicalize(board)
+    for t in range(8):
+        other = transform_board(board, t)
+        _, to_t = canonicalize(other)
+        assert remap_move(move, from_t, to_t, 9) == transform_move(move, t, 9)
+
+def test_position_fingerprint_ignores_orientation_but_not_side_to_move():
+    board = random_board(9, 3)
+    key, _ = position_fingerprint(board, True)
+    for image in all_transforms(board):
+        assert position_fingerprint(image, True)[0] == key
+    assert position_fingerprint(board, False)[0] != key